@@ -0,0 +1,161 @@
+﻿import threading
+import time
+from Book import Book
+from JSONManager import LibraryJSONManager
+
+
+class Autosaver():
+    """
+    Класс автосохранения библиотеки в фоновом потоке. Автосохранение
+    подписывается на изменения библиотеки и сохраняет ее менеджером, когда
+    после последнего сохранения накопилось mutation_threshold изменений или
+    изменения прекратились на quiet_period секунд. Все изменения, сделанные
+    до сохранения, записываются одним сохранением, а поток команд лишь
+    отмечает изменение и не ждет записи. Менеджер копирует книги под
+    блокировкой библиотеки на чтение и записывает файл после ее
+    освобождения, поэтому библиотека должна быть потокобезопасной, а
+    изменяющие команды не ждут записи файла.
+
+    Attributes:
+        manager (LibraryJSONManager): Менеджер, сохраняющий библиотеку
+        mutation_threshold (int): Число изменений, после которого библиотека
+        сохраняется, не дожидаясь паузы
+        quiet_period (float): Пауза в изменениях в секундах, после которой
+        библиотека сохраняется
+        __condition (threading.Condition): Условие пробуждения фонового
+        потока
+        __pending_mutations (int): Число несохраненных изменений
+        __last_mutation_time (float): Время последнего изменения
+        __stopping (bool): Признак остановки автосохранения
+        __save_count (int): Число выполненных автосохранений
+        __thread (threading.Thread): Фоновый поток автосохранения
+        MUTATION_THRESHOLD (int): Число изменений по умолчанию
+        QUIET_PERIOD (float): Пауза в изменениях по умолчанию в секундах
+
+    Methods:
+        get_save_count (Callable[[], int]): Возвращает число выполненных
+        автосохранений
+        stop (Callable[[], None]): Сохраняет несохраненные изменения и
+        останавливает фоновый поток
+    """
+
+    manager: LibraryJSONManager
+    mutation_threshold: int
+    quiet_period: float
+    __condition: threading.Condition
+    __pending_mutations: int
+    __last_mutation_time: float
+    __stopping: bool
+    __save_count: int
+    __thread: threading.Thread
+
+    MUTATION_THRESHOLD: int = 100
+    QUIET_PERIOD: float = 5
+
+    def __init__(
+        self,
+        manager: LibraryJSONManager,
+        mutation_threshold: int = MUTATION_THRESHOLD,
+        quiet_period: float = QUIET_PERIOD
+    ):
+        """
+        Инициализирует атрибуты автосохранения, подписывается на изменения
+        библиотеки и запускает фоновый поток.
+
+        Args:
+            manager: Менеджер, сохраняющий библиотеку
+            mutation_threshold: Число изменений, после которого библиотека
+            сохраняется, не дожидаясь паузы
+            quiet_period: Пауза в изменениях в секундах, после которой
+            библиотека сохраняется
+
+        Raises:
+            ValueError: Библиотека не потокобезопасна
+        """
+        if manager.obj.lock is None:
+            raise ValueError(
+                'Автосохранение требует потокобезопасной библиотеки'
+            )
+        self.manager = manager
+        self.mutation_threshold = mutation_threshold
+        self.quiet_period = quiet_period
+        self.__condition = threading.Condition()
+        self.__pending_mutations = 0
+        self.__last_mutation_time = time.monotonic()
+        self.__stopping = False
+        self.__save_count = 0
+        manager.obj.add_listener(self.__record)
+        self.__thread = threading.Thread(
+            target=self.__run,
+            name='autosave',
+            daemon=True
+        )
+        self.__thread.start()
+
+    def __record(self, event: str, book: Book) -> None:
+        """
+        Отмечает изменение библиотеки. Фоновый поток будится, только если
+        ему нужно пересчитать время ожидания или пора сохранять.
+        """
+        with self.__condition:
+            self.__pending_mutations += 1
+            self.__last_mutation_time = time.monotonic()
+            if self.__pending_mutations == 1 \
+                    or self.__pending_mutations >= self.mutation_threshold:
+                self.__condition.notify()
+
+    def __wait_time(self) -> float | None:
+        """
+        Возвращает время до сохранения в секундах: 0 - пора сохранять,
+        None - сохранять нечего.
+        """
+        if self.__pending_mutations == 0:
+            return None
+        if self.__pending_mutations >= self.mutation_threshold:
+            return 0
+        quiet_time = time.monotonic() - self.__last_mutation_time
+        return max(0, self.quiet_period - quiet_time)
+
+    def __run(self) -> None:
+        """
+        Цикл фонового потока: ждет, пока пора сохранять, и сохраняет
+        библиотеку. При остановке сохраняет несохраненные изменения и
+        завершается.
+        """
+        while True:
+            with self.__condition:
+                while not self.__stopping \
+                        and (wait_time := self.__wait_time()) != 0:
+                    self.__condition.wait(wait_time)
+                if self.__pending_mutations == 0:
+                    return
+                self.__pending_mutations = 0
+            self.__save()
+
+    def __save(self) -> None:
+        """Сохраняет библиотеку, печатая ошибку сохранения."""
+        try:
+            self.manager.save_to_json()
+        except Exception as e:
+            print(f'Ошибка автосохранения: {e}')
+            return
+        with self.__condition:
+            self.__save_count += 1
+
+    def get_save_count(self) -> int:
+        """Возвращает число выполненных автосохранений."""
+        with self.__condition:
+            return self.__save_count
+
+    def stop(self) -> None:
+        """
+        Сохраняет несохраненные изменения и останавливает фоновый поток.
+        Вызывается при завершении работы.
+
+        Returns:
+            None
+        """
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify()
+        self.__thread.join()
@@ -1,5 +1,6 @@
 ﻿from collections.abc import Callable
 import itertools
+import unicodedata
 
 
 class Book():
@@ -12,9 +13,13 @@ class Book():
         title (str): Название
         author (str): Автор
         year (str): Год издания
+        title_key (str): Нормализованное название, см. normalize
+        author_key (str): Нормализованный автор
+        year_key (str): Нормализованный год издания
         __status (str): Статус
         STATUSES (dict[int, str]): Возможные значения статуса 
         ("в наличии", "выдана")
+        STATUS_CODES (dict[str, int]): Номера статусов по их значениям
 
     Classes:
         EmptyBookAttributeException: Ошибка пустого атрибута книги
@@ -26,6 +31,10 @@ class Book():
         get_id (Callable[[], int]): Возвращает id книги
         get_status (Callable[[], str]): Возвращает статус книги
         set_book_status (Callable[[int], None]): Устанавливает статус книги
+        advance_id_counter (Callable[[int], None]): Сдвигает генератор 
+        идентификаторов за указанный id
+        normalize (Callable[[str], str]): Возвращает ключ строки для поиска 
+        без учета регистра
     """
 
     __id: int 
@@ -33,9 +42,15 @@ class Book():
     title: str
     author: str
     year: str
+    title_key: str
+    author_key: str
+    year_key: str
     __status: str
 
     STATUSES: dict[int, str] = {0: 'в наличии', 1: 'выдана'}
+    STATUS_CODES: dict[str, int] = {
+        status: code for code, status in STATUSES.items()
+    }
 
     class EmptyBookAttributeException(Exception):
         """Ошибка пустого атрибута книги."""
@@ -53,14 +68,24 @@ class Book():
         def __str__(self):
             return self.message
 
-    def __init__(self, title: str, author: str, year: str):
+    def __init__(
+        self, 
+        title: str, 
+        author: str, 
+        year: str, 
+        id: int | None = None
+    ):
         """
-        Инициализирует атрибуты __id, title, author, year, __status.
+        Инициализирует атрибуты __id, title, author, year, __status и 
+        ключи поиска title_key, author_key, year_key. Ключи вычисляются один 
+        раз, поэтому атрибуты книги не меняются после ее создания.
         
         Args: 
             title: Название
             author: Автор
             year: Год издания
+            id: Сохраненный id книги (например, при загрузке из файла). 
+            Генератор id при этом не сдвигается, см. advance_id_counter
 
         Raises:
             EmptyBookAttributeException
@@ -68,10 +93,15 @@ class Book():
         for attribute in [title, author, year]:
             if len(attribute) == 0:
                 raise self.EmptyBookAttributeException
-        self.__id = Book.__generate_id()
+        if id is None:
+            id = Book.__generate_id()
+        self.__id = id
         self.title = title
         self.author = author
         self.year = year
+        self.title_key = self.normalize(title)
+        self.author_key = self.normalize(author)
+        self.year_key = self.normalize(year)
         self.__status = self.STATUSES[0]
 
     def get_id(self) -> int:
@@ -99,7 +129,39 @@ class Book():
             raise self.IncorrectBookStatusException
         self.__status = self.STATUSES[status_code]
 
+    @classmethod
+    def advance_id_counter(cls, id: int) -> None:
+        """
+        Сдвигает генератор идентификаторов так, чтобы следующий 
+        сгенерированный id был больше указанного. Вызывается после создания 
+        книг с сохраненными id.
+
+        Args:
+            id: Наибольший занятый id
 
+        Returns:
+            None
+        """
+        next_id = cls.__generate_id()
+        cls.__generate_id = itertools.count(max(next_id, id + 1)).__next__
 
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Возвращает ключ строки для поиска без учета регистра: строка 
+        приводится к нормальной форме NFKC и сворачивается по регистру 
+        (casefold), а "ё" заменяется на "е". Совпадающий со строкой ключ 
+        (например, год издания) не создается заново.
 
+        Args:
+            text: Строка
 
+        Returns:
+            Ключ строки
+        """
+        if text.isascii():
+            key = text.lower()
+        else:
+            key = unicodedata.normalize('NFKC', text).casefold() \
+                .replace('ё', 'е')
+        return text if key == text else key
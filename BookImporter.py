@@ -0,0 +1,203 @@
+﻿from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+import csv
+import json
+import time
+from Book import Book
+from ConsoleLibrary import ConsoleLibrary
+
+
+class BookImporter():
+    """
+    Класс потокового импорта книг в библиотеку из csv- и ndjson-файлов.
+    Файл читается построчно, а книги добавляются в библиотеку пакетами по
+    BATCH_SIZE вместе со статусами методом ConsoleLibrary.add_books, поэтому
+    файл целиком в памяти не хранится, а пакет добавляется под одной
+    блокировкой записи. Некорректные строки не прерывают
+    импорт: они пропускаются с печатью номера строки и причины.
+
+    Формат csv-файла: столбцы title, author, year и необязательный столбец
+    status (номер статуса из Book.STATUSES или сам статус). Первая строка
+    пропускается, если это заголовок "title,author,year[,status]". Формат
+    ndjson-файла: по одному json-объекту {"title", "author", "year",
+    "status"} на строку, status необязателен.
+
+    Attributes:
+        obj (ConsoleLibrary): Библиотека, в которую импортируются книги
+        BATCH_SIZE (int): Число книг, добавляемых в библиотеку за раз
+        CSV_EXTENSIONS (tuple[str, ...]): Расширения csv-файлов
+        NDJSON_EXTENSIONS (tuple[str, ...]): Расширения ndjson-файлов
+        HEADER (list[str]): Заголовок csv-файла
+
+    Classes:
+        RowException: Ошибка некорректной строки файла
+
+    Methods:
+        import_books (Callable[[str], None]): Импортирует книги из файла
+    """
+
+    obj: ConsoleLibrary
+
+    BATCH_SIZE: int = 10000
+    CSV_EXTENSIONS: tuple[str, ...] = ('.csv',)
+    NDJSON_EXTENSIONS: tuple[str, ...] = ('.ndjson', '.jsonl')
+    HEADER: list[str] = ['title', 'author', 'year', 'status']
+
+    class RowException(Exception):
+        """Ошибка некорректной строки файла."""
+
+        def __init__(self, message: str):
+            self.message = message
+
+        def __str__(self):
+            return self.message
+
+    def __init__(self, obj: ConsoleLibrary):
+        """
+        Инициализирует атрибут obj.
+
+        Args:
+            obj: Библиотека, в которую импортируются книги
+        """
+        self.obj = obj
+
+    def import_books(self, file_path: str) -> None:
+        """
+        Импортирует книги из csv- или ndjson-файла (формат определяется по
+        расширению). Печатает номера и причины отклонения некорректных строк
+        и в конце - число импортированных книг и отклоненных строк, время
+        импорта и пропускную способность.
+
+        Args:
+            file_path: Путь до файла
+
+        Returns:
+            None
+        """
+        suffix = Path(file_path).suffix
+        if suffix in self.CSV_EXTENSIONS:
+            read_rows = self.__read_csv
+        elif suffix in self.NDJSON_EXTENSIONS:
+            read_rows = self.__read_ndjson
+        else:
+            print('Ошибка: импорт поддерживает только csv- и ndjson-файлы.')
+            return
+        imported_count = rejected_count = rows_count = 0
+        batch = []
+        start_time = time.perf_counter()
+        try:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                for line_number, row in read_rows(f):
+                    rows_count += 1
+                    try:
+                        batch.append(self.__parse_row(row))
+                    except self.RowException as e:
+                        rejected_count += 1
+                        print(f'Строка {line_number}: {e}')
+                        continue
+                    if len(batch) >= self.BATCH_SIZE:
+                        imported_count += self.__add_batch(batch)
+                        batch.clear()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f'Ошибка: не удалось прочитать файл {file_path}: {e}')
+        imported_count += self.__add_batch(batch)
+        elapsed_time = time.perf_counter() - start_time
+        print(f'Импортировано книг: {imported_count}, отклонено строк: '
+              f'{rejected_count}, время: {elapsed_time:.3f} с, '
+              f'{rows_count / max(elapsed_time, 1e-9):.0f} строк/с.')
+
+    def __read_csv(self, f: TextIO) -> Iterator[tuple[int, list | dict]]:
+        """
+        Возвращает итератор по строкам csv-файла с номерами строк файла,
+        пропуская заголовок и пустые строки.
+        """
+        reader = csv.reader(f)
+        for row in reader:
+            if len(row) == 0:
+                continue
+            if reader.line_num == 1 and len(row) >= 3 \
+                    and row == self.HEADER[:len(row)]:
+                continue
+            yield reader.line_num, row
+
+    def __read_ndjson(self, f: TextIO) -> Iterator[tuple[int, list | dict]]:
+        """
+        Возвращает итератор по json-объектам ndjson-файла с номерами строк,
+        пропуская пустые строки. Строка с некорректным json возвращается
+        как есть и отклоняется при разборе.
+        """
+        for line_number, line in enumerate(f, 1):
+            if len(line.strip()) == 0:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                yield line_number, line
+
+    def __parse_row(self, row: list | dict) -> tuple[str, str, str, int]:
+        """
+        Проверяет строку файла и возвращает атрибуты книги.
+
+        Raises:
+            RowException
+
+        Returns:
+            Кортеж (название, автор, год издания, номер статуса)
+        """
+        if isinstance(row, dict):
+            values = [row.get(column) for column in self.HEADER]
+            if values[3] is None:
+                values.pop()
+        elif isinstance(row, list):
+            values = row
+        else:
+            raise self.RowException('некорректный json.')
+        if len(values) not in (3, 4):
+            raise self.RowException(
+                f'ожидается 3 или 4 столбца, получено {len(values)}.'
+            )
+        title, author, year = values[:3]
+        for attribute in (title, author, year):
+            if not isinstance(attribute, str):
+                raise self.RowException('атрибуты книги должны быть строками.')
+            if len(attribute) == 0:
+                raise self.RowException(
+                    'атрибуты книги не могут быть пустыми.'
+                )
+        status_code = 0
+        if len(values) == 4:
+            status_code = self.__parse_status(values[3])
+        return title, author, year, status_code
+
+    def __parse_status(self, status: object) -> int:
+        """
+        Возвращает номер статуса по номеру или значению статуса.
+
+        Raises:
+            RowException
+        """
+        if isinstance(status, str) and status in Book.STATUS_CODES:
+            return Book.STATUS_CODES[status]
+        try:
+            status_code = int(status)
+        except (TypeError, ValueError):
+            status_code = None
+        # int отбрасывает дробную часть, поэтому 1.5 не считается статусом 1
+        if isinstance(status, float) and not status.is_integer():
+            status_code = None
+        if isinstance(status, bool) or status_code not in Book.STATUSES:
+            raise self.RowException(f'некорректный статус книги {status!r}.')
+        return status_code
+
+    def __add_batch(self, batch: list[tuple[str, str, str, int]]) -> int:
+        """
+        Добавляет пакет книг вместе с их статусами в библиотеку под одной 
+        блокировкой.
+
+        Returns:
+            Число добавленных книг
+        """
+        if len(batch) == 0:
+            return 0
+        return len(self.obj.add_books(batch))
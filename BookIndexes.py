@@ -0,0 +1,674 @@
+﻿from collections.abc import Iterable, Iterator
+from Book import Book
+import bisect
+import heapq
+import math
+import re
+
+
+class TrigramIndex():
+    """
+    Класс n-граммного (триграммного) индекса подстрок по ключам поиска
+    названия, автора и года издания книг (см. Book.normalize).
+
+    Attributes:
+        N (int): Длина n-граммы
+        __postings (dict[str, set[int]]): Списки вхождений: n-грамма -> id
+        книг, в названии, авторе или годе издания которых она встречается
+
+    Methods:
+        grams (Callable[[str], set[str]]): Возвращает множество n-грамм строки
+        add_book (Callable[[Book], None]): Добавляет книгу в индекс
+        remove_book (Callable[[Book], None]): Удаляет книгу из индекса
+        clear (Callable[[], None]): Очищает индекс
+        candidates (Callable[[str], set[int] | None]): Возвращает id книг-
+        кандидатов, которые могут содержать подстроку
+        estimate (Callable[[str], int | None]): Возвращает верхнюю оценку
+        числа книг-кандидатов
+    """
+
+    N: int = 3
+
+    __postings: dict[str, set[int]]
+
+    def __init__(self):
+        """Инициализирует атрибут __postings."""
+        self.__postings = {}
+
+    @classmethod
+    def grams(cls, text: str) -> set[str]:
+        """
+        Возвращает множество n-грамм строки.
+
+        Args:
+            text: Строка
+
+        Returns:
+            Множество всех подстрок длины N
+        """
+        return {text[i:i + cls.N] for i in range(len(text) - cls.N + 1)}
+
+    def __book_grams(self, book: Book) -> set[str]:
+        """Возвращает объединение n-грамм ключей поиска книги."""
+        return self.grams(book.title_key) | self.grams(book.author_key) \
+            | self.grams(book.year_key)
+
+    def add_book(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        id = book.get_id()
+        postings = self.__postings
+        for gram in self.__book_grams(book):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {id}
+            else:
+                posting.add(id)
+
+    def remove_book(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса. Атрибуты книги не должны меняться с момента
+        ее добавления в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        id = book.get_id()
+        postings = self.__postings
+        for gram in self.__book_grams(book):
+            posting = postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(id)
+            if len(posting) == 0:
+                del postings[gram]
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        self.__postings.clear()
+
+    def candidates(self, key_word: str) -> set[int] | None:
+        """
+        Возвращает id книг-кандидатов, в ключах поиска названия, автора или
+        года издания которых может встречаться подстрока: пересечение
+        списков вхождений всех n-грамм подстроки. Кандидаты требуют
+        проверки, так как n-граммы могут встречаться в разных атрибутах
+        книги.
+
+        Args:
+            key_word: Подстрока для поиска, сравнивается по ключу поиска
+
+        Returns:
+            Множество id книг-кандидатов или None, если подстрока короче N и
+            индекс не может сузить поиск
+        """
+        key_word = Book.normalize(key_word)
+        if len(key_word) < self.N:
+            return None
+        postings = []
+        for gram in self.grams(key_word):
+            posting = self.__postings.get(gram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def estimate(self, key_word: str) -> int | None:
+        """
+        Возвращает верхнюю оценку числа книг-кандидатов, в которых может
+        встречаться подстрока, без пересечения списков вхождений: длину
+        самого короткого списка вхождений n-грамм подстроки.
+
+        Args:
+            key_word: Подстрока для поиска, сравнивается по ключу поиска
+
+        Returns:
+            Оценка числа кандидатов или None, если подстрока короче N
+        """
+        key_word = Book.normalize(key_word)
+        if len(key_word) < self.N:
+            return None
+        return min(len(self.__postings.get(gram, ()))
+                   for gram in self.grams(key_word))
+
+
+class SimilarityIndex():
+    """
+    Класс индекса нечеткого поиска книг по сходству триграмм. Признаки
+    книги - множество триграмм слов ключей поиска ее названия, автора и
+    года издания (см. Book.normalize); каждое слово дополняется двумя
+    пробелами в начале и одним в конце, поэтому короткие слова и опечатки в
+    начале и конце слова тоже дают общие триграммы. Признаки книг вычисляются один раз при
+    добавлении книги в индекс.
+
+    Сходство книги с запросом - доля триграмм запроса, встречающихся в
+    признаках книги. Книга с долей не меньше THRESHOLD должна содержать хотя
+    бы одну из |Q| - m + 1 самых редких триграмм запроса (|Q| - число
+    триграмм запроса, m - необходимое число совпавших), поэтому кандидаты
+    берутся только из их списков вхождений, а не из всей библиотеки.
+
+    Attributes:
+        THRESHOLD (float): Минимальное сходство найденной книги с запросом
+        __features (dict[int, frozenset[str]]): Признаки книг: id ->
+        множество триграмм
+        __postings (dict[str, set[int]]): Списки вхождений: триграмма -> id
+        книг, в признаках которых она встречается
+
+    Methods:
+        features (Callable[[str], frozenset[str]]): Возвращает множество
+        триграмм слов ключа поиска строки
+        add_book (Callable[[Book], None]): Добавляет книгу в индекс
+        remove_book (Callable[[Book], None]): Удаляет книгу из индекса
+        clear (Callable[[], None]): Очищает индекс
+        top (Callable[[str, int], list[tuple[float, int]]]): Возвращает k
+        наиболее похожих на запрос книг
+    """
+
+    THRESHOLD: float = 0.5
+
+    __features: dict[int, frozenset[str]]
+    __postings: dict[str, set[int]]
+
+    __WORD: re.Pattern = re.compile(r'\w+')
+
+    def __init__(self):
+        """Инициализирует атрибуты __features, __postings."""
+        self.__features = {}
+        self.__postings = {}
+
+    @classmethod
+    def features(cls, text: str) -> frozenset[str]:
+        """
+        Возвращает множество триграмм слов ключа поиска строки.
+
+        Args:
+            text: Строка
+
+        Returns:
+            Множество триграмм слов ключа поиска, дополненных пробелами
+        """
+        return cls.__key_features(Book.normalize(text))
+
+    @classmethod
+    def __key_features(cls, key: str) -> frozenset[str]:
+        """Возвращает множество триграмм слов ключа поиска."""
+        grams = set()
+        for word in cls.__WORD.findall(key):
+            word = f'  {word} '
+            grams.update(word[i:i + 3] for i in range(len(word) - 2))
+        return frozenset(grams)
+
+    def add_book(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        id = book.get_id()
+        features = self.__key_features(
+            f'{book.title_key} {book.author_key} {book.year_key}'
+        )
+        self.__features[id] = features
+        postings = self.__postings
+        for gram in features:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {id}
+            else:
+                posting.add(id)
+
+    def remove_book(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        id = book.get_id()
+        postings = self.__postings
+        for gram in self.__features.pop(id, ()):
+            posting = postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(id)
+            if len(posting) == 0:
+                del postings[gram]
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        self.__features.clear()
+        self.__postings.clear()
+
+    def top(self, query: str, k: int) -> list[tuple[float, int]]:
+        """
+        Возвращает k наиболее похожих на запрос книг со сходством не меньше
+        THRESHOLD. Кандидаты отбираются по самым редким триграммам запроса,
+        а лучшие k хранятся в куче размера k без сортировки всех кандидатов.
+        При равном сходстве выше книга, у которой меньше лишних триграмм,
+        затем книга с меньшим id.
+
+        Args:
+            query: Запрос
+            k: Число книг
+
+        Returns:
+            Список кортежей (сходство, id книги) по убыванию сходства
+        """
+        query_features = self.features(query)
+        if len(query_features) == 0 or k <= 0:
+            return []
+        min_shared = max(1, math.ceil(self.THRESHOLD * len(query_features)))
+        postings = sorted(
+            (self.__postings.get(gram, set()) for gram in query_features),
+            key=len
+        )
+        candidate_ids = set().union(
+            *postings[:len(query_features) - min_shared + 1]
+        )
+        features = self.__features
+
+        def scores() -> Iterator[tuple[float, float, int]]:
+            for id in candidate_ids:
+                book_features = features[id]
+                shared = len(query_features & book_features)
+                if shared >= min_shared:
+                    yield (
+                        shared / len(query_features),
+                        shared / len(query_features | book_features),
+                        -id
+                    )
+
+        return [(score, -id) for score, _, id in heapq.nlargest(k, scores())]
+
+
+class StatusIndex():
+    """
+    Класс индекса книг по статусу: для каждого статуса хранит множество id
+    книг с этим статусом.
+
+    Attributes:
+        __ids (dict[int, set[int]]): Номер статуса из Book.STATUSES -> id
+        книг с этим статусом
+
+    Methods:
+        add_book (Callable[[Book], None]): Добавляет книгу в индекс
+        remove_book (Callable[[Book], None]): Удаляет книгу из индекса
+        change_status (Callable[[int, int, int], None]): Переносит книгу в
+        множество другого статуса
+        clear (Callable[[], None]): Очищает индекс
+        ids (Callable[[int], set[int]]): Возвращает id книг со статусом
+    """
+
+    __ids: dict[int, set[int]]
+
+    def __init__(self):
+        """Инициализирует атрибут __ids пустыми множествами всех статусов."""
+        self.__ids = {status_code: set() for status_code in Book.STATUSES}
+
+    def add_book(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        self.__ids[Book.STATUS_CODES[book.get_status()]].add(book.get_id())
+
+    def remove_book(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        self.__ids[Book.STATUS_CODES[book.get_status()]].discard(book.get_id())
+
+    def change_status(
+        self,
+        id: int,
+        old_status_code: int,
+        new_status_code: int
+    ) -> None:
+        """
+        Переносит книгу в множество другого статуса.
+
+        Args:
+            id: id книги
+            old_status_code: Номер прежнего статуса
+            new_status_code: Номер нового статуса
+
+        Returns:
+            None
+        """
+        self.__ids[old_status_code].discard(id)
+        self.__ids[new_status_code].add(id)
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        for ids in self.__ids.values():
+            ids.clear()
+
+    def ids(self, status_code: int) -> set[int]:
+        """
+        Возвращает id книг со статусом. Множество принадлежит индексу и не
+        должно изменяться.
+
+        Args:
+            status_code: Номер статуса из Book.STATUSES
+
+        Raises:
+            Book.IncorrectBookStatusException
+
+        Returns:
+            Множество id книг
+        """
+        ids = self.__ids.get(status_code)
+        if ids is None:
+            raise Book.IncorrectBookStatusException
+        return ids
+
+
+class AuthorIndex():
+    """
+    Класс хеш-индекса книг по нормализованному автору: автор сравнивается
+    по ключу поиска (см. Book.normalize), пробелы по краям отбрасываются,
+    идущие подряд пробелы считаются одним.
+
+    Attributes:
+        __ids (dict[str, set[int]]): Нормализованный автор -> id книг
+
+    Methods:
+        normalize (Callable[[str], str]): Нормализует автора
+        add_book (Callable[[Book], None]): Добавляет книгу в индекс
+        remove_book (Callable[[Book], None]): Удаляет книгу из индекса
+        clear (Callable[[], None]): Очищает индекс
+        ids (Callable[[str], set[int]]): Возвращает id книг автора
+    """
+
+    __ids: dict[str, set[int]]
+
+    def __init__(self):
+        """Инициализирует атрибут __ids."""
+        self.__ids = {}
+
+    @staticmethod
+    def normalize(author: str) -> str:
+        """
+        Нормализует автора: приводит к ключу поиска и схлопывает пробелы.
+
+        Args:
+            author: Автор
+
+        Returns:
+            Нормализованный автор
+        """
+        return ' '.join(Book.normalize(author).split())
+
+    @staticmethod
+    def __book_key(book: Book) -> str:
+        """Возвращает нормализованного автора книги по ее ключу поиска."""
+        return ' '.join(book.author_key.split())
+
+    def add_book(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        key = self.__book_key(book)
+        ids = self.__ids.get(key)
+        if ids is None:
+            self.__ids[key] = {book.get_id()}
+        else:
+            ids.add(book.get_id())
+
+    def remove_book(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса. Автор книги не должен меняться с момента
+        ее добавления в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        key = self.__book_key(book)
+        ids = self.__ids.get(key)
+        if ids is None:
+            return
+        ids.discard(book.get_id())
+        if len(ids) == 0:
+            del self.__ids[key]
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        self.__ids.clear()
+
+    def ids(self, author: str) -> set[int]:
+        """
+        Возвращает id книг автора. Множество принадлежит индексу и не должно
+        изменяться.
+
+        Args:
+            author: Автор (нормализуется перед поиском)
+
+        Returns:
+            Множество id книг, пустое, если книг автора нет
+        """
+        return self.__ids.get(self.normalize(author), set())
+
+
+class YearIndex():
+    """
+    Класс упорядоченного индекса книг по году издания. Год издания
+    хранится строкой произвольного вида, в индекс попадают книги, в году
+    издания которых есть число (например, "1869" или "1869 г."). Пары
+    (год, id) хранятся в отсортированном списке, поиск по диапазону годов
+    выполняется двоичным поиском.
+
+    Attributes:
+        __entries (list[tuple[int, int]]): Отсортированные пары (год, id)
+
+    Methods:
+        parse_year (Callable[[str], int | None]): Возвращает год издания
+        числом
+        add_book (Callable[[Book], None]): Добавляет книгу в индекс
+        remove_book (Callable[[Book], None]): Удаляет книгу из индекса
+        add_books (Callable[[Iterable[Book]], None]): Добавляет книги в
+        индекс одной сортировкой
+        remove_books (Callable[[Iterable[Book]], None]): Удаляет книги из
+        индекса за один проход
+        rebuild (Callable[[Iterable[Book]], None]): Перестраивает индекс по
+        книгам одной сортировкой
+        clear (Callable[[], None]): Очищает индекс
+        ids_in_range (Callable[[int, int], Iterator[int]]): Возвращает
+        итератор по id книг, изданных в диапазоне годов
+        count_in_range (Callable[[int, int], int]): Возвращает число книг,
+        изданных в диапазоне годов
+    """
+
+    __YEAR: re.Pattern = re.compile(r'-?\d+')
+
+    __entries: list[tuple[int, int]]
+
+    def __init__(self):
+        """Инициализирует атрибут __entries."""
+        self.__entries = []
+
+    @classmethod
+    def parse_year(cls, year: str) -> int | None:
+        """
+        Возвращает год издания числом.
+
+        Args:
+            year: Год издания
+
+        Returns:
+            Первое число в году издания или None, если чисел в нем нет
+        """
+        match = cls.__YEAR.search(year)
+        if match is None:
+            return None
+        return int(match.group())
+
+    def add_book(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        year = self.parse_year(book.year)
+        if year is not None:
+            bisect.insort(self.__entries, (year, book.get_id()))
+
+    def remove_book(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса. Год издания книги не должен меняться с
+        момента ее добавления в индекс.
+
+        Args:
+            book: Книга
+
+        Returns:
+            None
+        """
+        year = self.parse_year(book.year)
+        if year is None:
+            return
+        entry = (year, book.get_id())
+        index = bisect.bisect_left(self.__entries, entry)
+        if index < len(self.__entries) and self.__entries[index] == entry:
+            del self.__entries[index]
+
+    def add_books(self, books: Iterable[Book]) -> None:
+        """
+        Добавляет книги в индекс одной сортировкой: отсортированный список
+        и добавленные пары сливаются за линейное время, а не вставляются по
+        одной.
+
+        Args:
+            books: Книги
+
+        Returns:
+            None
+        """
+        entries = self.__entries_of(books)
+        if len(entries) == 0:
+            return
+        self.__entries.extend(entries)
+        self.__entries.sort()
+
+    def remove_books(self, books: Iterable[Book]) -> None:
+        """
+        Удаляет книги из индекса за один проход по нему. Годы издания книг
+        не должны меняться с момента их добавления в индекс.
+
+        Args:
+            books: Книги
+
+        Returns:
+            None
+        """
+        removed_entries = set(self.__entries_of(books))
+        if len(removed_entries) == 0:
+            return
+        self.__entries = [entry for entry in self.__entries
+                          if entry not in removed_entries]
+
+    def __entries_of(self, books: Iterable[Book]) -> list[tuple[int, int]]:
+        """Возвращает пары (год, id) книг с числом в году издания."""
+        entries = []
+        for book in books:
+            year = self.parse_year(book.year)
+            if year is not None:
+                entries.append((year, book.get_id()))
+        return entries
+
+    def rebuild(self, books: Iterable[Book]) -> None:
+        """
+        Перестраивает индекс по книгам одной сортировкой.
+
+        Args:
+            books: Книги
+
+        Returns:
+            None
+        """
+        entries = self.__entries_of(books)
+        entries.sort()
+        self.__entries = entries
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        self.__entries = []
+
+    def ids_in_range(self, year_from: int, year_to: int) -> Iterator[int]:
+        """
+        Возвращает итератор по id книг, изданных в диапазоне годов
+        включительно, в порядке возрастания года и id. Границы диапазона
+        находятся двоичным поиском.
+
+        Args:
+            year_from: Первый год диапазона
+            year_to: Последний год диапазона
+
+        Returns:
+            Итератор по id книг
+        """
+        entries = self.__entries
+        start, stop = self.__bounds(year_from, year_to)
+        return (entries[index][1] for index in range(start, stop))
+
+    def count_in_range(self, year_from: int, year_to: int) -> int:
+        """
+        Возвращает число книг, изданных в диапазоне годов включительно, за
+        время двоичного поиска границ диапазона.
+
+        Args:
+            year_from: Первый год диапазона
+            year_to: Последний год диапазона
+
+        Returns:
+            Число книг
+        """
+        start, stop = self.__bounds(year_from, year_to)
+        return stop - start
+
+    def __bounds(self, year_from: int, year_to: int) -> tuple[int, int]:
+        """Возвращает границы диапазона годов в отсортированных парах."""
+        entries = self.__entries
+        return (bisect.bisect_left(entries, (year_from,)),
+                bisect.bisect_left(entries, (year_to + 1,)))
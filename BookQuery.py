@@ -0,0 +1,367 @@
+﻿from collections.abc import Callable, Iterable
+from operator import attrgetter, eq, ge, gt, le, lt
+from typing import TYPE_CHECKING, NamedTuple
+import re
+import sys
+from Book import Book
+from BookIndexes import YearIndex
+
+if TYPE_CHECKING:
+    from ConsoleLibrary import ConsoleLibrary
+
+
+class Condition(NamedTuple):
+    """
+    Условие запроса на атрибут книги. Значение условия нормализуется, а
+    функция проверки книги компилируется один раз при разборе запроса.
+
+    Attributes:
+        field (str): Атрибут книги ("title", "author", "year", "status")
+        или пустая строка - любой из атрибутов title, author, year
+        operator (str): Оператор (":", "=", "~", ">", ">=", "<", "<=")
+        value (str | int): Нормализованное значение
+        negated (bool): Признак отрицания условия
+        match (Callable[[Book], bool]): Проверяет, удовлетворяет ли книга
+        условию
+    """
+
+    field: str
+    operator: str
+    value: str | int
+    negated: bool
+    match: Callable[[Book], bool]
+
+    def __str__(self) -> str:
+        return ('-' if self.negated else '') + self.field \
+            + (self.operator if self.field else '') + str(self.value)
+
+
+class AccessPath(NamedTuple):
+    """
+    Путь доступа к книгам-кандидатам одной конъюнкции запроса, выбранный
+    планировщиком.
+
+    Attributes:
+        description (str): Описание пути доступа
+        estimate (int): Оценка числа кандидатов
+        fetch (Callable[[], Iterable[int]] | None): Возвращает id
+        кандидатов, None - полный просмотр библиотеки
+        conditions (tuple[Condition, ...]): Условия, которые проверяются для
+        каждого кандидата
+    """
+
+    description: str
+    estimate: int
+    fetch: Callable[[], Iterable[int]] | None
+    conditions: tuple[Condition, ...]
+
+
+class BookQuery():
+    """
+    Класс запроса к библиотеке. Запрос - последовательность условий через
+    пробел, которые должны выполняться одновременно; слово "or" разделяет
+    альтернативы. Условие имеет вид [-]атрибут оператор значение или
+    [-]значение:
+        - title, author: ":" и "~" - значение входит в атрибут, "=" -
+        атрибут равен значению;
+        - year: ":", "=" - год издания равен числу (или содержит/равен
+        строке, если значение не число), "~" - значение входит в год, ">",
+        ">=", "<", "<=" - сравнение года издания с числом;
+        - status: ":", "=" - номер статуса из Book.STATUSES;
+        - значение без атрибута входит в название, автора или год издания;
+        - "-" в начале отрицает условие.
+    Строки сравниваются по ключам поиска книг (см. Book.normalize).
+
+    Запрос разбирается один раз в дерево предикатов - дизъюнкцию
+    конъюнкций условий. Планировщик (plan) для каждой конъюнкции выбирает
+    самый избирательный путь доступа по индексам библиотеки: индекс
+    статусов, хеш-индекс авторов, упорядоченный индекс годов или
+    триграммный индекс подстрок, - и лишь если ни одно условие не сужает
+    поиск, выбирает полный просмотр книг.
+
+    Example:
+        author~Толстой year>=1860 status:0 title~война
+
+    Attributes:
+        alternatives (tuple[tuple[Condition, ...], ...]): Конъюнкции условий
+        OR_KEYWORD (str): Слово, разделяющее альтернативы
+
+    Classes:
+        QuerySyntaxException: Ошибка синтаксиса запроса
+
+    Methods:
+        parse (Callable[[str], BookQuery]): Разбирает запрос
+        matches (Callable[[Book], bool]): Проверяет, удовлетворяет ли книга
+        запросу
+        plan (Callable[[ConsoleLibrary], list[AccessPath]]): Выбирает пути
+        доступа к кандидатам
+    """
+
+    alternatives: tuple[tuple[Condition, ...], ...]
+
+    OR_KEYWORD: str = 'or'
+
+    __TERM: re.Pattern = re.compile(
+        r'(-?)(?:(title|author|year|status)(>=|<=|[:=~<>]))?(.*)',
+        re.DOTALL
+    )
+    __COMPARISONS: dict[str, Callable[[int, int], bool]] = {
+        ':': eq, '=': eq, '>': gt, '>=': ge, '<': lt, '<=': le
+    }
+
+    class QuerySyntaxException(Exception):
+        """Ошибка синтаксиса запроса."""
+
+        def __init__(self, message: str):
+            self.message = f'Ошибка запроса: {message}'
+
+        def __str__(self):
+            return self.message
+
+    def __init__(self, alternatives: tuple[tuple[Condition, ...], ...]):
+        """
+        Инициализирует атрибут alternatives.
+
+        Args:
+            alternatives: Конъюнкции условий
+        """
+        self.alternatives = alternatives
+
+    def __str__(self) -> str:
+        return f' {self.OR_KEYWORD} '.join(
+            ' '.join(str(condition) for condition in conditions)
+            for conditions in self.alternatives
+        )
+
+    @classmethod
+    def parse(cls, text: str) -> 'BookQuery':
+        """
+        Разбирает запрос.
+
+        Args:
+            text: Запрос
+
+        Raises:
+            QuerySyntaxException
+
+        Returns:
+            Запрос
+        """
+        alternatives = [[]]
+        for term in text.split():
+            if term.lower() == cls.OR_KEYWORD:
+                if len(alternatives[-1]) == 0:
+                    raise cls.QuerySyntaxException(
+                        f'"{cls.OR_KEYWORD}" должно стоять между условиями.'
+                    )
+                alternatives.append([])
+            else:
+                alternatives[-1].append(cls.__parse_condition(term))
+        if len(alternatives[-1]) == 0:
+            if len(alternatives) == 1:
+                raise cls.QuerySyntaxException('пустой запрос.')
+            raise cls.QuerySyntaxException(
+                f'"{cls.OR_KEYWORD}" должно стоять между условиями.'
+            )
+        return cls(tuple(tuple(conditions) for conditions in alternatives))
+
+    @classmethod
+    def __parse_condition(cls, term: str) -> Condition:
+        """Разбирает условие и компилирует функцию проверки книги."""
+        negation, field, operator, value = cls.__TERM.fullmatch(term).groups()
+        field, operator = field or '', operator or ''
+        if len(value) == 0:
+            raise cls.QuerySyntaxException(f'не указано значение в "{term}".')
+        if field == 'status':
+            value, match = cls.__compile_status(term, operator, value)
+        elif field == 'year' and (operator in ('>', '>=', '<', '<=')
+                                  or operator in (':', '=')
+                                  and cls.__is_number(value)):
+            value, match = cls.__compile_year(term, operator, value)
+        elif operator in ('', ':', '~'):
+            value = Book.normalize(value)
+            match = cls.__compile_contains(field, value)
+        elif operator == '=':
+            value = ' '.join(Book.normalize(value).split())
+            match = cls.__compile_equals(field, value)
+        else:
+            raise cls.QuerySyntaxException(
+                f'"{term}": сравнение "{operator}" применимо только к year.'
+            )
+        if negation:
+            positive_match = match
+            match = lambda book: not positive_match(book)
+        return Condition(field, operator, value, bool(negation), match)
+
+    @staticmethod
+    def __is_number(value: str) -> bool:
+        """Проверяет, является ли значение целым числом."""
+        try:
+            int(value)
+        except ValueError:
+            return False
+        return True
+
+    @classmethod
+    def __compile_status(
+        cls,
+        term: str,
+        operator: str,
+        value: str
+    ) -> tuple[int, Callable[[Book], bool]]:
+        """Компилирует условие на номер статуса."""
+        if operator not in (':', '=') or not cls.__is_number(value) \
+                or int(value) not in Book.STATUSES:
+            raise cls.QuerySyntaxException(
+                f'"{term}": ожидается status:номер статуса из '
+                f'{list(Book.STATUSES)}.'
+            )
+        status = Book.STATUSES[int(value)]
+        return int(value), lambda book: book.get_status() == status
+
+    @classmethod
+    def __compile_year(
+        cls,
+        term: str,
+        operator: str,
+        value: str
+    ) -> tuple[int, Callable[[Book], bool]]:
+        """Компилирует сравнение года издания с числом."""
+        if not cls.__is_number(value):
+            raise cls.QuerySyntaxException(
+                f'"{term}": год издания сравнивается только с числом.'
+            )
+        year, compare = int(value), cls.__COMPARISONS[operator]
+        parse_year = YearIndex.parse_year
+
+        def match(book: Book) -> bool:
+            book_year = parse_year(book.year)
+            return book_year is not None and compare(book_year, year)
+
+        return year, match
+
+    @staticmethod
+    def __compile_contains(
+        field: str,
+        value: str
+    ) -> Callable[[Book], bool]:
+        """Компилирует условие вхождения значения в атрибут книги."""
+        if field == '':
+            return lambda book: value in book.title_key \
+                or value in book.author_key or value in book.year_key
+        key = attrgetter(f'{field}_key')
+        return lambda book: value in key(book)
+
+    @staticmethod
+    def __compile_equals(field: str, value: str) -> Callable[[Book], bool]:
+        """
+        Компилирует условие равенства атрибута книги значению без учета
+        повторяющихся пробелов.
+        """
+        key = attrgetter(f'{field}_key')
+        return lambda book: ' '.join(key(book).split()) == value
+
+    def matches(self, book: Book) -> bool:
+        """
+        Проверяет, удовлетворяет ли книга запросу.
+
+        Args:
+            book: Книга
+
+        Returns:
+            True, если книга удовлетворяет одной из конъюнкций условий
+        """
+        return any(
+            all(condition.match(book) for condition in conditions)
+            for conditions in self.alternatives
+        )
+
+    def plan(self, library: 'ConsoleLibrary') -> list[AccessPath]:
+        """
+        Выбирает для каждой конъюнкции условий путь доступа с наименьшей
+        оценкой числа кандидатов среди путей по индексам ее условий без
+        отрицания, при равной оценке - путь с меньшим числом проверяемых
+        условий. Если индексы не сужают поиск, выбирается полный
+        просмотр. Индексы библиотеки должны быть построены.
+
+        Args:
+            library: Библиотека
+
+        Returns:
+            Пути доступа в порядке конъюнкций
+        """
+        paths = []
+        for conditions in self.alternatives:
+            best_path = AccessPath(
+                'полный просмотр',
+                len(library.books),
+                None,
+                conditions
+            )
+            for condition in conditions:
+                path = self.__index_path(condition, conditions, library)
+                if path is None:
+                    continue
+                if best_path.fetch is None \
+                        or (path.estimate, len(path.conditions)) \
+                        < (best_path.estimate, len(best_path.conditions)):
+                    best_path = path
+            paths.append(best_path)
+        return paths
+
+    @staticmethod
+    def __index_path(
+        condition: Condition,
+        conditions: tuple[Condition, ...],
+        library: 'ConsoleLibrary'
+    ) -> AccessPath | None:
+        """
+        Возвращает путь доступа по индексу для условия или None, если
+        индекс не может его использовать. Остальные условия конъюнкции
+        проверяются для каждого кандидата.
+        """
+        if condition.negated:
+            return None
+        field, operator, value = condition[:3]
+        rest = tuple(other for other in conditions if other is not condition)
+        if field == 'status':
+            ids = library.status_index.ids(value)
+            return AccessPath(
+                f'индекс статусов ({condition})',
+                len(ids),
+                lambda: ids,
+                rest
+            )
+        if field == 'author' and operator == '=':
+            ids = library.author_index.ids(value)
+            return AccessPath(
+                f'индекс авторов ({condition})',
+                len(ids),
+                lambda: ids,
+                rest
+            )
+        if field == 'year' and isinstance(value, int):
+            year_from, year_to = -sys.maxsize, sys.maxsize
+            if operator in (':', '=', '>=', '>'):
+                year_from = value + (operator == '>')
+            if operator in (':', '=', '<=', '<'):
+                year_to = value - (operator == '<')
+            year_index = library.year_index
+            return AccessPath(
+                f'индекс годов ({condition})',
+                year_index.count_in_range(year_from, year_to),
+                lambda: year_index.ids_in_range(year_from, year_to),
+                # Книги без числа в годе издания в индекс не попадают, а
+                # условие на них не выполняется, поэтому оно не проверяется
+                rest
+            )
+        estimate = library.trigram_index.estimate(value)
+        if estimate is None:
+            return None
+        trigram_index = library.trigram_index
+        return AccessPath(
+            f'триграммный индекс ({condition})',
+            estimate,
+            lambda: trigram_index.candidates(value),
+            conditions
+        )
@@ -0,0 +1,231 @@
+﻿from array import array
+from collections.abc import Mapping, Sequence
+from typing import BinaryIO
+import mmap
+import os
+import struct
+import sys
+from Book import Book
+from LazyBookStore import LazyBookStore
+
+
+class BookSnapshot():
+    """
+    Класс двоичного снимка библиотеки, открываемого через mmap. Формат
+    файла (все числа - little-endian):
+        1) заголовок HEADER: сигнатура MAGIC, версия VERSION, резерв, число
+        книг count;
+        2) таблица id книг: count чисел int64 по возрастанию;
+        3) таблица смещений записей книг от начала файла: count чисел
+        uint64 в том же порядке;
+        4) записи книг: RECORD_HEADER (номер статуса, длины названия,
+        автора и года издания в байтах), затем сами строки в utf-8.
+    Открытие снимка не читает записи: таблица id используется напрямую из
+    отображенной памяти, книга декодируется из своей записи при первом
+    обращении, см. LazyBookStore. Пустой файл считается снимком пустой
+    библиотеки.
+
+    Attributes:
+        __file (BinaryIO): Открытый файл снимка
+        __mmap (mmap.mmap | None): Отображение файла в память
+        __memory (memoryview | None): Память отображения
+        __ids (Sequence[int]): id книг по номерам записей
+        __offsets (Sequence[int]): Смещения записей книг
+        MAGIC (bytes): Сигнатура файла снимка
+        VERSION (int): Версия формата
+        HEADER (struct.Struct): Формат заголовка
+        RECORD_HEADER (struct.Struct): Формат заголовка записи книги
+
+    Classes:
+        MalformedSnapshotException: Ошибка некорректного файла снимка
+
+    Methods:
+        write (Callable[[str, Mapping[int, Book]], None]): Записывает снимок
+        библиотеки в файл
+        get_ids (Callable[[], Sequence[int]]): Возвращает id книг по номерам
+        записей
+        decode (Callable[[int], Book]): Декодирует книгу по номеру записи
+        open_store (Callable[[], LazyBookStore]): Возвращает ленивое
+        хранилище книг снимка
+        close (Callable[[], None]): Закрывает снимок
+    """
+
+    __file: BinaryIO
+    __mmap: mmap.mmap | None
+    __memory: memoryview | None
+    __ids: Sequence[int]
+    __offsets: Sequence[int]
+
+    MAGIC: bytes = b'LCSB'
+    VERSION: int = 1
+    HEADER: struct.Struct = struct.Struct('<4sHHQ')
+    RECORD_HEADER: struct.Struct = struct.Struct('<BIII')
+
+    class MalformedSnapshotException(Exception):
+        """Ошибка некорректного файла снимка."""
+
+        message = 'Ошибка: некорректный файл снимка библиотеки.'
+
+        def __str__(self):
+            return self.message
+
+    def __init__(self, file_path: str):
+        """
+        Открывает файл снимка и проверяет его заголовок и таблицы.
+
+        Args:
+            file_path: Путь до файла снимка
+
+        Raises:
+            MalformedSnapshotException
+        """
+        self.__file = open(file_path, 'rb')
+        self.__mmap = None
+        self.__memory = None
+        self.__ids = ()
+        self.__offsets = ()
+        try:
+            if os.fstat(self.__file.fileno()).st_size > 0:
+                self.__map()
+        except BaseException:
+            self.close()
+            raise
+
+    def __map(self) -> None:
+        """Отображает файл в память и разбирает заголовок и таблицы."""
+        self.__mmap = mmap.mmap(
+            self.__file.fileno(),
+            0,
+            access=mmap.ACCESS_READ
+        )
+        self.__memory = memoryview(self.__mmap)
+        if len(self.__memory) < self.HEADER.size:
+            raise self.MalformedSnapshotException
+        magic, version, _, count = self.HEADER.unpack_from(self.__memory)
+        ids_end = self.HEADER.size + 8 * count
+        offsets_end = ids_end + 8 * count
+        if magic != self.MAGIC or version != self.VERSION \
+                or offsets_end > len(self.__memory):
+            raise self.MalformedSnapshotException
+        self.__ids = self.__table(self.HEADER.size, ids_end, 'q')
+        self.__offsets = self.__table(ids_end, offsets_end, 'Q')
+
+    def __table(self, start: int, end: int, typecode: str) -> Sequence[int]:
+        """
+        Возвращает таблицу чисел снимка. На little-endian платформах
+        таблица читается прямо из отображенной памяти без копирования.
+        """
+        if sys.byteorder == 'little':
+            return self.__memory[start:end].cast(typecode)
+        table = array(typecode, self.__memory[start:end])
+        table.byteswap()
+        return table
+
+    @classmethod
+    def write(cls, file_path: str, books: Mapping[int, Book]) -> None:
+        """
+        Записывает снимок библиотеки в файл через временный файл, поэтому
+        сбой во время записи не повреждает прежний снимок. Книги
+        записываются в порядке возрастания id.
+
+        Args:
+            file_path: Путь до файла снимка
+            books: Книги библиотеки
+
+        Returns:
+            None
+        """
+        ids = array('q', sorted(books))
+        offsets = array('Q')
+        offset = cls.HEADER.size + 16 * len(ids)
+        temp_file_path = file_path + '.tmp'
+        with open(temp_file_path, 'wb') as f:
+            f.seek(offset)
+            for id in ids:
+                book = books[id]
+                title = book.title.encode('utf-8')
+                author = book.author.encode('utf-8')
+                year = book.year.encode('utf-8')
+                record = cls.RECORD_HEADER.pack(
+                    Book.STATUS_CODES[book.get_status()],
+                    len(title),
+                    len(author),
+                    len(year)
+                ) + title + author + year
+                f.write(record)
+                offsets.append(offset)
+                offset += len(record)
+            if sys.byteorder != 'little':
+                ids.byteswap()
+                offsets.byteswap()
+            f.seek(0)
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(ids)))
+            f.write(ids.tobytes())
+            f.write(offsets.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file_path, file_path)
+
+    def get_ids(self) -> Sequence[int]:
+        """Возвращает id книг по номерам записей (по возрастанию)."""
+        return self.__ids
+
+    def decode(self, position: int) -> Book:
+        """
+        Декодирует книгу по номеру записи.
+
+        Args:
+            position: Номер записи
+
+        Raises:
+            MalformedSnapshotException
+
+        Returns:
+            Книга с сохраненным id и статусом
+        """
+        offset = self.__offsets[position]
+        memory = self.__memory
+        try:
+            status_code, title_length, author_length, year_length = \
+                self.RECORD_HEADER.unpack_from(memory, offset)
+            title_start = offset + self.RECORD_HEADER.size
+            author_start = title_start + title_length
+            year_start = author_start + author_length
+            year_end = year_start + year_length
+            if year_end > len(memory):
+                raise self.MalformedSnapshotException
+            book = Book(
+                str(memory[title_start:author_start], 'utf-8'),
+                str(memory[author_start:year_start], 'utf-8'),
+                str(memory[year_start:year_end], 'utf-8'),
+                id=self.__ids[position]
+            )
+            book.set_status(status_code)
+        except (struct.error, UnicodeDecodeError, 
+                Book.EmptyBookAttributeException, 
+                Book.IncorrectBookStatusException):
+            raise self.MalformedSnapshotException
+        return book
+
+    def open_store(self) -> LazyBookStore:
+        """
+        Возвращает ленивое хранилище книг снимка. Хранилище закрывает снимок
+        при своем закрытии.
+        """
+        return LazyBookStore(self.__ids, self.decode, close=self.close)
+
+    def close(self) -> None:
+        """Закрывает снимок, освобождая отображение файла в память."""
+        if isinstance(self.__ids, memoryview):
+            self.__ids.release()
+        if isinstance(self.__offsets, memoryview):
+            self.__offsets.release()
+        self.__ids = ()
+        self.__offsets = ()
+        if self.__memory is not None:
+            self.__memory.release()
+            self.__memory = None
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+        self.__file.close()
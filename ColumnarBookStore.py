@@ -0,0 +1,261 @@
+﻿from array import array
+from collections.abc import Iterator, MutableMapping
+import sys
+from Book import Book
+
+
+class BookView():
+    """
+    Класс легковесного представления книги, хранящейся в ColumnarBookStore.
+    Создается по запросу и не хранит атрибутов книги, а читает и пишет их в
+    столбцы хранилища. Поддерживает тот же интерфейс, что и Book. Ключи
+    поиска читаются из столбцов ключей, вычисленных при записи книги в
+    хранилище, поэтому цикл поиска не нормализует строки.
+
+    Attributes:
+        __store (ColumnarBookStore): Хранилище книги
+        __id (int): id книги
+        title (str): Название
+        author (str): Автор
+        year (str): Год издания
+        title_key (str): Нормализованное название, см. Book.normalize
+        author_key (str): Нормализованный автор
+        year_key (str): Нормализованный год издания
+
+    Methods:
+        get_id (Callable[[], int]): Возвращает id книги
+        get_status (Callable[[], str]): Возвращает статус книги
+        set_status (Callable[[int], None]): Устанавливает статус книги
+    """
+
+    __slots__ = ('__store', '__id')
+
+    def __init__(self, store: 'ColumnarBookStore', id: int):
+        """
+        Инициализирует атрибуты __store, __id.
+
+        Args:
+            store: Хранилище книги
+            id: id книги
+        """
+        self.__store = store
+        self.__id = id
+
+    @property
+    def title(self) -> str:
+        return self.__store.get_column_value(self.__id, 'title')
+
+    @title.setter
+    def title(self, title: str) -> None:
+        self.__store.set_column_value(self.__id, 'title', title)
+
+    @property
+    def author(self) -> str:
+        return self.__store.get_column_value(self.__id, 'author')
+
+    @author.setter
+    def author(self, author: str) -> None:
+        self.__store.set_column_value(self.__id, 'author', author)
+
+    @property
+    def year(self) -> str:
+        return self.__store.get_column_value(self.__id, 'year')
+
+    @year.setter
+    def year(self, year: str) -> None:
+        self.__store.set_column_value(self.__id, 'year', year)
+
+    @property
+    def title_key(self) -> str:
+        return self.__store.get_column_value(self.__id, 'title_key')
+
+    @property
+    def author_key(self) -> str:
+        return self.__store.get_column_value(self.__id, 'author_key')
+
+    @property
+    def year_key(self) -> str:
+        return self.__store.get_column_value(self.__id, 'year_key')
+
+    def get_id(self) -> int:
+        """Возвращает id книги."""
+        return self.__id
+
+    def get_status(self) -> str:
+        """Возвращает статус книги."""
+        return Book.STATUSES[
+            self.__store.get_column_value(self.__id, 'status')
+        ]
+
+    def set_status(self, status_code: int) -> None:
+        """
+        Устанавливает статус книги по его номеру.
+
+        Args:
+            status_code: номер статуса из Book.STATUSES
+
+        Raises:
+            Book.IncorrectBookStatusException
+
+        Returns:
+            None
+        """
+        if status_code >= len(Book.STATUSES):
+            raise Book.IncorrectBookStatusException
+        self.__store.set_column_value(self.__id, 'status', status_code)
+
+
+class ColumnarBookStore(MutableMapping):
+    """
+    Класс столбцового хранилища книг, заменяющего dict[int, Book] в
+    ConsoleLibrary.books. Книги хранятся в параллельных массивах: id - в
+    array('q'), статусы - в bytearray номерами из Book.STATUSES, названия,
+    авторы и годы издания и их ключи поиска (см. Book.normalize) - в
+    списках интернированных строк, поэтому повторяющиеся авторы и годы
+    хранятся в одном экземпляре, а ключ, совпадающий со строкой, не
+    занимает памяти сверх ссылки. Ключи вычисляются один раз при записи
+    книги (берутся у нее) или изменении атрибута. Книги выдаются
+    в виде BookView. Удаленные строки помечаются id = -1 и вычищаются, когда
+    их становится больше половины.
+
+    Attributes:
+        __ids (array): id книг
+        __statuses (bytearray): Номера статусов книг
+        __columns (dict[str, list[str]]): Столбцы названий, авторов и годов
+        издания и их ключей поиска
+        __rows (dict[int, int]): Номера строк книг по id
+        __deleted_rows (int): Число удаленных строк
+
+    Methods:
+        get_column_value (Callable[[int, str], str | int]): Возвращает
+        значение столбца книги
+        set_column_value (Callable[[int, str, str | int], None]):
+        Устанавливает значение столбца книги
+    """
+
+    __ids: array
+    __statuses: bytearray
+    __columns: dict[str, list[str]]
+    __rows: dict[int, int]
+    __deleted_rows: int
+
+    __TEXT_COLUMNS: tuple[str, ...] = (
+        'title', 'author', 'year', 'title_key', 'author_key', 'year_key'
+    )
+    __DELETED_ID: int = -1
+
+    def __init__(self, books: dict[int, Book] = None):
+        """
+        Инициализирует столбцы хранилища.
+
+        Args:
+            books: Книги для начального наполнения хранилища
+        """
+        self.clear()
+        if books is not None:
+            self.update(books)
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self.__rows
+
+    def __iter__(self) -> Iterator[int]:
+        deleted_id = self.__DELETED_ID
+        for id in self.__ids:
+            if id != deleted_id:
+                yield id
+
+    def __getitem__(self, id: int) -> BookView:
+        if id not in self.__rows:
+            raise KeyError(id)
+        return BookView(self, id)
+
+    def __setitem__(self, id: int, book: Book) -> None:
+        status_code = Book.STATUS_CODES[book.get_status()]
+        values = [sys.intern(getattr(book, name))
+                  for name in self.__TEXT_COLUMNS]
+        row = self.__rows.get(id)
+        if row is None:
+            self.__rows[id] = len(self.__ids)
+            self.__ids.append(id)
+            self.__statuses.append(status_code)
+            for name, value in zip(self.__TEXT_COLUMNS, values):
+                self.__columns[name].append(value)
+            return
+        self.__statuses[row] = status_code
+        for name, value in zip(self.__TEXT_COLUMNS, values):
+            self.__columns[name][row] = value
+
+    def __delitem__(self, id: int) -> None:
+        row = self.__rows.pop(id)
+        self.__ids[row] = self.__DELETED_ID
+        for name in self.__TEXT_COLUMNS:
+            self.__columns[name][row] = ''
+        self.__deleted_rows += 1
+        if self.__deleted_rows > len(self.__ids) // 2:
+            self.__compact()
+
+    def clear(self) -> None:
+        """Удаляет все книги из хранилища."""
+        self.__ids = array('q')
+        self.__statuses = bytearray()
+        self.__columns = {name: [] for name in self.__TEXT_COLUMNS}
+        self.__rows = {}
+        self.__deleted_rows = 0
+
+    def get_column_value(self, id: int, name: str) -> str | int:
+        """
+        Возвращает значение столбца книги.
+
+        Args:
+            id: id книги
+            name: Название столбца ("title", "author", "year", "status")
+
+        Raises:
+            KeyError: Книги нет в хранилище
+
+        Returns:
+            Значение столбца, для "status" - номер статуса
+        """
+        row = self.__rows[id]
+        if name == 'status':
+            return self.__statuses[row]
+        return self.__columns[name][row]
+
+    def set_column_value(self, id: int, name: str, value: str | int) -> None:
+        """
+        Устанавливает значение столбца книги. Для названия, автора и года 
+        издания пересчитывает ключ поиска.
+
+        Args:
+            id: id книги
+            name: Название столбца ("title", "author", "year", "status")
+            value: Значение столбца, для "status" - номер статуса
+
+        Raises:
+            KeyError: Книги нет в хранилище
+
+        Returns:
+            None
+        """
+        row = self.__rows[id]
+        if name == 'status':
+            self.__statuses[row] = value
+        else:
+            self.__columns[name][row] = sys.intern(value)
+            self.__columns[f'{name}_key'][row] = \
+                sys.intern(Book.normalize(value))
+
+    def __compact(self) -> None:
+        """Вычищает удаленные строки, сохраняя порядок книг."""
+        rows = [row for row, id in enumerate(self.__ids)
+                if id != self.__DELETED_ID]
+        self.__ids = array('q', (self.__ids[row] for row in rows))
+        self.__statuses = bytearray(self.__statuses[row] for row in rows)
+        for name in self.__TEXT_COLUMNS:
+            column = self.__columns[name]
+            self.__columns[name] = [column[row] for row in rows]
+        self.__rows = {id: row for row, id in enumerate(self.__ids)}
+        self.__deleted_rows = 0
@@ -0,0 +1,249 @@
+﻿from collections.abc import Iterator
+import json
+import os
+import threading
+import time
+
+
+class LatencyHistogram():
+    """
+    Класс гистограммы задержек с логарифмическими корзинами: корзина номер k
+    содержит задержки от 2^(k-1) до 2^k наносекунд. Перцентили оцениваются
+    верхней границей корзины, поэтому ошибка не превышает двух раз при
+    постоянной памяти и времени записи.
+
+    Attributes:
+        buckets (list[int]): Число задержек в корзинах
+        count (int): Число записанных задержек
+        total (int): Сумма записанных задержек в наносекундах
+        BUCKETS_COUNT (int): Число корзин
+
+    Methods:
+        add (Callable[[int], None]): Записывает задержку
+        percentile (Callable[[float], int]): Возвращает оценку перцентиля
+    """
+
+    buckets: list[int]
+    count: int
+    total: int
+
+    BUCKETS_COUNT: int = 64
+
+    def __init__(self):
+        """Инициализирует пустую гистограмму."""
+        self.buckets = [0] * self.BUCKETS_COUNT
+        self.count = 0
+        self.total = 0
+
+    def add(self, latency: int) -> None:
+        """
+        Записывает задержку.
+
+        Args:
+            latency: Задержка в наносекундах
+
+        Returns:
+            None
+        """
+        self.buckets[min(latency.bit_length(), self.BUCKETS_COUNT - 1)] += 1
+        self.count += 1
+        self.total += latency
+
+    def percentile(self, fraction: float) -> int:
+        """
+        Возвращает оценку перцентиля задержек.
+
+        Args:
+            fraction: Доля от 0 до 1, например 0.99
+
+        Returns:
+            Верхняя граница корзины перцентиля в наносекундах или 0 для
+            пустой гистограммы
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return (1 << bucket) - 1
+        return (1 << (self.BUCKETS_COUNT - 1)) - 1
+
+
+class CommandStats():
+    """
+    Класс статистики выполнения команд консоли: для каждой команды хранит
+    число вызовов и ошибок, суммарное время этапов разбора, приведения
+    аргументов и выполнения и гистограмму полного времени выполнения.
+    Может периодически записывать статистику в json-файл.
+
+    Attributes:
+        __lock (threading.Lock): Блокировка записи статистики из потоков
+        __calls (dict[str, int]): Число вызовов команд
+        __errors (dict[str, int]): Число ошибок выполнения команд
+        __phases (dict[str, list[int]]): Суммарное время этапов разбора,
+        приведения аргументов и выполнения команд в наносекундах
+        __histograms (dict[str, LatencyHistogram]): Гистограммы полного
+        времени выполнения команд
+        __start_time (float): Время начала сбора статистики
+        __dump_path (str | None): Путь до файла периодической записи
+        статистики
+        __dump_interval (float): Период записи статистики в секундах
+        __next_dump_time (float): Время следующей записи статистики
+        UNKNOWN_COMMAND (str): Имя, под которым учитываются
+        незарегистрированные команды
+
+    Methods:
+        record (Callable[[str, int, int, int, bool], None]): Записывает
+        выполнение команды
+        print_stats (Callable[[], None]): Печатает статистику команд
+        to_dict (Callable[[], dict]): Возвращает статистику в виде словаря
+        dump (Callable[[], None]): Записывает статистику в файл
+    """
+
+    __lock: threading.Lock
+    __calls: dict[str, int]
+    __errors: dict[str, int]
+    __phases: dict[str, list[int]]
+    __histograms: dict[str, LatencyHistogram]
+    __start_time: float
+    __dump_path: str | None
+    __dump_interval: float
+    __next_dump_time: float
+
+    UNKNOWN_COMMAND: str = '<unknown>'
+
+    def __init__(self, dump_path: str | None = None, dump_interval: float = 60):
+        """
+        Инициализирует пустую статистику.
+
+        Args:
+            dump_path: Путь до файла периодической записи статистики, None -
+            не записывать
+            dump_interval: Период записи статистики в секундах
+        """
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.__errors = {}
+        self.__phases = {}
+        self.__histograms = {}
+        self.__start_time = time.monotonic()
+        self.__dump_path = dump_path
+        self.__dump_interval = dump_interval
+        self.__next_dump_time = self.__start_time + dump_interval
+
+    def record(
+        self,
+        command: str,
+        parse_time: int,
+        cast_time: int,
+        execute_time: int,
+        failed: bool
+    ) -> None:
+        """
+        Записывает выполнение команды и, если подошло время, записывает
+        статистику в файл.
+
+        Args:
+            command: Название команды
+            parse_time: Время разбора строки-команды в наносекундах
+            cast_time: Время приведения аргументов в наносекундах
+            execute_time: Время выполнения функции команды в наносекундах
+            failed: Признак ошибки выполнения
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            if command not in self.__calls:
+                self.__calls[command] = 0
+                self.__errors[command] = 0
+                self.__phases[command] = [0, 0, 0]
+                self.__histograms[command] = LatencyHistogram()
+            self.__calls[command] += 1
+            self.__errors[command] += failed
+            phases = self.__phases[command]
+            phases[0] += parse_time
+            phases[1] += cast_time
+            phases[2] += execute_time
+            self.__histograms[command].add(
+                parse_time + cast_time + execute_time
+            )
+            if self.__dump_path is None \
+                    or time.monotonic() < self.__next_dump_time:
+                return
+            self.__next_dump_time = time.monotonic() + self.__dump_interval
+        self.dump()
+
+    def to_dict(self) -> dict:
+        """
+        Возвращает статистику в виде словаря: время сбора статистики в
+        секундах и для каждой команды число вызовов и ошибок, пропускную
+        способность, среднее время этапов и перцентили полного времени
+        выполнения в микросекундах.
+        """
+        with self.__lock:
+            elapsed_time = time.monotonic() - self.__start_time
+            return {
+                'elapsed_time': elapsed_time,
+                'commands': {
+                    command: self.__command_to_dict(command, elapsed_time)
+                    for command in self.__calls
+                }
+            }
+
+    def __command_to_dict(self, command: str, elapsed_time: float) -> dict:
+        """Возвращает статистику команды в виде словаря."""
+        calls = self.__calls[command]
+        parse_time, cast_time, execute_time = self.__phases[command]
+        histogram = self.__histograms[command]
+        return {
+            'calls': calls,
+            'errors': self.__errors[command],
+            'throughput': calls / max(elapsed_time, 1e-9),
+            'parse_us': parse_time / calls / 1000,
+            'cast_us': cast_time / calls / 1000,
+            'execute_us': execute_time / calls / 1000,
+            'p50_us': histogram.percentile(0.5) / 1000,
+            'p90_us': histogram.percentile(0.9) / 1000,
+            'p99_us': histogram.percentile(0.99) / 1000,
+            'histogram': {
+                f'<{(1 << bucket) / 1000:g}us': bucket_count
+                for bucket, bucket_count in enumerate(histogram.buckets)
+                if bucket_count > 0
+            }
+        }
+
+    def print_stats(self) -> None:
+        """
+        Печатает для каждой команды число вызовов и ошибок, среднее время
+        этапов разбора, приведения аргументов и выполнения и перцентили
+        полного времени выполнения в микросекундах.
+        """
+        stats = self.to_dict()
+        print(f'Статистика за {stats["elapsed_time"]:.1f} с:')
+        print(''.join(self.__format_rows(stats['commands'])), end='')
+
+    def __format_rows(self, commands: dict[str, dict]) -> Iterator[str]:
+        """Возвращает строки таблицы статистики команд."""
+        yield (f'{"команда":<26}{"вызовов":>9}{"ошибок":>8}{"разбор":>9}'
+               f'{"приведение":>11}{"выполнение":>12}{"p50":>10}{"p99":>10}\n')
+        for command, stats in commands.items():
+            yield (f'{command:<26}{stats["calls"]:>9}{stats["errors"]:>8}'
+                   f'{stats["parse_us"]:>9.1f}{stats["cast_us"]:>11.1f}'
+                   f'{stats["execute_us"]:>12.1f}{stats["p50_us"]:>10.1f}'
+                   f'{stats["p99_us"]:>10.1f}\n')
+
+    def dump(self) -> None:
+        """
+        Записывает статистику в json-файл по пути периодической записи.
+        Файл заменяется целиком, чтобы читатель не увидел его частично
+        записанным.
+        """
+        if self.__dump_path is None:
+            return
+        temp_path = self.__dump_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, self.__dump_path)
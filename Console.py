@@ -1,10 +1,37 @@
 ﻿from argparse import ArgumentTypeError
 from collections.abc import Callable
 from types import NoneType
-from typing import Any
+from typing import Any, NamedTuple, NoReturn, TextIO
 from Singleton import Singleton
-from inspect import signature
+from CommandStats import CommandStats
+from inspect import Parameter, signature
+import contextlib
+import io
 import itertools
+import sys
+import time
+
+
+class CompiledCommand(NamedTuple):
+    """
+    Скомпилированная при регистрации команда консоли.
+
+    Attributes:
+        func (Callable[[Any], Any]): Функция для вызова по команде
+        arity (int): Число аргументов функции без *args
+        min_arity (int): Число обязательных аргументов функции (без значений
+        по умолчанию)
+        converters (tuple[Callable[[str], Any], ...]): Функции приведения 
+        переданных аргументов к типам аргументов функции
+        variadic (bool): Признак того, что функция принимает *args: 
+        аргументы сверх arity приводятся последней функцией приведения
+    """
+
+    func: Callable[[Any], Any]
+    arity: int
+    min_arity: int
+    converters: tuple[Callable[[str], Any], ...]
+    variadic: bool = False
 
 
 class Console(metaclass=Singleton):
@@ -14,29 +41,68 @@ class Console(metaclass=Singleton):
     Attributes:
         __commands (dict[str, tuple[Callable[[Any], Any], str]]): 
         Зарегистрированные команды
+        __compiled_commands (dict[str, CompiledCommand]): Скомпилированные 
+        команды
+        __stats (CommandStats | None): Статистика выполнения команд, None - 
+        сбор статистики отключен
+        CONVERTERS (dict[type | str, Callable[[str], Any]]): Функции 
+        приведения аргументов по аннотациям типов
+        BATCH_READ_SIZE (int): Размер блока чтения команд в пакетном режиме в
+        байтах
+        BATCH_OUTPUT_SIZE (int): Размер буфера вывода в пакетном режиме в 
+        символах
         
     Methods:
         register_command (Callable[[str, Callable[[Any], Any], str], None]): 
         Регистрирует команду
+        unregister_command (Callable[[str], None]): Удаляет команду
         print_commands (Callable[[], None]): Печатает все зарегистрированные
         команды
         parse_command (Callable[[str], tuple[str, list[str]]]): Разбирает ввод 
         с консоли на команду и аргументы
         cast (Callable[[str, Any], Any]): Приводит аргумент к int, str или
         float
+        compile_command (Callable[[Callable[[Any], Any]], CompiledCommand]):
+        Компилирует функцию команды
+        execute (Callable[[str], bool]): Выполняет строку-команду и печатает 
+        ошибку выполнения
+        dispatch (Callable[[str], str | None]): Выполняет строку-команду и 
+        возвращает ошибку выполнения
+        enable_stats (Callable[[str | None, float], None]): Включает сбор 
+        статистики выполнения команд и регистрирует команду "stats"
+        disable_stats (Callable[[], None]): Отключает сбор статистики 
+        выполнения команд
+        get_stats (Callable[[], CommandStats | None]): Возвращает статистику
+        выполнения команд
         start (Callable[[], None]): Запускает бесконечный цикл ввода-вывода 
         консоли
+        run_batch (Callable[[TextIO, bool], None]): Выполняет команды из 
+        файла без интерактивного ввода
     """
 
     __commands: dict[str, tuple[Callable[[Any], Any], str]]
+    __compiled_commands: dict[str, CompiledCommand]
+    __stats: CommandStats | None
+
+    BATCH_READ_SIZE: int = 1 << 20
+    BATCH_OUTPUT_SIZE: int = 1 << 20
+
+    CONVERTERS: dict[type | str, Callable[[str], Any]] = {
+        int: int, 
+        str: str, 
+        float: float, 
+        'int': int, 
+        'str': str, 
+        'float': float
+    }
 
     def __init__(
         self, 
         commands: dict[str, tuple[Callable[[Any], Any], str]] = None
     ):
         """
-        Инициализирует атрибут __commands. Регистрирует команду "help" для 
-        печати списка всех доступных команд.
+        Инициализирует атрибуты __commands, __compiled_commands, __stats. 
+        Регистрирует команду "help" для печати списка всех доступных команд.
         
         Args: 
             commands: Команды для начальной регистрации
@@ -45,6 +111,8 @@ class Console(metaclass=Singleton):
             self.__commands = commands
         else:
             self.__commands = {}
+        self.__compiled_commands = {}
+        self.__stats = None
         self.register_command(
             'help', 
             self.print_commands, 
@@ -59,7 +127,8 @@ class Console(metaclass=Singleton):
     ) -> None:
         """
         Регистрирует команду. При регистрации команды с одинаковым названием
-        перезапишет старую команду.
+        перезапишет старую команду. Сигнатура функции разбирается один раз 
+        при регистрации, см. compile_command.
 
         Args:
             name: Название команды
@@ -75,6 +144,20 @@ class Console(metaclass=Singleton):
         if len(name) == 0:
             raise ValueError('Command name cannot be empty string.')
         self.__commands[name] = (func, description)
+        self.__compiled_commands[name] = self.compile_command(func)
+
+    def unregister_command(self, name: str) -> None:
+        """
+        Удаляет команду. Незарегистрированное название пропускается.
+
+        Args:
+            name: Название команды
+
+        Returns:
+            None
+        """
+        self.__commands.pop(name, None)
+        self.__compiled_commands.pop(name, None)
 
     def print_commands(self) -> None:
         """Печатает все зарегистрированные команды."""
@@ -119,59 +202,296 @@ class Console(metaclass=Singleton):
         elif type_to_cast == 'float':
             return float(arg)
 
-    def start(self) -> None:
+    def compile_command(self, func: Callable[[Any], Any]) -> CompiledCommand:
+        """
+        Компилирует функцию команды: разбирает ее сигнатуру и подбирает для 
+        каждого аргумента функцию приведения по аннотации типа. Аргументы 
+        без аннотации передаются строками, аргументы с аннотацией, отличной 
+        от int, str или float, не могут быть приведены. Функция с *args 
+        принимает любое число аргументов сверх остальных.
+
+        Args:
+            func: Функция для вызова по команде
+
+        Returns:
+            Скомпилированная команда
+        """
+        func_args = signature(func).parameters.values()
+        variadic = any(func_arg.kind is Parameter.VAR_POSITIONAL
+                       for func_arg in func_args)
+        return CompiledCommand(
+            func, 
+            len(func_args) - variadic, 
+            sum(func_arg.default is Parameter.empty 
+                and func_arg.kind is not Parameter.VAR_POSITIONAL 
+                for func_arg in func_args),
+            tuple(self.__get_converter(func_arg) for func_arg in func_args),
+            variadic
+        )
+
+    def __get_converter(self, func_arg: Parameter) -> Callable[[str], Any]:
+        """Возвращает функцию приведения аргумента по его аннотации."""
+        if func_arg.annotation is Parameter.empty:
+            return str
+        converter = self.CONVERTERS.get(func_arg.annotation)
+        if converter is not None:
+            return converter
+        return self.__reject_argument
+
+    @staticmethod
+    def __reject_argument(arg: str) -> NoReturn:
+        """Функция приведения аргумента неподдерживаемого типа."""
+        raise ArgumentTypeError('Ошибка: не удалось привести тип аргумента.')
+
+    def enable_stats(
+        self, 
+        dump_path: str | None = None, 
+        dump_interval: float = 60
+    ) -> None:
+        """
+        Включает сбор статистики выполнения команд: dispatch замеряет время 
+        разбора, приведения аргументов и выполнения каждой команды. 
+        Регистрирует команду "stats" для печати статистики. Пока сбор 
+        статистики не включен, dispatch не делает замеров.
+
+        Args:
+            dump_path: Путь до json-файла периодической записи статистики, 
+            None - не записывать
+            dump_interval: Период записи статистики в секундах
+
+        Returns:
+            None
         """
-        Запускает бесконечный цикл ввода-вывода консоли:
-            1) ожидает ввода пользователя;
-            2) разбирает ввод на команду и аргументы (печатает 
+        self.__stats = CommandStats(dump_path, dump_interval)
+        self.register_command(
+            'stats', 
+            self.__stats.print_stats,
+            'Выводит число вызовов, ошибок и время выполнения команд.'
+        )
+
+    def disable_stats(self) -> None:
+        """Отключает сбор статистики и удаляет команду "stats"."""
+        self.__stats = None
+        self.unregister_command('stats')
+
+    def get_stats(self) -> CommandStats | None:
+        """Возвращает статистику выполнения команд или None."""
+        return self.__stats
+
+    def execute(self, command_line: str) -> bool:
+        """
+        Выполняет строку-команду (см. dispatch) и печатает ошибку выполнения,
+        если она возникла.
+
+        Args:
+            command_line: Строка-команда с аргументами
+
+        Returns:
+            False в случае ошибки выполнения, иначе True
+        """
+        error = self.dispatch(command_line)
+        if error is not None:
+            print(error)
+            return False
+        return True
+
+    def dispatch(self, command_line: str) -> str | None:
+        """
+        Выполняет строку-команду:
+            1) разбирает ее на команду и аргументы (ошибка 
             "Ошибка: неизвестная команда." в случае незарегистрированной 
             команды);
-            3) получает сигнатуру соответствующей команде функции (печатает
-            "Ошибка: {command} принимает {len(func_args)} аргументов, но 
-            передано {len(given_args)}." в случае несовпадения числа требуемых
-            и переданных аргументов);
-            4) приводит переданные аргументы к соответствующим типам требуемых 
-            аргументов (печатает "Ошибка: не удалось привести тип аргумента." в 
-            случае неудачи приведения типа);
-            5) вызывает соответствующую команде функцию с приведенными 
+            2) сверяет число переданных аргументов с числом аргументов 
+            скомпилированной команды, аргументы со значениями по умолчанию 
+            можно не передавать, а в *args можно передать любое число 
+            аргументов (ошибка "Ошибка: {command} принимает
+            {arity} аргументов, но передано {len(given_args)}." в случае 
+            несовпадения);
+            3) приводит переданные аргументы функциями приведения команды 
+            (ошибка "Ошибка: не удалось привести тип аргумента." в случае 
+            неподдерживаемого типа аргумента);
+            4) вызывает соответствующую команде функцию с приведенными 
             переданными аргументами.
-        В случае возникновения исключения на шагах 4, 5 печатает его описание.
+        В случае возникновения исключения на шагах 3, 4 ошибкой считается его 
+        описание. Если включен сбор статистики, время этапов 1-2, 3 и 4 
+        записывается в статистику команды.
+
+        Args:
+            command_line: Строка-команда с аргументами
+
+        Returns:
+            Описание ошибки выполнения или None, если ошибки не было
         """
-        for _ in itertools.count():
-            # 1, 2)
-            command, given_args = self.parse_command(input())
-            if command not in self.__commands:
-                print('Ошибка: неизвестная команда.')
-                continue
-            func = self.__commands[command][0]
-            # 3)
-            func_args = signature(func).parameters
-            if len(given_args) != len(func_args):
-                print(f'Ошибка: {command} принимает'
-                      f' {len(func_args)} аргументов,'
-                      f' но передано {len(given_args)}.')
-                continue
+        if self.__stats is not None:
+            return self.__dispatch_with_stats(command_line)
+        # 1, 2)
+        command, given_args = self.parse_command(command_line)
+        compiled_command, error = self.__resolve(command, given_args)
+        if error is not None:
+            return error
+        try:
+            # 3, 4)
+            args = self.__convert(compiled_command, given_args)
+            compiled_command.func(*args)
+        except Exception as e:
+            return str(e)
+        return None
+
+    def __dispatch_with_stats(self, command_line: str) -> str | None:
+        """Выполняет строку-команду (см. dispatch) с записью статистики."""
+        parse_start = time.perf_counter_ns()
+        command, given_args = self.parse_command(command_line)
+        compiled_command, error = self.__resolve(command, given_args)
+        cast_start = time.perf_counter_ns()
+        execute_start = None
+        if error is None:
             try:
-                # 4)
-                parsed_args = []
-                for given_arg, func_arg_key in zip(given_args, func_args.keys()):
-                    splited_parameter = str(func_args[func_arg_key]).split(': ')
-                    if len(splited_parameter) == 1:
-                        func_arg_type = None
-                    else:
-                        func_arg_type = splited_parameter[1]
-                    casted_given_arg = self.cast(func_arg_type, given_arg)
-                    if casted_given_arg is None:
-                        raise ArgumentTypeError(
-                            'Ошибка: не удалось привести тип аргумента.'
-                        )
-                    parsed_args.append(casted_given_arg)
-                # 5)
-                func(*parsed_args)
+                args = self.__convert(compiled_command, given_args)
+                execute_start = time.perf_counter_ns()
+                compiled_command.func(*args)
             except Exception as e:
-                print(e)
+                error = str(e)
+        end = time.perf_counter_ns()
+        if execute_start is None:
+            # Команда не вызывалась: ошибка на шагах 1-3
+            execute_start = end
+        self.__stats.record(
+            command if compiled_command is not None 
+            else CommandStats.UNKNOWN_COMMAND,
+            cast_start - parse_start,
+            execute_start - cast_start,
+            end - execute_start,
+            error is not None
+        )
+        return error
 
+    @staticmethod
+    def __convert(
+        compiled_command: CompiledCommand, 
+        given_args: list[str]
+    ) -> list[Any]:
+        """Приводит переданные аргументы, см. шаг 3 dispatch."""
+        converters = compiled_command.converters
+        if compiled_command.variadic:
+            converters = itertools.chain(
+                converters[:-1], 
+                itertools.repeat(converters[-1])
+            )
+        return [
+            convert(given_arg) 
+            for convert, given_arg in zip(converters, given_args)
+        ]
 
+    def __resolve(
+        self, 
+        command: str, 
+        given_args: list[str]
+    ) -> tuple[CompiledCommand | None, str | None]:
+        """
+        Находит скомпилированную команду и сверяет с ней число переданных 
+        аргументов, см. шаги 1, 2 dispatch.
+
+        Args:
+            command: Название команды
+            given_args: Переданные аргументы
 
+        Returns:
+            Кортеж из скомпилированной команды (None для 
+            незарегистрированной команды) и описания ошибки (None, если 
+            ошибки нет)
+        """
+        registered_command = self.__commands.get(command)
+        if registered_command is None:
+            return None, 'Ошибка: неизвестная команда.'
+        compiled_command = self.__compiled_commands.get(command)
+        if compiled_command is None \
+                or compiled_command.func is not registered_command[0]:
+            # Команда добавлена в __commands в обход register_command
+            compiled_command = self.compile_command(registered_command[0])
+            self.__compiled_commands[command] = compiled_command
+        if compiled_command.variadic:
+            if len(given_args) < compiled_command.min_arity:
+                return compiled_command, (
+                    f'Ошибка: {command} принимает'
+                    f' не менее {compiled_command.min_arity} аргументов,'
+                    f' но передано {len(given_args)}.'
+                )
+            return compiled_command, None
+        if not compiled_command.min_arity <= len(given_args) \
+                <= compiled_command.arity:
+            if compiled_command.min_arity == compiled_command.arity:
+                return compiled_command, (
+                    f'Ошибка: {command} принимает'
+                    f' {compiled_command.arity} аргументов,'
+                    f' но передано {len(given_args)}.'
+                )
+            return compiled_command, (
+                f'Ошибка: {command} принимает'
+                f' от {compiled_command.min_arity}'
+                f' до {compiled_command.arity} аргументов,'
+                f' но передано {len(given_args)}.'
+            )
+        return compiled_command, None
 
+    def start(self) -> None:
+        """
+        Запускает бесконечный цикл ввода-вывода консоли: ожидает ввода 
+        пользователя и выполняет его, см. execute.
+        """
+        for _ in itertools.count():
+            self.execute(input())
+
+    def run_batch(self, file: TextIO, quiet: bool = False) -> None:
+        """
+        Выполняет команды из файла (или stdin) без интерактивного ввода. 
+        Строки читаются блоками по BATCH_READ_SIZE байт, пустые строки и 
+        строки, начинающиеся с "#", пропускаются. Вывод команд накапливается 
+        в буфере и печатается блоками по BATCH_OUTPUT_SIZE символов. В тихом 
+        режиме вывод команд отбрасывается, а ошибки выполнения печатаются в 
+        stderr с номерами строк. В конце печатает сводку: число команд, 
+        ошибок, время выполнения и пропускную способность.
+
+        Args:
+            file: Файл с командами, открытый в текстовом режиме
+            quiet: Признак тихого режима
+
+        Returns:
+            None
+        """
+        stdout = sys.stdout
+        output = None if quiet else io.StringIO()
+        commands_count = errors_count = line_number = 0
+        start_time = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                while lines := file.readlines(self.BATCH_READ_SIZE):
+                    for line in lines:
+                        line_number += 1
+                        if len(line.strip()) == 0 or line.lstrip()[0] == '#':
+                            continue
+                        commands_count += 1
+                        error = self.dispatch(line)
+                        if error is not None:
+                            errors_count += 1
+                            if quiet:
+                                print(f'Строка {line_number}: {error}', 
+                                      file=sys.stderr)
+                            else:
+                                print(error)
+                    if output is not None \
+                            and output.tell() >= self.BATCH_OUTPUT_SIZE:
+                        self.__flush_batch_output(output, stdout)
+        finally:
+            if output is not None:
+                self.__flush_batch_output(output, stdout)
+        elapsed_time = time.perf_counter() - start_time
+        print(f'Выполнено команд: {commands_count}, ошибок: {errors_count}, '
+              f'время: {elapsed_time:.3f} с, '
+              f'{commands_count / max(elapsed_time, 1e-9):.0f} команд/с.')
 
+    def __flush_batch_output(self, output: io.StringIO, stdout: TextIO) -> None:
+        """Печатает накопленный вывод пакетного режима и очищает буфер."""
+        stdout.write(output.getvalue())
+        stdout.flush()
+        output.seek(0)
+        output.truncate()
@@ -1,4 +1,17 @@
-﻿from Book import Book
+﻿from collections.abc import (
+    Callable, Iterable, Iterator, Mapping, MutableMapping
+)
+from typing import ContextManager
+from Book import Book
+from BookQuery import BookQuery
+from BookIndexes import (
+    AuthorIndex, SimilarityIndex, StatusIndex, TrigramIndex, YearIndex
+)
+from ReadWriteLock import ReadWriteLock, read_locked, write_locked
+import contextlib
+import heapq
+import itertools
+import threading
 
 
 class ConsoleLibrary():
@@ -6,36 +19,125 @@ class ConsoleLibrary():
     Класс консольной библиотеки.
     
     Attributes:
-        books (dict[int, Book]): Книги в библиотеке
+        books (dict[int, Book]): Книги в библиотеке (словарь или 
+        отображение с тем же интерфейсом, например ColumnarBookStore)
+        trigram_index (TrigramIndex): Триграммный индекс подстрок названий,
+        авторов и годов издания книг
+        status_index (StatusIndex): Индекс id книг по статусу
+        author_index (AuthorIndex): Хеш-индекс id книг по нормализованному
+        автору
+        year_index (YearIndex): Упорядоченный индекс id книг по году издания
+        similarity_index (SimilarityIndex): Индекс нечеткого поиска по 
+        сходству триграмм, строится при первом нечетком поиске
+        listeners (list[Callable[[str, Book], None]]): Подписчики на изменения
+        библиотеки, вызываются с событием ("add", "delete", "status") и 
+        книгой
+        lock (ReadWriteLock | None): Блокировка чтения-записи в 
+        потокобезопасном режиме, иначе None
+        __indexes_stale (bool): Признак того, что индексы не построены и 
+        будут построены при первом запросе, который их использует
+        __similarity_stale (bool): Признак того, что индекс нечеткого поиска 
+        не построен. Он строится только после остальных индексов и 
+        помечается непостроенным вместе с ними
+        __indexes_lock (threading.Lock): Блокировка ленивого построения 
+        индексов параллельными читателями
         BOOK_PRINT_PATTERN (str): Шаблон для печати полей книг
         
     Methods:
         print_book (Callable[[int], None]): Печатает поля книги из библиотеки
-        print_books (Callable[[], None]): Печатает поля всех книг в библиотеке
-        find_book (Callable[[str], None]): Ищет книгу в библиотеке и печатает 
-        ее поля
+        print_books (Callable[[int, int], None]): Печатает поля книг в 
+        библиотеке страницей
+        find_book (Callable[[str, int, int], None]): Ищет книгу в библиотеке и 
+        печатает ее поля страницей
+        search (Callable[[str, int], None]): Печатает поля k наиболее 
+        похожих на запрос книг
+        query (Callable[..., None]): Печатает поля книг, удовлетворяющих 
+        запросу BookQuery
+        explain_query (Callable[..., None]): Печатает план выполнения 
+        запроса BookQuery
+        print_books_by_status (Callable[[int, int, int], None]): Печатает 
+        поля книг с указанным статусом страницей
+        count_books_by_status (Callable[[int], None]): Печатает число книг с 
+        указанным статусом
+        find_by_author (Callable[[str, int, int], None]): Печатает поля книг 
+        автора страницей
+        find_by_year_range (Callable[[int, int, int, int], None]): Печатает 
+        поля книг, изданных в диапазоне годов, страницей
+        format_book (Callable[[Book], str]): Возвращает поля книги, 
+        отформатированные по BOOK_PRINT_PATTERN
         add_book (Callable[[str, str, str], None]): Добавляет книгу в библиотеку
         change_book_status (Callable[[int, int], None]): Меняет статус книги в 
         библиотеке
         delete_book (Callable[[int], None]): Удаляет книгу из библиотеки
+        add_books (Callable[[Iterable[tuple]], list[int]]): Добавляет пакет 
+        книг (с необязательными статусами) в библиотеку
+        delete_books (Callable[[Iterable[int]], int]): Удаляет пакет книг из 
+        библиотеки
+        change_statuses (Callable[[Iterable[tuple[int, int]]], int]): Меняет 
+        статусы пакета книг
+        rebuild_indexes (Callable[[], None]): Перестраивает индексы по всем
+        книгам библиотеки
+        replace_books (Callable[[Mapping[int, Book]], None]): Заменяет все 
+        книги библиотеки
+        set_books (Callable[[MutableMapping[int, Book], bool], None]): 
+        Подменяет хранилище книг библиотеки
+        merge_books (Callable[[Iterable[Book], Iterable[int]], None]): 
+        Вставляет или заменяет книги и удаляет книги по id при загрузке
+        reading (Callable[[], ContextManager]): Захватывает блокировку 
+        библиотеки на чтение
+        writing (Callable[[], ContextManager]): Захватывает блокировку 
+        библиотеки на запись
+        add_listener (Callable[[Callable[[str, Book], None]], None]): 
+        Подписывает на изменения библиотеки
     """
 
     books: dict[int, Book]
+    trigram_index: TrigramIndex
+    status_index: StatusIndex
+    author_index: AuthorIndex
+    year_index: YearIndex
+    similarity_index: SimilarityIndex
+    listeners: list[Callable[[str, Book], None]]
+    lock: ReadWriteLock | None
+    __indexes_stale: bool
+    __similarity_stale: bool
+    __indexes_lock: threading.Lock
 
     BOOK_PRINT_PATTERN: str = '\t- id={0} \"{1}\", {2}, {3} г. - {4}.'
 
-    def __init__(self, books: dict[int, Book] = None):
+    def __init__(
+        self, 
+        books: dict[int, Book] = None, 
+        thread_safe: bool = False
+    ):
         """
-        Инициализирует атрибут books.
+        Инициализирует атрибуты books, trigram_index, status_index, 
+        author_index, year_index, similarity_index, listeners, lock. В 
+        потокобезопасном режиме методы чтения (печать и поиск книг) 
+        выполняются параллельно под блокировкой на чтение, а изменяющие 
+        методы - монопольно под блокировкой на запись.
         
         Args: 
             books: Книги для начального наполнения библиотеки
+            thread_safe: Признак потокобезопасного режима
         """
         if books is not None:
             self.books = books
         else:
             self.books = {}
+        self.lock = ReadWriteLock() if thread_safe else None
+        self.trigram_index = TrigramIndex()
+        self.status_index = StatusIndex()
+        self.author_index = AuthorIndex()
+        self.year_index = YearIndex()
+        self.similarity_index = SimilarityIndex()
+        self.__indexes_stale = True
+        self.__similarity_stale = True
+        self.__indexes_lock = threading.Lock()
+        self.rebuild_indexes()
+        self.listeners = []
 
+    @read_locked
     def print_book(self, id: int) -> None:
         """
         Печатает поля книги по ее id. В случае неудачи поиска печатает 
@@ -50,61 +152,389 @@ class ConsoleLibrary():
         if id not in self.books.keys():
             print('Книга не найдена.')
             return
-        book = self.books[id]
-        print(self.BOOK_PRINT_PATTERN.format(
-            book.get_id(), 
-            book.title, 
-            book.author, 
-            book.year, 
-            book.get_status()
-        ))
+        print(self.format_book(self.books[id]))
 
-    def print_books(self) -> None:
+    @read_locked
+    def print_books(self, limit: int = 0, offset: int = 0) -> None:
         """
-        Печатает поля всех книг в библиотеке. В случае отсутствия книг в 
+        Печатает поля книг в библиотеке страницей: не более limit книг, 
+        начиная с книги номер offset (с нуля). Страница печатается одной 
+        записью, а строки формируются лениво, поэтому вывод первых страниц 
+        не зависит от размера библиотеки. В случае отсутствия книг в 
         библиотеке печатает "Библиотека пуста.".
 
+        Args:
+            limit: Число книг на странице, 0 - без ограничения
+            offset: Число пропускаемых книг
+
         Returns:
             None
         """
         if len(self.books) == 0:
             print('Библиотека пуста.')
             return
-        for book in self.books.values():
-            print(self.BOOK_PRINT_PATTERN.format(
-                book.get_id(), 
-                book.title, 
-                book.author, 
-                book.year, 
-                book.get_status()
-            ))
+        self.__print_page(self.books.values(), limit, offset)
 
-    def find_book(self, key_word: str) -> None:
+    @read_locked
+    def find_book(
+        self, 
+        key_word: str, 
+        limit: int = 0, 
+        offset: int = 0
+    ) -> None:
         """
         Ищет книгу в библиотеке по названию, автору или году издания и печатает
         ее поля. В случае неудачи поиска печатает "Книга не найдена.".
+        Ключевое слово сравнивается с ключами поиска книг, вычисленными при 
+        их создании (см. Book.normalize), поэтому регистр и различие "ё" и 
+        "е" не учитываются, а строки в цикле поиска не преобразуются. 
+        Кандидаты отбираются по триграммному индексу; при ключевом слове 
+        короче трех символов они отбираются полным просмотром библиотеки. 
+        Найденные книги в обоих случаях печатаются в порядке возрастания id 
+        страницей, см. print_books.
 
         Args:
             key_word: ключевое слово для поиска
+            limit: Число книг на странице, 0 - без ограничения
+            offset: Число пропускаемых книг
 
         Returns:
             None
         """
-        book_is_found = False
-        for book in self.books.values():
-            attribute_values_for_searching = [
-                book.title, 
-                book.author, 
-                book.year
-            ]
-            for attribute_value in attribute_values_for_searching:
-                if key_word in attribute_value:
-                    self.print_book(book.get_id())
-                    book_is_found = True
-                    break
-        if not book_is_found:
+        self.__ensure_indexes()
+        key_word = Book.normalize(key_word)
+
+        def matches(book: Book) -> bool:
+            return key_word in book.title_key \
+                or key_word in book.author_key \
+                or key_word in book.year_key
+
+        candidate_ids = self.trigram_index.candidates(key_word)
+        if candidate_ids is None:
+            # Порядок книг в хранилище может не совпадать с порядком id
+            # (например, после загрузки слиянием), поэтому найденные полным
+            # просмотром книги печатаются в том же порядке, что и кандидаты
+            candidate_ids = {
+                id for id, book in self.books.items() if matches(book)
+            }
+        if limit > 0:
+            # Проверка кандидата может отбросить его, поэтому первая страница 
+            # берется с запасом, остальные кандидаты сортируются лениво
+            books = self.__iter_books_by_id(
+                candidate_ids, 
+                offset + limit + 1
+            )
+        else:
+            books = self.__iter_books_by_id(candidate_ids, len(candidate_ids))
+        self.__print_page(filter(matches, books), limit, offset)
+
+    @read_locked
+    def search(self, query: str, k: int = 10) -> None:
+        """
+        Нечеткий поиск: печатает поля k наиболее похожих на запрос книг по 
+        убыванию сходства триграмм слов запроса с названием, автором и 
+        годом издания, см. SimilarityIndex. Находит книги с опечатками в 
+        запросе без учета регистра. В случае неудачи поиска печатает 
+        "Книга не найдена.".
+
+        Args:
+            query: Запрос
+            k: Число книг
+
+        Returns:
+            None
+        """
+        if k <= 0:
+            print('Ошибка: k должно быть положительным.')
+            return
+        self.__ensure_similarity_index()
+        scores = {
+            id: score for score, id in self.similarity_index.top(query, k)
+        }
+        self.__print_page(
+            (self.books[id] for id in scores), 
+            0, 
+            0, 
+            lambda book: f'{self.format_book(book)} '
+                         f'Сходство: {scores[book.get_id()]:.2f}.'
+        )
+
+    @read_locked
+    def query(self, *terms: str) -> None:
+        """
+        Печатает поля книг, удовлетворяющих запросу (см. BookQuery), 
+        например "author~Толстой year>=1860 status:0". Запрос разбирается 
+        один раз, для каждой альтернативы запроса планировщик выбирает самый 
+        избирательный индекс, а остальные условия проверяются только для 
+        его кандидатов. Книги, найденные по индексам, печатаются в порядке 
+        возрастания id. В случае неудачи поиска печатает "Книга не 
+        найдена.", в случае ошибки в запросе - ее описание.
+
+        Args:
+            terms: Условия запроса
+
+        Returns:
+            None
+        """
+        try:
+            book_query = BookQuery.parse(' '.join(terms))
+        except BookQuery.QuerySyntaxException as e:
+            print(e)
+            return
+        self.__ensure_indexes()
+        paths = book_query.plan(self)
+        if any(path.fetch is None for path in paths):
+            books = (book for book in self.books.values() 
+                     if book_query.matches(book))
+        else:
+            ids = set()
+            for path in paths:
+                ids.update(
+                    id for id in path.fetch() 
+                    if all(condition.match(self.books[id]) 
+                           for condition in path.conditions)
+                )
+            books = self.__iter_books_by_id(ids, len(ids))
+        self.__print_page(books, 0, 0)
+
+    @read_locked
+    def explain_query(self, *terms: str) -> None:
+        """
+        Печатает план выполнения запроса (см. query): для каждой 
+        альтернативы запроса - выбранный путь доступа, оценку числа 
+        кандидатов и условия, проверяемые для каждого кандидата, - и общую 
+        оценку числа кандидатов. Запрос не выполняется. В случае ошибки в 
+        запросе печатает ее описание.
+
+        Args:
+            terms: Условия запроса
+
+        Returns:
+            None
+        """
+        try:
+            book_query = BookQuery.parse(' '.join(terms))
+        except BookQuery.QuerySyntaxException as e:
+            print(e)
+            return
+        self.__ensure_indexes()
+        paths = book_query.plan(self)
+        lines = [f'План запроса "{book_query}":']
+        for path in paths:
+            line = f'\t- {path.description}: кандидатов {path.estimate}'
+            if len(path.conditions) > 0:
+                line += '; проверка: ' + ' '.join(
+                    str(condition) for condition in path.conditions
+                )
+            lines.append(line + '.')
+        estimate = min(len(self.books), sum(path.estimate for path in paths))
+        lines.append(
+            f'Оценка числа кандидатов: {estimate} из {len(self.books)} книг.'
+        )
+        print('\n'.join(lines))
+
+    @read_locked
+    def print_books_by_status(
+        self, 
+        status_code: int, 
+        limit: int = 0, 
+        offset: int = 0
+    ) -> None:
+        """
+        Печатает поля книг с указанным статусом в порядке возрастания id 
+        страницей, см. print_books. Книги берутся из индекса по статусу, 
+        поэтому время работы зависит от числа найденных книг, а не от 
+        размера библиотеки. В случае отсутствия таких книг печатает 
+        "Книга не найдена.". В случае некорректного статуса печатает 
+        описание ошибки.
+
+        Args:
+            status_code: номер статуса из Book.STATUSES
+            limit: Число книг на странице, 0 - без ограничения
+            offset: Число пропускаемых книг
+
+        Returns:
+            None
+        """
+        self.__ensure_indexes()
+        try:
+            ids = self.status_index.ids(status_code)
+        except Book.IncorrectBookStatusException as e:
+            print(e)
+            return
+        first = offset + limit + 1 if limit > 0 else len(ids)
+        self.__print_page(
+            self.__iter_books_by_id(ids, first), 
+            limit, 
+            offset
+        )
+
+    @read_locked
+    def count_books_by_status(self, status_code: int) -> None:
+        """
+        Печатает число книг с указанным статусом по индексу по статусу. В 
+        случае некорректного статуса печатает описание ошибки.
+
+        Args:
+            status_code: номер статуса из Book.STATUSES
+
+        Returns:
+            None
+        """
+        self.__ensure_indexes()
+        try:
+            ids = self.status_index.ids(status_code)
+        except Book.IncorrectBookStatusException as e:
+            print(e)
+            return
+        print(f'Книг со статусом "{Book.STATUSES[status_code]}": {len(ids)}.')
+
+    @read_locked
+    def find_by_author(
+        self, 
+        author: str, 
+        limit: int = 0, 
+        offset: int = 0
+    ) -> None:
+        """
+        Печатает поля книг автора в порядке возрастания id страницей, см. 
+        print_books. Автор сравнивается целиком без учета регистра и 
+        повторяющихся пробелов, книги берутся из хеш-индекса по автору. В 
+        случае отсутствия книг автора печатает "Книга не найдена.".
+
+        Args:
+            author: Автор
+            limit: Число книг на странице, 0 - без ограничения
+            offset: Число пропускаемых книг
+
+        Returns:
+            None
+        """
+        self.__ensure_indexes()
+        ids = self.author_index.ids(author)
+        first = offset + limit + 1 if limit > 0 else len(ids)
+        self.__print_page(
+            self.__iter_books_by_id(ids, first), 
+            limit, 
+            offset
+        )
+
+    @read_locked
+    def find_by_year_range(
+        self, 
+        year_from: int, 
+        year_to: int, 
+        limit: int = 0, 
+        offset: int = 0
+    ) -> None:
+        """
+        Печатает поля книг, изданных с year_from по year_to включительно, в 
+        порядке возрастания года и id страницей, см. print_books. Границы 
+        диапазона находятся двоичным поиском по индексу по году издания, 
+        поэтому время работы - O(log n + k). Книги, в году издания которых 
+        нет числа, не находятся. В случае отсутствия таких книг печатает 
+        "Книга не найдена.".
+
+        Args:
+            year_from: Первый год диапазона
+            year_to: Последний год диапазона
+            limit: Число книг на странице, 0 - без ограничения
+            offset: Число пропускаемых книг
+
+        Returns:
+            None
+        """
+        self.__ensure_indexes()
+        self.__print_page(
+            (self.books[id] 
+             for id in self.year_index.ids_in_range(year_from, year_to)), 
+            limit, 
+            offset
+        )
+
+    def format_book(self, book: Book) -> str:
+        """
+        Возвращает поля книги, отформатированные по BOOK_PRINT_PATTERN.
+
+        Args:
+            book: Книга
+
+        Returns:
+            Строка с полями книги
+        """
+        return self.BOOK_PRINT_PATTERN.format(
+            book.get_id(), 
+            book.title, 
+            book.author, 
+            book.year, 
+            book.get_status()
+        )
+
+    def __iter_books_by_id(
+        self, 
+        ids: set[int], 
+        first: int
+    ) -> Iterator[Book]:
+        """
+        Возвращает итератор по книгам в порядке возрастания id. Первые first 
+        id отбираются кучей без полной сортировки, остальные сортируются, 
+        только если итерация до них дойдет.
+
+        Args:
+            ids: id книг
+            first: Число id, отбираемых без полной сортировки
+
+        Returns:
+            Итератор по книгам
+        """
+        for id in heapq.nsmallest(first, ids):
+            yield self.books[id]
+        if len(ids) > first:
+            for id in sorted(ids)[first:]:
+                yield self.books[id]
+
+    def __print_page(
+        self, 
+        books: Iterable[Book], 
+        limit: int, 
+        offset: int, 
+        format_book: Callable[[Book], str] | None = None
+    ) -> None:
+        """
+        Печатает одной записью страницу книг: не более limit книг, начиная 
+        с книги номер offset. Пропускаемые книги не форматируются, поэтому 
+        стоимость печати страницы не зависит от offset. Если после страницы 
+        есть еще книги, печатает offset следующей страницы. Если страница 
+        пуста, печатает "Книга не найдена.".
+
+        Args:
+            books: Книги
+            limit: Число книг на странице, 0 - без ограничения
+            offset: Число пропускаемых книг
+            format_book: Форматирует книгу, по умолчанию - format_book
+
+        Returns:
+            None
+        """
+        if limit < 0 or offset < 0:
+            print('Ошибка: limit и offset не могут быть отрицательными.')
+            return
+        if limit == 0:
+            page = list(itertools.islice(books, offset, None))
+            has_next_page = False
+        else:
+            page = list(itertools.islice(books, offset, offset + limit + 1))
+            has_next_page = len(page) > limit
+            del page[limit:]
+        if len(page) == 0:
             print('Книга не найдена.')
+            return
+        print('\n'.join(map(format_book or self.format_book, page)))
+        if has_next_page:
+            print(f'Показаны книги с {offset + 1} по {offset + limit}. '
+                  f'Следующая страница: offset = {offset + limit}.')
 
+    @write_locked
     def add_book(self, title: str, author: str, year: str) -> None:
         """
         Добавляет книгу в библиотеку. В случае успешного добавления печатает 
@@ -125,8 +555,11 @@ class ConsoleLibrary():
             print(e)
             return
         self.books[book.get_id()] = book
+        self.__index_book(book)
+        self.__notify('add', book)
         print('Книга добавлена.')
 
+    @write_locked
     def change_book_status(self, id: int, status_code: int) -> None:
         """
         Меняет статус книги в библиотеке. В случае успешного изменения печатает
@@ -144,13 +577,19 @@ class ConsoleLibrary():
         if id not in self.books.keys():
             print('Книга не найдена.')
             return
+        book = self.books[id]
+        old_status_code = Book.STATUS_CODES[book.get_status()]
         try:
-            self.books[id].set_status(status_code)
+            book.set_status(status_code)
         except Book.IncorrectBookStatusException as e:
             print(e)
             return
+        if not self.__indexes_stale:
+            self.status_index.change_status(id, old_status_code, status_code)
+        self.__notify('status', book)
         print('Статус книги изменен.')
 
+    @write_locked
     def delete_book(self, id: int) -> None:
         """
         Удаляет книгу из библиотеки. В случае успешного удаления печатает
@@ -165,9 +604,372 @@ class ConsoleLibrary():
         if id not in self.books.keys():
             print('Книга не найдена.')
             return
+        book = self.books[id]
+        self.__unindex_book(book)
         self.books.pop(id)
+        self.__notify('delete', book)
         print('Книга удалена.')
 
+    @write_locked
+    def add_books(
+        self, 
+        rows: Iterable[tuple[str, str, str] | tuple[str, str, str, int]]
+    ) -> list[int]:
+        """
+        Добавляет пакет книг в библиотеку под одной блокировкой. Книги 
+        проверяются до изменения библиотеки, поэтому при ошибке не 
+        добавляется ни одна из них. Книга сразу получает статус из кортежа, 
+        поэтому индекс статусов обновляется один раз. Упорядоченный индекс 
+        годов обновляется одной сортировкой, а если пакет больше библиотеки, 
+        индексы не обновляются, а строятся при первом запросе, который их 
+        использует. В отличие от add_book ничего не печатает.
+
+        Args:
+            rows: Кортежи (название, автор, год издания) или (название, 
+                автор, год издания, номер статуса из Book.STATUSES)
 
+        Raises:
+            Book.EmptyBookAttributeException
+            Book.IncorrectBookStatusException
+
+        Returns:
+            id добавленных книг в порядке кортежей
+        """
+        rows = list(rows)
+        for row in rows:
+            for attribute in row[:3]:
+                if len(attribute) == 0:
+                    raise Book.EmptyBookAttributeException
+            if len(row) > 3 and row[3] not in Book.STATUSES:
+                raise Book.IncorrectBookStatusException
+        books = []
+        for row in rows:
+            book = Book(*row[:3])
+            if len(row) > 3 and row[3] != 0:
+                book.set_status(row[3])
+            books.append(book)
+        if len(books) > len(self.books):
+            self.__clear_indexes()
+        for book in books:
+            self.books[book.get_id()] = book
+        if not self.__indexes_stale:
+            for book in books:
+                self.trigram_index.add_book(book)
+                self.status_index.add_book(book)
+                self.author_index.add_book(book)
+            self.year_index.add_books(books)
+        if not self.__similarity_stale:
+            for book in books:
+                self.similarity_index.add_book(book)
+        for book in books:
+            self.__notify('add', book)
+        # Событие "add" не содержит статуса, поэтому слушатели (журнал
+        # изменений) получают его отдельным событием
+        for book in books:
+            if book.get_status() != Book.STATUSES[0]:
+                self.__notify('status', book)
+        return [book.get_id() for book in books]
 
+    @write_locked
+    def delete_books(self, ids: Iterable[int]) -> int:
+        """
+        Удаляет пакет книг из библиотеки под одной блокировкой. Отсутствующие 
+        id пропускаются. Упорядоченный индекс годов обновляется за один 
+        проход. В отличие от delete_book ничего не печатает.
+
+        Args:
+            ids: id книг
+
+        Returns:
+            Число удаленных книг
+        """
+        # Книги удаляются из индексов до удаления из хранилища: книга
+        # ColumnarBookStore читает атрибуты из его строки
+        books = {}
+        for id in ids:
+            if id not in books and id in self.books:
+                books[id] = self.books[id]
+        books = list(books.values())
+        if not self.__indexes_stale:
+            for book in books:
+                self.trigram_index.remove_book(book)
+                self.status_index.remove_book(book)
+                self.author_index.remove_book(book)
+            self.year_index.remove_books(books)
+        if not self.__similarity_stale:
+            for book in books:
+                self.similarity_index.remove_book(book)
+        for book in books:
+            self.books.pop(book.get_id())
+            self.__notify('delete', book)
+        return len(books)
+
+    @write_locked
+    def change_statuses(self, changes: Iterable[tuple[int, int]]) -> int:
+        """
+        Меняет статусы пакета книг под одной блокировкой. Номера статусов 
+        проверяются до изменения библиотеки, поэтому при ошибке не меняется 
+        ни один статус. Отсутствующие id пропускаются. В отличие от 
+        change_book_status ничего не печатает.
+
+        Args:
+            changes: Кортежи (id книги, номер статуса из Book.STATUSES)
+
+        Raises:
+            Book.IncorrectBookStatusException
+
+        Returns:
+            Число книг, статус которых изменен
+        """
+        changes = list(changes)
+        for _, status_code in changes:
+            if status_code not in Book.STATUSES:
+                raise Book.IncorrectBookStatusException
+        changed_count = 0
+        for id, status_code in changes:
+            book = self.books.get(id)
+            if book is None:
+                continue
+            old_status_code = Book.STATUS_CODES[book.get_status()]
+            book.set_status(status_code)
+            if not self.__indexes_stale:
+                self.status_index.change_status(
+                    id, 
+                    old_status_code, 
+                    status_code
+                )
+            self.__notify('status', book)
+            changed_count += 1
+        return changed_count
+
+    @write_locked
+    def rebuild_indexes(self) -> None:
+        """
+        Перестраивает индексы по всем книгам библиотеки. Вызывается после
+        массового изменения books в обход методов библиотеки (например, при
+        загрузке из файла).
+
+        Returns:
+            None
+        """
+        self.__rebuild_indexes()
+
+    def __rebuild_indexes(self) -> None:
+        """Перестраивает индексы по всем книгам библиотеки без блокировки."""
+        self.trigram_index.clear()
+        self.status_index.clear()
+        self.author_index.clear()
+        for book in self.books.values():
+            self.trigram_index.add_book(book)
+            self.status_index.add_book(book)
+            self.author_index.add_book(book)
+        self.year_index.rebuild(self.books.values())
+        self.similarity_index.clear()
+        self.__indexes_stale = False
+        self.__similarity_stale = True
+
+    def __clear_indexes(self) -> None:
+        """Очищает индексы и помечает их непостроенными."""
+        self.trigram_index.clear()
+        self.status_index.clear()
+        self.author_index.clear()
+        self.year_index.clear()
+        self.similarity_index.clear()
+        self.__indexes_stale = True
+        self.__similarity_stale = True
+
+    def __ensure_indexes(self) -> None:
+        """
+        Строит индексы, если они помечены непостроенными. Параллельные 
+        читатели строят индексы один раз.
+        """
+        if not self.__indexes_stale:
+            return
+        with self.__indexes_lock:
+            if self.__indexes_stale:
+                self.__rebuild_indexes()
+
+    def __ensure_similarity_index(self) -> None:
+        """
+        Строит индекс нечеткого поиска, если он помечен непостроенным, после 
+        остальных индексов: изменения библиотеки обновляют его, только пока 
+        построены остальные индексы.
+        """
+        self.__ensure_indexes()
+        if not self.__similarity_stale:
+            return
+        with self.__indexes_lock:
+            if self.__similarity_stale:
+                for book in self.books.values():
+                    self.similarity_index.add_book(book)
+                self.__similarity_stale = False
+
+    def __index_book(self, book: Book) -> None:
+        """Добавляет книгу во все построенные индексы библиотеки."""
+        if self.__indexes_stale:
+            return
+        self.trigram_index.add_book(book)
+        self.status_index.add_book(book)
+        self.author_index.add_book(book)
+        self.year_index.add_book(book)
+        if not self.__similarity_stale:
+            self.similarity_index.add_book(book)
+
+    def __unindex_book(self, book: Book) -> None:
+        """Удаляет книгу из всех построенных индексов библиотеки."""
+        if self.__indexes_stale:
+            return
+        self.trigram_index.remove_book(book)
+        self.status_index.remove_book(book)
+        self.author_index.remove_book(book)
+        self.year_index.remove_book(book)
+        if not self.__similarity_stale:
+            self.similarity_index.remove_book(book)
+
+    @write_locked
+    def replace_books(
+        self, 
+        books: Mapping[int, Book], 
+        build_indexes: bool = True
+    ) -> None:
+        """
+        Заменяет все книги библиотеки (например, при загрузке из файла) и 
+        перестраивает индексы.
+
+        Args:
+            books: Новые книги библиотеки
+            build_indexes: Построить индексы сразу, иначе они строятся при 
+            первом запросе, который их использует
+
+        Returns:
+            None
+        """
+        self.books.clear()
+        self.books.update(books)
+        if build_indexes:
+            self.__rebuild_indexes()
+        else:
+            self.__clear_indexes()
+
+    @write_locked
+    def set_books(
+        self, 
+        books: MutableMapping[int, Book], 
+        keep_indexes: bool = False
+    ) -> None:
+        """
+        Подменяет хранилище книг библиотеки без копирования книг (например, 
+        ленивым хранилищем LazyBookStore при загрузке из снимка). Индексы 
+        очищаются и строятся при первом запросе, который их использует, 
+        поэтому подмена не обращается к книгам и не зависит от размера 
+        библиотеки.
+
+        Args:
+            books: Новое хранилище книг
+            keep_indexes: Сохранить индексы, если новое хранилище содержит 
+            те же книги, что и прежнее
+
+        Returns:
+            None
+        """
+        self.books = books
+        if not keep_indexes:
+            self.__clear_indexes()
+
+    @write_locked
+    def merge_books(
+        self, 
+        books: Iterable[Book], 
+        deleted_ids: Iterable[int]
+    ) -> None:
+        """
+        Вставляет или заменяет книги с сохранением их id и удаляет книги по 
+        id (например, при загрузке, сравнивающей файл с библиотекой). 
+        Индексы обновляются только для затронутых книг, а если их больше, 
+        чем книг в библиотеке, строятся при первом запросе, который их 
+        использует. Подписчики не оповещаются: библиотека приводится к уже 
+        сохраненному состоянию.
+
+        Args:
+            books: Добавленные и измененные книги
+            deleted_ids: id удаленных книг
+
+        Returns:
+            None
+        """
+        # Удаляемые и заменяемые книги удаляются из индексов до изменения
+        # хранилища: книга ColumnarBookStore читает атрибуты из его строки,
+        # поэтому после замены она уже показывает новые атрибуты
+        books = list(books)
+        removed_books = {}
+        for id in itertools.chain(
+            deleted_ids, 
+            (book.get_id() for book in books)
+        ):
+            if id not in removed_books and id in self.books:
+                removed_books[id] = self.books[id]
+        removed_books = list(removed_books.values())
+        if len(books) + len(removed_books) > len(self.books):
+            self.__clear_indexes()
+        if not self.__indexes_stale:
+            for book in removed_books:
+                self.trigram_index.remove_book(book)
+                self.status_index.remove_book(book)
+                self.author_index.remove_book(book)
+            self.year_index.remove_books(removed_books)
+            if not self.__similarity_stale:
+                for book in removed_books:
+                    self.similarity_index.remove_book(book)
+        new_ids = {book.get_id() for book in books}
+        for book in removed_books:
+            if book.get_id() not in new_ids:
+                self.books.pop(book.get_id())
+        for book in books:
+            self.books[book.get_id()] = book
+        if self.__indexes_stale:
+            return
+        for book in books:
+            self.trigram_index.add_book(book)
+            self.status_index.add_book(book)
+            self.author_index.add_book(book)
+        self.year_index.add_books(books)
+        if not self.__similarity_stale:
+            for book in books:
+                self.similarity_index.add_book(book)
+
+    def reading(self) -> ContextManager:
+        """
+        Захватывает блокировку библиотеки на чтение, например, на время 
+        сохранения в файл. Вне потокобезопасного режима ничего не делает.
+        """
+        if self.lock is None:
+            return contextlib.nullcontext()
+        return self.lock.reading()
+
+    def writing(self) -> ContextManager:
+        """
+        Захватывает блокировку библиотеки на запись. Вне потокобезопасного 
+        режима ничего не делает.
+        """
+        if self.lock is None:
+            return contextlib.nullcontext()
+        return self.lock.writing()
+
+    def add_listener(self, listener: Callable[[str, Book], None]) -> None:
+        """
+        Подписывает на изменения библиотеки. Подписчик вызывается после 
+        каждого успешного изменения с событием ("add", "delete", "status") и 
+        измененной книгой.
+
+        Args:
+            listener: Подписчик
+
+        Returns:
+            None
+        """
+        self.listeners.append(listener)
 
+    def __notify(self, event: str, book: Book) -> None:
+        """Оповещает подписчиков об изменении библиотеки."""
+        for listener in self.listeners:
+            listener(event, book)
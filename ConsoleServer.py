@@ -0,0 +1,270 @@
+﻿from collections.abc import AsyncIterator, Iterable
+from contextvars import ContextVar
+from typing import TextIO
+import asyncio
+import contextlib
+import io
+import sys
+from Console import Console
+
+
+class SessionStdout():
+    """
+    Класс подмены sys.stdout, направляющей вывод в буфер текущей сессии.
+    Буфер сессии хранится в контекстной переменной, поэтому вывод команд,
+    выполняемых в потоках через asyncio.to_thread, не смешивается между
+    сессиями. Вне сессии вывод направляется в исходный поток.
+
+    Attributes:
+        __stream (TextIO): Исходный поток вывода
+        buffer (ContextVar[io.StringIO | None]): Буфер вывода текущей сессии
+
+    Methods:
+        write (Callable[[str], int]): Пишет текст в буфер текущей сессии
+        flush (Callable[[], None]): Сбрасывает исходный поток вывода
+    """
+
+    __stream: TextIO
+
+    buffer: ContextVar[io.StringIO | None] = ContextVar(
+        'session_buffer',
+        default=None
+    )
+
+    def __init__(self, stream: TextIO):
+        """
+        Инициализирует атрибут __stream.
+
+        Args:
+            stream: Исходный поток вывода
+        """
+        self.__stream = stream
+
+    def write(self, text: str) -> int:
+        """Пишет текст в буфер текущей сессии или в исходный поток."""
+        session_buffer = self.buffer.get()
+        if session_buffer is None:
+            return self.__stream.write(text)
+        return session_buffer.write(text)
+
+    def flush(self) -> None:
+        """Сбрасывает исходный поток вывода."""
+        self.__stream.flush()
+
+
+class AsyncReadWriteLock():
+    """
+    Класс асинхронной блокировки чтения-записи: читатели выполняются
+    параллельно, писатель - монопольно. Ожидающий писатель не пропускает
+    новых читателей, чтобы не голодать.
+
+    Attributes:
+        __condition (asyncio.Condition): Условие ожидания
+        __readers (int): Число активных читателей
+        __writer (bool): Признак активного писателя
+        __waiting_writers (int): Число ожидающих писателей
+
+    Methods:
+        reading (Callable[[], AsyncContextManager]): Захватывает блокировку
+        на чтение
+        writing (Callable[[], AsyncContextManager]): Захватывает блокировку
+        на запись
+    """
+
+    __condition: asyncio.Condition
+    __readers: int
+    __writer: bool
+    __waiting_writers: int
+
+    def __init__(self):
+        """Инициализирует атрибуты блокировки."""
+        self.__condition = asyncio.Condition()
+        self.__readers = 0
+        self.__writer = False
+        self.__waiting_writers = 0
+
+    @contextlib.asynccontextmanager
+    async def reading(self) -> AsyncIterator[None]:
+        """Захватывает блокировку на чтение."""
+        async with self.__condition:
+            await self.__condition.wait_for(
+                lambda: not self.__writer and self.__waiting_writers == 0
+            )
+            self.__readers += 1
+        try:
+            yield
+        finally:
+            async with self.__condition:
+                self.__readers -= 1
+                self.__condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def writing(self) -> AsyncIterator[None]:
+        """Захватывает блокировку на запись."""
+        async with self.__condition:
+            self.__waiting_writers += 1
+            try:
+                await self.__condition.wait_for(
+                    lambda: not self.__writer and self.__readers == 0
+                )
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = True
+        try:
+            yield
+        finally:
+            async with self.__condition:
+                self.__writer = False
+                self.__condition.notify_all()
+
+
+class ConsoleServer():
+    """
+    Класс TCP-сервера консоли: обслуживает одновременно несколько сессий,
+    работающих с командами, зарегистрированными в Console, и общей
+    библиотекой. Протокол строковый: клиент отправляет строку-команду в
+    utf-8, сервер отвечает выводом команды, завершая ответ пустой строкой.
+    Команда "exit" закрывает сессию. Команды из read_only_commands
+    выполняются параллельно друг с другом, остальные (изменяющие
+    библиотеку) - монопольно. Команды выполняются в потоках, вывод каждой
+    сессии перехватывается отдельно.
+
+    Attributes:
+        __console (Console): Консоль с зарегистрированными командами
+        __read_only_commands (frozenset[str]): Команды, не изменяющие
+        библиотеку
+        __host (str): Адрес сервера
+        __port (int): Порт сервера, 0 - выбрать свободный
+        __lock (AsyncReadWriteLock | None): Блокировка чтения-записи команд
+        __server (asyncio.Server | None): Запущенный сервер
+        __stdout (TextIO | None): Поток вывода, подмененный на время работы
+        сервера
+        EXIT_COMMAND (str): Команда закрытия сессии
+
+    Methods:
+        start (Callable[[], Coroutine]): Запускает сервер
+        stop (Callable[[], Coroutine]): Останавливает сервер
+        serve_forever (Callable[[], Coroutine]): Запускает сервер и
+        обслуживает сессии до остановки
+        get_port (Callable[[], int]): Возвращает порт запущенного сервера
+    """
+
+    __console: Console
+    __read_only_commands: frozenset[str]
+    __host: str
+    __port: int
+    __lock: AsyncReadWriteLock | None
+    __server: asyncio.Server | None
+    __stdout: TextIO | None
+
+    EXIT_COMMAND: str = 'exit'
+
+    def __init__(
+        self,
+        console: Console,
+        read_only_commands: Iterable[str] = (),
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        """
+        Инициализирует атрибуты сервера.
+
+        Args:
+            console: Консоль с зарегистрированными командами
+            read_only_commands: Команды, не изменяющие библиотеку
+            host: Адрес сервера
+            port: Порт сервера, 0 - выбрать свободный
+        """
+        self.__console = console
+        self.__read_only_commands = frozenset(read_only_commands)
+        self.__host = host
+        self.__port = port
+        self.__lock = None
+        self.__server = None
+        self.__stdout = None
+
+    async def start(self) -> None:
+        """Запускает сервер и подменяет sys.stdout на SessionStdout."""
+        self.__lock = AsyncReadWriteLock()
+        self.__server = await asyncio.start_server(
+            self.__serve_session,
+            self.__host,
+            self.__port
+        )
+        self.__stdout = sys.stdout
+        sys.stdout = SessionStdout(self.__stdout)
+
+    async def stop(self) -> None:
+        """Останавливает сервер и восстанавливает sys.stdout."""
+        if self.__server is None:
+            return
+        self.__server.close()
+        await self.__server.wait_closed()
+        self.__server = None
+        sys.stdout = self.__stdout
+
+    async def serve_forever(self) -> None:
+        """Запускает сервер и обслуживает сессии до остановки."""
+        await self.start()
+        try:
+            await self.__server.serve_forever()
+        finally:
+            await self.stop()
+
+    def get_port(self) -> int:
+        """Возвращает порт запущенного сервера."""
+        return self.__server.sockets[0].getsockname()[1]
+
+    async def __serve_session(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Обслуживает сессию клиента: читает строки-команды, выполняет их и
+        отправляет вывод до команды "exit" или закрытия соединения.
+
+        Args:
+            reader: Поток чтения соединения
+            writer: Поток записи соединения
+
+        Returns:
+            None
+        """
+        try:
+            while line := await reader.readline():
+                command_line = line.decode('utf-8', errors='replace')
+                command, _ = self.__console.parse_command(command_line)
+                if command == self.EXIT_COMMAND:
+                    break
+                output = await self.__execute(command, command_line)
+                writer.write(output.encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def __execute(self, command: str, command_line: str) -> str:
+        """
+        Выполняет строку-команду в потоке под блокировкой чтения или записи
+        и возвращает ее вывод.
+
+        Args:
+            command: Название команды
+            command_line: Строка-команда с аргументами
+
+        Returns:
+            Вывод команды
+        """
+        output = io.StringIO()
+        SessionStdout.buffer.set(output)
+        if command in self.__read_only_commands:
+            lock = self.__lock.reading()
+        else:
+            lock = self.__lock.writing()
+        async with lock:
+            await asyncio.to_thread(self.__console.execute, command_line)
+        return output.getvalue()
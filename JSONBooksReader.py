@@ -0,0 +1,208 @@
+﻿from collections.abc import Callable, Iterator
+from typing import Any, BinaryIO
+import codecs
+import json
+import os
+import re
+
+
+class JSONBooksReader():
+    """
+    Класс потокового чтения json-документа библиотеки вида
+    {"books": {"<id>": {...}, ...}}. Документ читается из файла блоками,
+    в памяти одновременно находятся только текущий блок и разбираемая книга.
+
+    Attributes:
+        CHUNK_SIZE (int): Размер блока чтения в байтах по умолчанию
+        __file (BinaryIO): Файл, открытый в двоичном режиме
+        __chunk_size (int): Размер блока чтения в байтах
+        __progress (Callable[[int, int], None] | None): Функция, вызываемая
+        после чтения каждого блока с числом прочитанных байт и размером файла
+        __decoder (json.JSONDecoder): Декодер json-значений
+        __text_decoder (codecs.IncrementalDecoder): Инкрементальный декодер
+        utf-8
+        __buffer (str): Прочитанный, но еще не разобранный текст
+        __position (int): Позиция разбора в __buffer
+        __eof (bool): Признак окончания файла
+        __bytes_read (int): Число прочитанных байт
+        __total_bytes (int): Размер файла в байтах
+
+    Classes:
+        MalformedJSONException: Ошибка некорректного json-документа
+
+    Methods:
+        __iter__ (Callable[[], Iterator[tuple[str, dict]]]): Возвращает
+        итератор по парам (ключ, json-объект книги)
+    """
+
+    CHUNK_SIZE: int = 1 << 20
+
+    __WHITESPACE: re.Pattern = re.compile(r'[ \t\n\r]*')
+
+    __file: BinaryIO
+    __chunk_size: int
+    __progress: Callable[[int, int], None] | None
+    __decoder: json.JSONDecoder
+    __text_decoder: codecs.IncrementalDecoder
+    __buffer: str
+    __position: int
+    __eof: bool
+    __bytes_read: int
+    __total_bytes: int
+
+    class MalformedJSONException(Exception):
+        """Ошибка некорректного json-документа."""
+
+        message = 'Ошибка: некорректный json-файл библиотеки.'
+
+        def __str__(self):
+            return self.message
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        progress: Callable[[int, int], None] | None = None
+    ):
+        """
+        Инициализирует атрибуты чтения.
+
+        Args:
+            file: Файл, открытый в двоичном режиме
+            chunk_size: Размер блока чтения в байтах
+            progress: Функция, вызываемая после чтения каждого блока с числом
+            прочитанных байт и размером файла
+        """
+        self.__file = file
+        self.__chunk_size = chunk_size
+        self.__progress = progress
+        self.__decoder = json.JSONDecoder()
+        self.__text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.__buffer = ''
+        self.__position = 0
+        self.__eof = False
+        self.__bytes_read = 0
+        try:
+            self.__total_bytes = os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError):
+            self.__total_bytes = 0
+
+    def __read_chunk(self) -> bool:
+        """
+        Дочитывает следующий блок файла в буфер, отбрасывая уже разобранную
+        часть буфера.
+
+        Returns:
+            False, если файл закончился, иначе True
+        """
+        if self.__eof:
+            return False
+        chunk = self.__file.read(self.__chunk_size)
+        self.__buffer = self.__buffer[self.__position:]
+        self.__position = 0
+        if not chunk:
+            self.__eof = True
+            self.__buffer += self.__text_decoder.decode(b'', final=True)
+            return False
+        self.__bytes_read += len(chunk)
+        self.__buffer += self.__text_decoder.decode(chunk)
+        if self.__progress is not None:
+            self.__progress(self.__bytes_read, self.__total_bytes)
+        return True
+
+    def __skip_whitespace(self) -> None:
+        """Пропускает пробельные символы, при необходимости дочитывая файл."""
+        while True:
+            self.__position = self.__WHITESPACE.match(
+                self.__buffer,
+                self.__position
+            ).end()
+            if self.__position < len(self.__buffer) or not self.__read_chunk():
+                return
+
+    def __expect(self, *characters: str) -> str:
+        """
+        Пропускает пробельные символы и считывает один из ожидаемых символов.
+
+        Args:
+            characters: Ожидаемые символы
+
+        Raises:
+            MalformedJSONException
+
+        Returns:
+            Считанный символ
+        """
+        self.__skip_whitespace()
+        if self.__position >= len(self.__buffer):
+            raise self.MalformedJSONException
+        character = self.__buffer[self.__position]
+        if character not in characters:
+            raise self.MalformedJSONException
+        self.__position += 1
+        return character
+
+    def __decode_value(self) -> Any:
+        """
+        Разбирает очередное json-значение, дочитывая файл, пока значение не
+        окажется в буфере целиком.
+
+        Raises:
+            MalformedJSONException
+
+        Returns:
+            Разобранное значение
+        """
+        self.__skip_whitespace()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(
+                    self.__buffer,
+                    self.__position
+                )
+                # Число на границе блока могло быть прочитано не полностью
+                if end < len(self.__buffer) or self.__eof:
+                    self.__position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise self.MalformedJSONException
+            self.__read_chunk()
+
+    def __iter__(self) -> Iterator[tuple[str, dict]]:
+        """
+        Возвращает итератор по парам (ключ, json-объект книги) объекта
+        "books". Остальные ключи верхнего уровня пропускаются.
+
+        Raises:
+            MalformedJSONException
+
+        Returns:
+            Итератор по парам (ключ, json-объект книги)
+        """
+        self.__expect('{')
+        if self.__expect('}', '"') == '}':
+            return
+        self.__position -= 1
+        while True:
+            key = self.__decode_value()
+            self.__expect(':')
+            if key == 'books':
+                yield from self.__iter_books()
+            else:
+                self.__decode_value()
+            if self.__expect(',', '}') == '}':
+                return
+
+    def __iter_books(self) -> Iterator[tuple[str, dict]]:
+        """Возвращает итератор по парам (ключ, json-объект книги)."""
+        self.__expect('{')
+        if self.__expect('}', '"') == '}':
+            return
+        self.__position -= 1
+        while True:
+            key = self.__decode_value()
+            self.__expect(':')
+            yield key, self.__decode_value()
+            if self.__expect(',', '}') == '}':
+                return
@@ -1,7 +1,21 @@
-﻿from pathlib import Path
+﻿from array import array
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, BinaryIO, ContextManager, TextIO
+import bz2
+import contextlib
+import gzip
+import itertools
 import json
+import lzma
+import mmap
+import os
+import re
+import threading
 from ConsoleLibrary import ConsoleLibrary
 from Book import Book
+from JSONBooksReader import JSONBooksReader
+from LazyBookStore import LazyBookStore
 
 
 class JSONManager():
@@ -77,42 +91,810 @@ class JSONManager():
 class LibraryJSONManager(JSONManager):
     """
     Класс файлового менеджера библиотеки.
+
+    В режиме журналирования изменения библиотеки (добавление, удаление книги,
+    смена статуса) накапливаются в виде компактных записей и при сохранении
+    дописываются в журнал рядом с json-файлом ("<путь>.journal"), поэтому 
+    стоимость сохранения зависит от числа изменений, а не от размера 
+    библиотеки. Когда журнал достигает checkpoint_threshold записей, 
+    сохранение выполняет контрольную точку: переписывает json-снимок целиком 
+    и очищает журнал. Загрузка читает снимок и воспроизводит журнал, id книг 
+    при этом сохраняются. Записи журнала идемпотентны, поэтому повторное 
+    воспроизведение журнала после сбоя во время контрольной точки безопасно.
+
+    В ленивом режиме загрузка не разбирает книги: json-файл отображается в 
+    память, регулярным выражением находятся начала json-объектов книг, а 
+    библиотека получает ленивое хранилище LazyBookStore, которое разбирает 
+    книгу при первом обращении к ней. id книг при этом сохраняются. 
+    Сохранение в ленивом режиме всегда переписывает файл через временный 
+    файл и заново отображает его в память.
+
+    Файлы с расширениями из COMPRESSIONS (например, library.json.gz) 
+    сжимаются и распаковываются потоково соответствующим кодеком. Журнал не 
+    сжимается. Сжатый файл нельзя отобразить в память, поэтому он всегда 
+    загружается без ленивого режима.
+
+    В режиме слияния загрузка не пересоздает библиотеку, а сравнивает книги 
+    файла (и журнала) с книгами библиотеки по сохраненным id и заменяет, 
+    добавляет и удаляет только отличающиеся книги, см. __read_merging. Книги 
+    несжатого файла разбираются из отображения файла в память, а 
+    совпадающие книги не создаются, поэтому повторная загрузка почти 
+    неизмененного файла дешева. id книг при этом сохраняются.
     
     Attributes:
         obj (ConsoleLibrary): Библиотека для сохранения-загрузки.
+        journaling (bool): Признак режима журналирования
+        checkpoint_threshold (int): Число записей журнала, при достижении 
+        которого сохранение выполняет контрольную точку
+        lazy (bool): Признак ленивого режима
+        merge (bool): Признак режима слияния
+        __lazy_books (LazyBookStore | None): Ленивое хранилище книг 
+        отображенного в память json-файла
+        __pending_records (list[list]): Записи журнала, еще не дописанные в 
+        файл
+        __journal_length (int): Число записей в файле журнала
+        __needs_checkpoint (bool): Признак того, что библиотека не была 
+        загружена из снимка по текущему пути и журнал к нему неприменим
+        __save_lock (threading.Lock): Блокировка, не дающая сохранениям и 
+        загрузкам из разных потоков (например, автосохранению) выполняться 
+        одновременно
+        PROGRESS_MIN_FILE_SIZE (int): Размер файла в байтах, начиная с 
+        которого печатается ход загрузки
+        PROGRESS_STEP (int): Шаг печати хода загрузки в процентах
+        JOURNAL_SUFFIX (str): Суффикс пути до файла журнала
+        DUMP_CHUNK_SIZE (int): Число книг, записываемых в файл за раз
+        COMPRESSIONS (dict[str, Callable[..., IO]]): Функции открытия 
+        сжатых файлов по расширениям
         
     Methods:
         get_file_path (Callable[[], None]): Возвращает путь до json-файла 
         сохранения-загрузки
         set_file_path (Callable[[str], None]): Устанавливает путь до json-файла
         сохранения-загрузки
+        get_journal_path (Callable[[], str]): Возвращает путь до файла журнала
+        get_compression (Callable[[], Callable[..., IO] | None]): Возвращает 
+        функцию открытия сжатого файла по расширению json-файла
         save_to_json (Callable[[object], None]): Сохраняет библиотеку в 
         json-файл
         read_from_json (Callable[[object], None]): Загружает библиотеку из 
         json-файла
+        checkpoint (Callable[[], None]): Переписывает json-снимок целиком и 
+        очищает журнал
+        close (Callable[[], None]): Закрывает отображение json-файла в память
+        в ленивом режиме
     """
 
     obj: ConsoleLibrary
+    journaling: bool
+    checkpoint_threshold: int
+    lazy: bool
+    merge: bool
+    __lazy_books: LazyBookStore | None
+    __pending_records: list[list]
+    __journal_length: int
+    __needs_checkpoint: bool
+    __save_lock: threading.Lock
+    __printed_percent: int
+
+    PROGRESS_MIN_FILE_SIZE: int = 64 * 2**20
+    PROGRESS_STEP: int = 10
+    JOURNAL_SUFFIX: str = '.journal'
+    DUMP_CHUNK_SIZE: int = 4096
+    COMPRESSIONS: dict[str, Callable[..., IO]] = {
+        '.gz': gzip.open, 
+        '.bz2': bz2.open, 
+        '.xz': lzma.open, 
+        '.lzma': lzma.open
+    }
+
+    __BOOK_KEY: re.Pattern = re.compile(rb'"(-?\d+)"\s*:\s*\{')
+
+    def __init__(
+        self, 
+        file_path: str, 
+        obj: ConsoleLibrary, 
+        journaling: bool = False, 
+        checkpoint_threshold: int = 10000, 
+        lazy: bool = False, 
+        merge: bool = False
+    ):
+        """
+        Инициализирует атрибуты __file_path, obj, journaling, 
+        checkpoint_threshold, lazy, merge. В режиме журналирования 
+        подписывается на изменения библиотеки.
+        
+        Args: 
+            file_path: Путь до json-файла сохранения-загрузки
+            obj: Библиотека для сохранения-загрузки
+            journaling: Признак режима журналирования
+            checkpoint_threshold: Число записей журнала, при достижении 
+            которого сохранение выполняет контрольную точку
+            lazy: Признак ленивого режима
+            merge: Признак режима слияния, в ленивом режиме не действует
+
+        Raises:
+            FileNotFoundError: Ошибка несуществующего файла по указанному пути
+        """
+        super().__init__(file_path, obj)
+        self.journaling = journaling
+        self.checkpoint_threshold = checkpoint_threshold
+        self.lazy = lazy
+        self.merge = merge
+        self.__lazy_books = None
+        self.__pending_records = []
+        self.__journal_length = 0
+        self.__needs_checkpoint = True
+        self.__save_lock = threading.Lock()
+        if journaling:
+            obj.add_listener(self.__record)
+
+    def set_file_path(self, file_path: str) -> None:
+        """
+        Устанавливает путь до json-файла сохранения-загрузки. Журнал по новому
+        пути неприменим к библиотеке, поэтому следующее сохранение выполнит 
+        контрольную точку.
+        
+        Args: 
+            file_path: Путь до json-файла сохранения-загрузки
+
+        Raises:
+            FileNotFoundError: Ошибка несуществующего файла по указанному пути
+
+        Returns:
+            None
+        """
+        super().set_file_path(file_path)
+        self.__needs_checkpoint = True
+
+    def get_journal_path(self) -> str:
+        """Возвращает путь до файла журнала."""
+        return self.get_file_path() + self.JOURNAL_SUFFIX
+
+    def get_compression(self) -> Callable[..., IO] | None:
+        """
+        Возвращает функцию открытия сжатого файла по расширению json-файла 
+        или None, если файл не сжимается.
+        """
+        return self.COMPRESSIONS.get(Path(self.get_file_path()).suffix)
+
+    def __maps_file(self) -> bool:
+        """
+        Возвращает признак того, что json-файл загружается лениво с 
+        отображением в память.
+        """
+        return self.lazy and self.get_compression() is None
 
     def save_to_json(self) -> None:
-        """Сохраняет библиотеку в json-файл."""
-        with open(self.get_file_path(), 'w') as f:
-            json.dump(self.obj, f, default=lambda o: o.__dict__)
+        """
+        Сохраняет библиотеку в json-файл. В режиме журналирования дописывает 
+        накопленные записи в журнал, а при достижении checkpoint_threshold 
+        записей или если библиотека не была загружена по текущему пути 
+        выполняет контрольную точку. Книги и записи журнала копируются под 
+        блокировкой библиотеки на чтение, а файл записывается после ее 
+        освобождения, поэтому сохранение не задерживает изменяющие команды 
+        на время записи.
+
+        Returns:
+            None
+        """
+        with self.__save_lock:
+            with self.obj.reading():
+                appends_to_journal = self.journaling \
+                    and not self.__needs_checkpoint \
+                    and self.__journal_length + len(self.__pending_records) \
+                    < self.checkpoint_threshold
+                if appends_to_journal:
+                    records = list(self.__pending_records)
+                elif not self.journaling and not self.__maps_file():
+                    rows = self.__copy_rows()
+            if appends_to_journal:
+                self.__append_to_journal(records)
+            elif not self.journaling and not self.__maps_file():
+                self.__write(self.get_file_path(), rows, durable=False)
+            else:
+                self.__checkpoint()
+
+    def __append_to_journal(self, records: list[list]) -> None:
+        """
+        Дописывает скопированные записи в журнал и удаляет их из 
+        накопленных. Записи, накопленные во время записи, остаются до 
+        следующего сохранения.
+        """
+        if len(records) == 0:
+            return
+        with open(self.get_journal_path(), 'a', encoding='utf-8') as f:
+            f.write(''.join(
+                json.dumps(record, ensure_ascii=False) + '\n' 
+                for record in records
+            ))
+            f.flush()
+            os.fsync(f.fileno())
+        with self.obj.reading():
+            del self.__pending_records[:len(records)]
+            self.__journal_length += len(records)
+
+    def checkpoint(self) -> None:
+        """
+        Переписывает json-снимок целиком через временный файл и очищает 
+        журнал.
+
+        Returns:
+            None
+        """
+        with self.__save_lock:
+            self.__checkpoint()
+
+    def __get_write_count(self) -> int | None:
+        """
+        Возвращает число завершенных захватов блокировки библиотеки на 
+        запись или None вне потокобезопасного режима.
+        """
+        if self.obj.lock is None:
+            return None
+        return self.obj.lock.get_write_count()
+
+    def __checkpoint(self) -> None:
+        """
+        Выполняет контрольную точку. Книги копируются под блокировкой 
+        библиотеки на чтение, а временный файл записывается после ее 
+        освобождения. Записи журнала, накопленные во время записи, 
+        остаются для следующего сохранения. В ленивом режиме хранилище книг 
+        подменяется отображением нового файла под блокировкой на запись: 
+        отображение прежнего файла закрывается до его замены. Если 
+        библиотеку изменили во время записи, ленивое хранилище потеряло бы 
+        эти изменения, поэтому файл записывается заново под блокировкой на 
+        запись.
+        """
+        file_path = self.get_file_path()
+        temp_file_path = file_path + '.tmp'
+        with self.obj.reading():
+            rows = self.__copy_rows()
+            record_count = len(self.__pending_records)
+            write_count = self.__get_write_count()
+        self.__write(temp_file_path, rows, durable=True)
+        del rows
+        if self.__maps_file():
+            with self.obj.writing():
+                if self.__get_write_count() != write_count:
+                    self.__write(
+                        temp_file_path, 
+                        self.__copy_rows(), 
+                        durable=True
+                    )
+                    record_count = len(self.__pending_records)
+                self.close()
+                os.replace(temp_file_path, file_path)
+                self.__set_lazy_books(
+                    self.__open_lazy_books(), 
+                    keep_indexes=True
+                )
+                self.__finish_checkpoint(record_count)
+            return
+        os.replace(temp_file_path, file_path)
+        with self.obj.reading():
+            self.__finish_checkpoint(record_count)
+
+    def __finish_checkpoint(self, record_count: int) -> None:
+        """
+        Очищает журнал и удаляет из накопленных записи, вошедшие в снимок. 
+        Вызывается под блокировкой библиотеки.
+        """
+        if self.journaling:
+            open(self.get_journal_path(), 'w').close()
+        del self.__pending_records[:record_count]
+        self.__journal_length = 0
+        self.__needs_checkpoint = False
 
     def read_from_json(self) -> None:
-        """Загружает библиотеку из json-файла."""
-        with open(self.get_file_path(), 'r') as f:
-            json_books = json.load(f)['books']
-            self.obj.books.clear()
-            for json_book in json_books.values():
-                json_book.pop('_Book__id')
-                json_book_status = json_book.pop('_Book__status')
-                book = Book(**json_book)
-                for i, status in book.STATUSES.items():
-                    if json_book_status == status:
-                        book.set_status(i)
-                        break
-                self.obj.books[book.get_id()] = book
+        """
+        Загружает библиотеку из json-файла, в ленивом режиме - см. 
+        __read_lazily. Файл разбирается потоково по 
+        одной книге, поэтому пиковое потребление памяти близко к размеру 
+        загруженной библиотеки. Для файлов размером от 
+        PROGRESS_MIN_FILE_SIZE печатает ход загрузки. Библиотека заменяется 
+        только после успешного разбора всего файла. В режиме журналирования 
+        сохраняет id книг, воспроизводит журнал и отбрасывает несохраненные 
+        изменения. Загрузка не выполняется одновременно с сохранением.
 
+        Raises:
+            JSONBooksReader.MalformedJSONException
 
+        Returns:
+            None
+        """
+        with self.__save_lock:
+            self.__read()
+
+    def __read(self) -> None:
+        """Загружает библиотеку из json-файла под блокировкой сохранения."""
+        if self.__maps_file():
+            self.__read_lazily()
+            return
+        if self.merge:
+            self.__read_merging()
+            return
+        file_path = self.get_file_path()
+        progress = None
+        # Ход загрузки сжатого файла неизвестен: читаются распакованные байты
+        if Path(file_path).stat().st_size >= self.PROGRESS_MIN_FILE_SIZE \
+                and self.get_compression() is None:
+            progress = self.__print_progress
+            self.__printed_percent = -self.PROGRESS_STEP
+        books = {}
+        with open(file_path, 'rb') as f, self.__decompress(f) as stream:
+            for _, json_book in JSONBooksReader(stream, progress=progress):
+                book = self.__build_book(json_book)
+                books[book.get_id()] = book
+        journal_length = 0
+        if self.journaling:
+            journal_length = self.__replay_journal(books)
+            if len(books) > 0:
+                Book.advance_id_counter(max(books))
+        with self.obj.writing():
+            self.obj.replace_books(books)
+            self.__pending_records.clear()
+            self.__journal_length = journal_length
+            self.__needs_checkpoint = False
+
+    def __read_merging(self) -> None:
+        """
+        Загружает библиотеку из json-файла слиянием. Файл (и журнал) 
+        разбирается и сравнивается с библиотекой под блокировкой на чтение, 
+        поэтому чтение библиотеки во время разбора не блокируется, а 
+        блокировка на запись захватывается только на время применения 
+        отличий ConsoleLibrary.merge_books. Если библиотеку изменили между 
+        сравнением и слиянием, сравнение повторяется под блокировкой на 
+        запись. Если файл некорректен, библиотека не меняется.
+
+        Raises:
+            JSONBooksReader.MalformedJSONException
+
+        Returns:
+            None
+        """
+        with self.obj.reading():
+            write_count = self.__get_write_count()
+            diff = self.__diff_json_books()
+        with self.obj.writing():
+            if self.__get_write_count() != write_count:
+                diff = self.__diff_json_books()
+            merged_books, deleted_ids, max_id, journal_length = diff
+            self.obj.merge_books(merged_books, deleted_ids)
+            if max_id >= 0:
+                Book.advance_id_counter(max_id)
+            self.__pending_records.clear()
+            self.__journal_length = journal_length
+            self.__needs_checkpoint = False
+
+    def __diff_json_books(self) -> tuple[list[Book], list[int], int, int]:
+        """
+        Сравнивает книги json-файла с книгами библиотеки по id, книга 
+        создается, только если ее нет в библиотеке или ее атрибуты или 
+        статус отличаются. В режиме журналирования поверх файла 
+        воспроизводится журнал. Вызывается под блокировкой библиотеки.
+
+        Raises:
+            JSONBooksReader.MalformedJSONException
+
+        Returns:
+            Кортеж (отличающиеся книги, id удаленных книг, наибольший id 
+            книги файла и журнала или -1, число записей журнала)
+        """
+        books = self.obj.books
+        file_ids = set()
+        # Отличающиеся от библиотеки книги файла и журнала по id, None - 
+        # книга удалена журналом
+        changed_books: dict[int, Book | None] = {}
+        max_id = -1
+        for id, json_book in self.__iter_json_books():
+            file_ids.add(id)
+            max_id = max(max_id, id)
+            book = books.get(id)
+            try:
+                if book is None or not self.__is_same_book(book, json_book):
+                    changed_books[id] = self.__build_book(json_book, id)
+            except (KeyError, TypeError, Book.EmptyBookAttributeException):
+                raise JSONBooksReader.MalformedJSONException
+        journal_length = 0
+        if self.journaling:
+            for record in self.__read_journal():
+                operation, id = record[0], record[1]
+                if operation == 'a':
+                    changed_books[id] = Book(*record[2:5], id=id)
+                    max_id = max(max_id, id)
+                elif operation == 'd':
+                    changed_books[id] = None
+                elif operation == 's':
+                    self.__merge_status(
+                        changed_books, 
+                        books if id in file_ids else {}, 
+                        id, 
+                        record[2]
+                    )
+                journal_length += 1
+        deleted_ids = [
+            id for id in books 
+            if id not in file_ids and id not in changed_books
+        ]
+        merged_books = []
+        for id, book in changed_books.items():
+            if book is None:
+                if id in books:
+                    deleted_ids.append(id)
+            elif id not in books or not self.__is_same_book(books[id], book):
+                merged_books.append(book)
+        return merged_books, deleted_ids, max_id, journal_length
 
+    @staticmethod
+    def __is_same_book(book: Book, other: Book | dict) -> bool:
+        """
+        Возвращает признак совпадения атрибутов и статуса книги с книгой 
+        или json-объектом книги. Неизвестный статус json-объекта считается 
+        статусом по умолчанию, как при создании книги из него.
+        """
+        if isinstance(other, Book):
+            title, author, year = other.title, other.author, other.year
+            status = other.get_status()
+        else:
+            title, author = other['title'], other['author']
+            year = other['year']
+            status = other['_Book__status']
+            if status not in Book.STATUS_CODES:
+                status = Book.STATUSES[0]
+        return book.title == title and book.author == author \
+            and book.year == year and book.get_status() == status
+
+    @staticmethod
+    def __merge_status(
+        changed_books: dict[int, Book | None], 
+        books: dict[int, Book], 
+        id: int, 
+        status_code: int
+    ) -> None:
+        """
+        Применяет запись журнала о смене статуса при загрузке слиянием. 
+        Книга библиотеки не меняется на месте: изменяется ее копия.
+        """
+        if id in changed_books:
+            book = changed_books[id]
+        elif id in books:
+            book = books[id]
+            book = Book(book.title, book.author, book.year, id=id)
+            changed_books[id] = book
+        else:
+            book = None
+        if book is not None:
+            book.set_status(status_code)
+
+    def __iter_json_books(self) -> Iterator[tuple[int, dict]]:
+        """
+        Возвращает итератор по id и json-объектам книг json-файла. Несжатый 
+        файл отображается в память, а книги находятся регулярным выражением, 
+        как в ленивом режиме, и разбираются встроенным json-декодером; 
+        сжатый файл разбирается потоково JSONBooksReader.
+
+        Raises:
+            JSONBooksReader.MalformedJSONException
+        """
+        with open(self.get_file_path(), 'rb') as f:
+            if self.get_compression() is not None:
+                with self.__decompress(f) as stream:
+                    for key, json_book in JSONBooksReader(stream):
+                        yield int(key), json_book
+                return
+            if os.fstat(f.fileno()).st_size == 0:
+                raise JSONBooksReader.MalformedJSONException
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                # Совпадения ссылаются на отображение и не дают закрыть его, 
+                # поэтому запоминаются только их границы
+                keys = [
+                    (int(match.group(1)), match.start(), match.end() - 1) 
+                    for match in self.__BOOK_KEY.finditer(mapping)
+                ]
+                ends = [start for _, start, _ in keys[1:]] + [len(mapping)]
+                decoder = json.JSONDecoder()
+                for (id, _, start), end in zip(keys, ends):
+                    try:
+                        json_book, _ = decoder.raw_decode(
+                            mapping[start:end].decode('utf-8')
+                        )
+                    except ValueError:
+                        raise JSONBooksReader.MalformedJSONException
+                    yield id, json_book
+
+    def __read_lazily(self) -> None:
+        """
+        Загружает библиотеку из json-файла без разбора книг: подменяет 
+        хранилище книг библиотеки ленивым хранилищем отображенного в память 
+        файла и воспроизводит журнал в режиме журналирования. Индексы 
+        библиотеки строятся при первом запросе, который их использует.
+
+        Returns:
+            None
+        """
+        books = self.__open_lazy_books()
+        try:
+            journal_length = 0
+            if self.journaling:
+                journal_length = self.__replay_journal(books)
+            if len(books) > 0:
+                Book.advance_id_counter(max(books))
+        except BaseException:
+            books.close()
+            raise
+        with self.obj.writing():
+            self.__set_lazy_books(books, keep_indexes=False)
+            self.__pending_records.clear()
+            self.__journal_length = journal_length
+            self.__needs_checkpoint = False
+
+    def __open_lazy_books(self) -> LazyBookStore:
+        """
+        Отображает json-файл в память и возвращает его ленивое хранилище 
+        книг. Начала json-объектов книг находятся регулярным выражением по 
+        ключам-id объекта "books": внутри json-строк неэкранированных кавычек 
+        не бывает, поэтому совпадения в названиях книг невозможны. Книга 
+        разбирается из участка файла от начала ее объекта до начала 
+        следующего при первом обращении.
+
+        Returns:
+            Ленивое хранилище книг
+        """
+        f = open(self.get_file_path(), 'rb')
+        try:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise JSONBooksReader.MalformedJSONException
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            f.close()
+            raise
+        ids = array('q')
+        starts = array('Q')
+        for match in self.__BOOK_KEY.finditer(mapping):
+            ids.append(int(match.group(1)))
+            starts.append(match.end() - 1)
+        starts.append(len(mapping))
+        decoder = json.JSONDecoder()
+        def decode(position: int) -> Book:
+            text = mapping[starts[position]:starts[position + 1]]
+            try:
+                json_book, _ = decoder.raw_decode(text.decode('utf-8'))
+                return self.__build_book(json_book, ids[position])
+            except (ValueError, KeyError, TypeError, 
+                    Book.EmptyBookAttributeException):
+                raise JSONBooksReader.MalformedJSONException
+        def close() -> None:
+            mapping.close()
+            f.close()
+        positions = None
+        if any(previous >= id for previous, id in itertools.pairwise(ids)):
+            positions = {id: position for position, id in enumerate(ids)}
+        return LazyBookStore(ids, decode, positions, close)
+
+    def __set_lazy_books(
+        self, 
+        books: LazyBookStore, 
+        keep_indexes: bool
+    ) -> None:
+        """
+        Подменяет хранилище книг библиотеки ленивым хранилищем и закрывает 
+        прежнее.
+        """
+        self.obj.set_books(books, keep_indexes)
+        self.close()
+        self.__lazy_books = books
+
+    def close(self) -> None:
+        """
+        Закрывает отображение json-файла в память в ленивом режиме. Книги, 
+        к которым библиотека еще не обращалась, становятся недоступны.
+        """
+        if self.__lazy_books is not None:
+            self.__lazy_books.close()
+            self.__lazy_books = None
+
+    def __decompress(self, f: BinaryIO) -> ContextManager[BinaryIO]:
+        """
+        Возвращает поток распакованных байт json-файла, открытого в 
+        двоичном режиме, или сам файл, если он не сжимается.
+        """
+        compression = self.get_compression()
+        if compression is None:
+            return contextlib.nullcontext(f)
+        return compression(f, 'rb')
+
+    def __copy_rows(self) -> list[tuple[int, str, str, str, str]]:
+        """
+        Копирует атрибуты книг библиотеки для записи снимка после 
+        освобождения блокировки библиотеки. Вызывается под блокировкой 
+        библиотеки. Строки атрибутов не копируются, поэтому копия занимает 
+        по кортежу на книгу.
+
+        Returns:
+            Кортежи (id, название, автор, год издания, статус)
+        """
+        return [
+            (id, book.title, book.author, book.year, book.get_status()) 
+            for id, book in self.obj.books.items()
+        ]
+
+    def __write(
+        self, 
+        file_path: str, 
+        rows: list[tuple[int, str, str, str, str]], 
+        durable: bool
+    ) -> None:
+        """
+        Записывает json-снимок библиотеки в файл, потоково сжимая его, если 
+        расширение json-файла есть в COMPRESSIONS.
+
+        Args:
+            file_path: Путь до файла
+            rows: Кортежи (id, название, автор, год издания, статус) книг
+            durable: Признак сброса файла на диск перед закрытием
+
+        Returns:
+            None
+        """
+        compression = self.get_compression()
+        with open(file_path, 'w' if compression is None else 'wb') as f:
+            if compression is None:
+                self.__dump(f, rows)
+            else:
+                # Кодек не закрывает переданный ему файл
+                with compression(f, 'wt', encoding='utf-8') as text:
+                    self.__dump(text, rows)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def __dump(
+        self, 
+        f: TextIO, 
+        rows: list[tuple[int, str, str, str, str]]
+    ) -> None:
+        """
+        Записывает json-снимок библиотеки в файл блоками по DUMP_CHUNK_SIZE 
+        книг. Формат совпадает с json.dump словаря {"books": books}.
+
+        Args:
+            f: Файл, открытый в текстовом режиме на запись
+            rows: Кортежи (id, название, автор, год издания, статус) книг
+
+        Returns:
+            None
+        """
+        f.write('{"books": {')
+        separator = ''
+        chunk = []
+        for id, title, author, year, status in rows:
+            chunk.append(f'{separator}"{id}": ')
+            chunk.append(json.dumps({
+                '_Book__id': id,
+                'title': title,
+                'author': author,
+                'year': year,
+                '_Book__status': status
+            }))
+            separator = ', '
+            if len(chunk) >= 2 * self.DUMP_CHUNK_SIZE:
+                f.write(''.join(chunk))
+                chunk.clear()
+        f.write(''.join(chunk))
+        f.write('}}')
+
+    def __record(self, event: str, book: Book) -> None:
+        """
+        Добавляет запись журнала об изменении библиотеки:
+            ["a", id, title, author, year] - добавление книги;
+            ["d", id] - удаление книги;
+            ["s", id, status_code] - смена статуса книги.
+
+        Args:
+            event: Событие изменения библиотеки
+            book: Измененная книга
+
+        Returns:
+            None
+        """
+        if event == 'add':
+            record = ['a', book.get_id(), book.title, book.author, book.year]
+        elif event == 'delete':
+            record = ['d', book.get_id()]
+        elif event == 'status':
+            record = [
+                's', 
+                book.get_id(), 
+                Book.STATUS_CODES[book.get_status()]
+            ]
+        else:
+            return
+        self.__pending_records.append(record)
+
+    def __replay_journal(self, books: dict[int, Book]) -> int:
+        """
+        Воспроизводит журнал поверх загруженных книг. Обрезанная последняя 
+        запись (сбой во время дописывания) пропускается.
+
+        Args:
+            books: Книги, загруженные из json-снимка
+
+        Returns:
+            Число воспроизведенных записей
+        """
+        journal_length = 0
+        for record in self.__read_journal():
+            operation, id = record[0], record[1]
+            if operation == 'a':
+                books[id] = Book(*record[2:5], id=id)
+            elif operation == 'd':
+                books.pop(id, None)
+            elif operation == 's' and id in books:
+                books[id].set_status(record[2])
+            journal_length += 1
+        return journal_length
+
+    def __read_journal(self) -> Iterator[list]:
+        """
+        Возвращает итератор по записям журнала. Обрезанная последняя запись 
+        удаляется из журнала, чтобы новые записи дописывались с начала 
+        строки.
+        """
+        journal_path = self.get_journal_path()
+        if not Path(journal_path).is_file():
+            return
+        with open(journal_path, 'r+b') as f:
+            offset = 0
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError
+                    record = json.loads(line)
+                except ValueError:
+                    f.truncate(offset)
+                    return
+                offset += len(line)
+                yield record
+
+    def __build_book(self, json_book: dict, id: int | None = None) -> Book:
+        """
+        Создает книгу по ее json-объекту. В режиме журналирования сохраняет 
+        id книги, иначе генерирует его заново.
+
+        Args:
+            json_book: json-объект книги
+            id: id книги, если он известен заранее
+
+        Returns:
+            Книга
+        """
+        if id is None and self.journaling:
+            id = json_book['_Book__id']
+        book = Book(
+            json_book['title'], 
+            json_book['author'], 
+            json_book['year'], 
+            id=id
+        )
+        status_code = Book.STATUS_CODES.get(json_book['_Book__status'])
+        if status_code is not None:
+            book.set_status(status_code)
+        return book
+
+    def __print_progress(self, bytes_read: int, total_bytes: int) -> None:
+        """
+        Печатает ход загрузки с шагом PROGRESS_STEP процентов.
+
+        Args:
+            bytes_read: Число прочитанных байт
+            total_bytes: Размер файла в байтах
+
+        Returns:
+            None
+        """
+        percent = bytes_read * 100 // max(total_bytes, 1)
+        if percent - self.__printed_percent < self.PROGRESS_STEP:
+            return
+        self.__printed_percent = percent
+        print(f'Загрузка библиотеки: {percent}% '
+              f'({bytes_read // 2**20} из {total_bytes // 2**20} МиБ).')
@@ -0,0 +1,147 @@
+﻿from collections.abc import (
+    Callable, Iterator, Mapping, MutableMapping, Sequence
+)
+import bisect
+from Book import Book
+
+
+class LazyBookStore(MutableMapping):
+    """
+    Класс ленивого хранилища книг, заменяющего dict[int, Book] в
+    ConsoleLibrary.books. Хранилище опирается на источник записей книг
+    (например, отображенный в память файл): книга создается из своей записи
+    только при первом обращении к ней и дальше хранится как обычный объект
+    Book, поэтому изменения ее статуса сохраняются. Добавленные книги
+    хранятся отдельно, удаленные книги источника помечаются. Книги
+    перечисляются в порядке записей источника, затем - в порядке добавления.
+
+    Attributes:
+        __ids (Sequence[int]): id книг источника по номерам записей
+        __decode (Callable[[int], Book]): Функция создания книги по номеру
+        записи источника
+        __positions (Mapping[int, int] | None): Номера записей источника по
+        id, None - id источника отсортированы по возрастанию и номер записи
+        ищется двоичным поиском
+        __close (Callable[[], None] | None): Функция освобождения источника
+        __materialized (dict[int, Book]): Книги, уже созданные из записей
+        источника
+        __added (dict[int, Book]): Добавленные книги, которых нет в источнике
+        __deleted (set[int]): id удаленных книг источника
+
+    Methods:
+        get_materialized_count (Callable[[], int]): Возвращает число книг,
+        созданных из записей источника
+        close (Callable[[], None]): Освобождает источник записей
+    """
+
+    __ids: Sequence[int]
+    __decode: Callable[[int], Book]
+    __positions: Mapping[int, int] | None
+    __close: Callable[[], None] | None
+    __materialized: dict[int, Book]
+    __added: dict[int, Book]
+    __deleted: set[int]
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        decode: Callable[[int], Book],
+        positions: Mapping[int, int] | None = None,
+        close: Callable[[], None] | None = None
+    ):
+        """
+        Инициализирует атрибуты хранилища.
+
+        Args:
+            ids: id книг источника по номерам записей
+            decode: Функция создания книги по номеру записи источника
+            positions: Номера записей источника по id, None - ids
+            отсортированы по возрастанию
+            close: Функция освобождения источника
+        """
+        self.__ids = ids
+        self.__decode = decode
+        self.__positions = positions
+        self.__close = close
+        self.__materialized = {}
+        self.__added = {}
+        self.__deleted = set()
+
+    def __position(self, id: int) -> int | None:
+        """Возвращает номер записи источника по id или None."""
+        if id in self.__deleted:
+            return None
+        if self.__positions is not None:
+            return self.__positions.get(id)
+        ids = self.__ids
+        position = bisect.bisect_left(ids, id)
+        if position < len(ids) and ids[position] == id:
+            return position
+        return None
+
+    def __len__(self) -> int:
+        return len(self.__ids) - len(self.__deleted) + len(self.__added)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self.__added or id in self.__materialized \
+            or (isinstance(id, int) and self.__position(id) is not None)
+
+    def __iter__(self) -> Iterator[int]:
+        deleted = self.__deleted
+        for id in self.__ids:
+            if id not in deleted:
+                yield id
+        yield from list(self.__added)
+
+    def __getitem__(self, id: int) -> Book:
+        book = self.__materialized.get(id)
+        if book is not None:
+            return book
+        book = self.__added.get(id)
+        if book is not None:
+            return book
+        position = self.__position(id) if isinstance(id, int) else None
+        if position is None:
+            raise KeyError(id)
+        book = self.__decode(position)
+        self.__materialized[id] = book
+        return book
+
+    def __setitem__(self, id: int, book: Book) -> None:
+        # Удаленная и добавленная заново книга источника перечисляется среди
+        # добавленных
+        if id not in self.__added and self.__position(id) is not None:
+            self.__materialized[id] = book
+        else:
+            self.__added[id] = book
+
+    def __delitem__(self, id: int) -> None:
+        if id in self.__added:
+            del self.__added[id]
+            return
+        if self.__position(id) is None:
+            raise KeyError(id)
+        self.__deleted.add(id)
+        self.__materialized.pop(id, None)
+
+    def clear(self) -> None:
+        """Удаляет все книги из хранилища и освобождает источник записей."""
+        self.close()
+        self.__ids = ()
+        self.__positions = None
+        self.__materialized = {}
+        self.__added = {}
+        self.__deleted = set()
+
+    def get_materialized_count(self) -> int:
+        """Возвращает число книг, созданных из записей источника."""
+        return len(self.__materialized)
+
+    def close(self) -> None:
+        """
+        Освобождает источник записей. После этого обращаться можно только
+        к уже созданным и добавленным книгам.
+        """
+        if self.__close is not None:
+            self.__close()
+            self.__close = None
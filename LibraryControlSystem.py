@@ -1,25 +1,172 @@
-﻿from Console import Console
+﻿from argparse import ArgumentParser, Namespace
+import asyncio
+from pathlib import Path
+import sys
+from Autosaver import Autosaver
+from BookImporter import BookImporter
+from Console import Console
+from ConsoleServer import ConsoleServer
 from ConsoleLibrary import ConsoleLibrary
+from ColumnarBookStore import ColumnarBookStore
 from JSONManager import LibraryJSONManager
+from SQLiteManager import LibrarySQLiteManager
+from SnapshotManager import LibrarySnapshotManager
+from ShardedManager import LibraryShardedManager
+
+
+# Команды, не изменяющие библиотеку: выполняются сервером параллельно
+READ_ONLY_COMMANDS: tuple[str, ...] = (
+    'help', 
+    'stats', 
+    'find_book', 
+    'search', 
+    'query', 
+    'explain_query', 
+    'show_books', 
+    'show_books_by_status', 
+    'count_books_by_status', 
+    'find_by_author', 
+    'find_by_year_range', 
+    'sql_find_book', 
+    'sql_show_books_by_status'
+)
+
+
+def parse_args() -> Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = ArgumentParser(description='Система управления библиотекой.')
+    parser.add_argument(
+        '--file', 
+        default=r'.\library.json',
+        help='Путь до файла сохранения-загрузки библиотеки: json-файл, ' \
+             'база данных SQLite (.db, .sqlite, .sqlite3), двоичный ' \
+             'снимок (.lcsb) или манифест шардов (.lcsm).'
+    )
+    parser.add_argument(
+        '--columnar', 
+        action='store_true',
+        help='Хранить книги в столбцовом хранилище (экономит память).'
+    )
+    parser.add_argument(
+        '--lazy', 
+        action='store_true',
+        help='Загружать json-файл лениво: книги разбираются при первом ' \
+             'обращении к ним.'
+    )
+    parser.add_argument(
+        '--merge-load', 
+        action='store_true',
+        help='Загружать json-файл слиянием: заменяются только книги, ' \
+             'отличающиеся от книг библиотеки.'
+    )
+    parser.add_argument(
+        '--workers', 
+        type=int,
+        metavar='N',
+        help='Число процессов, разбирающих шарды при загрузке (.lcsm), ' \
+             'по умолчанию - число процессоров.'
+    )
+    parser.add_argument(
+        '--autosave', 
+        action='store_true',
+        help='Автоматически сохранять json-файл в фоновом потоке.'
+    )
+    parser.add_argument(
+        '--autosave-mutations', 
+        type=int,
+        default=Autosaver.MUTATION_THRESHOLD,
+        metavar='N',
+        help='Число изменений, после которого выполняется автосохранение.'
+    )
+    parser.add_argument(
+        '--autosave-interval', 
+        type=float,
+        default=Autosaver.QUIET_PERIOD,
+        metavar='SECONDS',
+        help='Пауза в изменениях в секундах, после которой выполняется ' \
+             'автосохранение.'
+    )
+    parser.add_argument(
+        '--batch', 
+        metavar='PATH',
+        help='Выполнить команды из файла (- для stdin) без интерактивного ' \
+             'ввода и завершить работу.'
+    )
+    parser.add_argument(
+        '--quiet', 
+        action='store_true',
+        help='В пакетном режиме печатать только ошибки выполнения команд.'
+    )
+    parser.add_argument(
+        '--serve', 
+        metavar='HOST:PORT',
+        help='Обслуживать сессии консоли по TCP вместо интерактивного ввода.'
+    )
+    parser.add_argument(
+        '--stats', 
+        action='store_true',
+        help='Собирать статистику времени выполнения команд (команда stats).'
+    )
+    parser.add_argument(
+        '--stats-file', 
+        metavar='PATH',
+        help='Периодически записывать статистику команд в json-файл ' \
+             '(включает --stats).'
+    )
+    parser.add_argument(
+        '--stats-interval', 
+        type=float,
+        default=60,
+        metavar='SECONDS',
+        help='Период записи статистики команд в файл в секундах.'
+    )
+    return parser.parse_args()
 
 
 def main() -> None:    
-    # Создание консольной библиотеки
-    console_library = ConsoleLibrary()
+    args = parse_args()
+    # Создание консольной библиотеки, потокобезопасной при обслуживании 
+    # сессий по TCP и автосохранении
+    console_library = ConsoleLibrary(
+        ColumnarBookStore() if args.columnar else None,
+        thread_safe=args.serve is not None or args.autosave
+    )
     # Создание Singleton-консоли
     console = Console()
-    # Создание файлового менеджера
-    default_file_path = r'.\library.json'
-    library_json_manager = LibraryJSONManager(
-        default_file_path, 
-        console_library
-    )
+    # Включение сбора статистики выполнения команд
+    if args.stats or args.stats_file is not None:
+        console.enable_stats(args.stats_file, args.stats_interval)
+    # Создание файлового менеджера по расширению файла
+    if Path(args.file).suffix in LibrarySQLiteManager.EXTENSIONS:
+        library_manager = LibrarySQLiteManager(args.file, console_library)
+    elif Path(args.file).suffix in LibrarySnapshotManager.EXTENSIONS:
+        library_manager = LibrarySnapshotManager(args.file, console_library)
+    elif Path(args.file).suffix in LibraryShardedManager.EXTENSIONS:
+        library_manager = LibraryShardedManager(
+            args.file, 
+            console_library,
+            workers=args.workers
+        )
+    else:
+        library_manager = LibraryJSONManager(
+            args.file, 
+            console_library,
+            journaling=True,
+            lazy=args.lazy,
+            merge=args.merge_load
+        )
     # Регистрация команд управления библиотекой
     console.register_command(
         'add_book', 
         console_library.add_book,
         'Добавляет книгу в библиотеку. Принимает title, author, year.'
     )
+    console.register_command(
+        'import_books', 
+        BookImporter(console_library).import_books,
+        'Импортирует книги из csv- или ndjson-файла пакетами. Принимает ' \
+        'path. Некорректные строки пропускаются с печатью их номеров.'
+    )
     console.register_command(
         'delete_book', 
         console_library.delete_book,
@@ -29,12 +176,62 @@ def main() -> None:
         'find_book', 
         console_library.find_book,
         'Ищет книгу в библиотеке по названию, автору или году. ' \
-        'Принимает key_word.'
+        'Принимает key_word и необязательные limit, offset для ' \
+        'постраничного вывода.'
+    )
+    console.register_command(
+        'search', 
+        console_library.search,
+        'Нечеткий поиск книг по названию, автору и году с учетом опечаток. ' \
+        'Принимает query и необязательное k - число лучших книг ' \
+        '(по умолчанию - 10).'
+    )
+    console.register_command(
+        'query', 
+        console_library.query,
+        'Ищет книги по запросу из условий через пробел, например ' \
+        '"author~Толстой year>=1860 status:0 title~война". Условия: ' \
+        'title, author (: и ~ - содержит, = - равно), year (:, =, >, >=, ' \
+        '<, <=, ~), status (:), значение без атрибута ищется во всех ' \
+        'атрибутах, "-" отрицает условие, "or" разделяет альтернативы.'
+    )
+    console.register_command(
+        'explain_query', 
+        console_library.explain_query,
+        'Печатает план выполнения запроса query: выбранные индексы и ' \
+        'оценку числа кандидатов. Принимает те же условия, что и query.'
     )
     console.register_command(
         'show_books', 
         console_library.print_books,
-        'Отображает все книги библиотеки.'
+        'Отображает все книги библиотеки. Принимает необязательные ' \
+        'limit, offset для постраничного вывода.'
+    )
+    console.register_command(
+        'find_by_author', 
+        console_library.find_by_author,
+        'Ищет книги автора (без учета регистра) по индексу. Принимает ' \
+        'author и необязательные limit, offset для постраничного вывода.'
+    )
+    console.register_command(
+        'find_by_year_range', 
+        console_library.find_by_year_range,
+        'Ищет книги, изданные в диапазоне годов, по индексу. Принимает ' \
+        'year_from, year_to и необязательные limit, offset для ' \
+        'постраничного вывода.'
+    )
+    console.register_command(
+        'show_books_by_status', 
+        console_library.print_books_by_status,
+        'Отображает книги с указанным статусом. Принимает status_code ' \
+        '(0: в наличии, 1: выдана) и необязательные limit, offset для ' \
+        'постраничного вывода.'
+    )
+    console.register_command(
+        'count_books_by_status', 
+        console_library.count_books_by_status,
+        'Выводит число книг с указанным статусом. ' \
+        'Принимает status_code (0: в наличии, 1: выдана).'
     )
     console.register_command(
         'change_book_status', 
@@ -45,19 +242,85 @@ def main() -> None:
     # Регистрация команд сохранения-загрузки библиотеки
     console.register_command(
         'change_path', 
-        library_json_manager.set_file_path,
-        'Меняет путь до json-файла для сохранения-загрузки библиотеки.'
+        library_manager.set_file_path,
+        'Меняет путь до файла для сохранения-загрузки библиотеки.'
     )
     console.register_command(
         'save_library', 
-        library_json_manager.save_to_json,
-        'Сохраняет библиотеку в json-файл по установленному пути.'
+        library_manager.save_to_json,
+        'Сохраняет библиотеку в файл по установленному пути.'
     )
     console.register_command(
         'load_library', 
-        library_json_manager.read_from_json,
-        'Загружает библиотеку из json-файла по установленному пути.'
+        library_manager.read_from_json,
+        'Загружает библиотеку из файла по установленному пути.'
     )
+    if isinstance(library_manager, LibraryJSONManager):
+        console.register_command(
+            'checkpoint_library', 
+            library_manager.checkpoint,
+            'Переписывает json-файл библиотеки целиком и очищает журнал ' \
+            'изменений.'
+        )
+    if isinstance(library_manager, LibrarySQLiteManager):
+        console.register_command(
+            'sql_find_book', 
+            library_manager.find_book,
+            'Ищет книгу в сохраненной библиотеке SQL-запросом по названию, ' \
+            'автору или году без учета регистра, как find_book. ' \
+            'Принимает key_word.'
+        )
+        console.register_command(
+            'sql_show_books_by_status', 
+            library_manager.print_books_by_status,
+            'Отображает книги сохраненной библиотеки с указанным статусом. ' \
+            'Принимает status_code (0: в наличии, 1: выдана).'
+        )
+    # Запуск автосохранения json-файла в фоновом потоке. Библиотека 
+    # загружается заранее, иначе первое автосохранение перезапишет файл
+    autosaver = None
+    if args.autosave:
+        if isinstance(library_manager, LibraryJSONManager):
+            library_manager.read_from_json()
+            autosaver = Autosaver(
+                library_manager, 
+                args.autosave_mutations, 
+                args.autosave_interval
+            )
+        else:
+            print('Автосохранение поддерживается только для json-файлов.')
+    try:
+        run(console, args)
+    finally:
+        # Сохранение несохраненных изменений при завершении работы
+        if autosaver is not None:
+            autosaver.stop()
+
+
+def run(console: Console, args: Namespace) -> None:
+    """
+    Выполняет команды консоли в пакетном режиме, обслуживает сессии по TCP 
+    или запускает интерактивный ввод.
+    """
+    # Пакетное выполнение команд из файла
+    if args.batch is not None:
+        if args.batch == '-':
+            console.run_batch(sys.stdin, args.quiet)
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                console.run_batch(f, args.quiet)
+        return
+    # Обслуживание сессий консоли по TCP
+    if args.serve is not None:
+        host, port = args.serve.rsplit(':', 1)
+        server = ConsoleServer(
+            console, 
+            READ_ONLY_COMMANDS, 
+            host, 
+            int(port)
+        )
+        asyncio.run(server.serve_forever())
+        return
     # Печать списка всех доступных команд системы управления библиотекой
     console.print_commands()
     # Старт работы системы управления библиотекой
@@ -0,0 +1,122 @@
+﻿from collections.abc import Callable, Iterator
+from typing import Any
+import contextlib
+import functools
+import threading
+
+
+class ReadWriteLock():
+    """
+    Класс блокировки чтения-записи для потоков: читатели выполняются
+    параллельно, писатель - монопольно. Ожидающий писатель не пропускает
+    новых читателей, чтобы не голодать. Поток-писатель может повторно 
+    захватывать блокировку на чтение и запись; повторный захват на чтение 
+    потоком-читателем не допускается.
+
+    Attributes:
+        __condition (threading.Condition): Условие ожидания
+        __readers (int): Число активных читателей
+        __writer (int | None): Идентификатор потока активного писателя
+        __waiting_writers (int): Число ожидающих писателей
+        __write_count (int): Число завершенных захватов на запись
+
+    Methods:
+        reading (Callable[[], ContextManager]): Захватывает блокировку на
+        чтение
+        writing (Callable[[], ContextManager]): Захватывает блокировку на
+        запись
+        get_write_count (Callable[[], int]): Возвращает число завершенных
+        захватов на запись
+    """
+
+    __condition: threading.Condition
+    __readers: int
+    __writer: int | None
+    __waiting_writers: int
+    __write_count: int
+
+    def __init__(self):
+        """Инициализирует атрибуты блокировки."""
+        self.__condition = threading.Condition()
+        self.__readers = 0
+        self.__writer = None
+        self.__waiting_writers = 0
+        self.__write_count = 0
+
+    @contextlib.contextmanager
+    def reading(self) -> Iterator[None]:
+        """Захватывает блокировку на чтение."""
+        if self.__writer == threading.get_ident():
+            yield
+            return
+        with self.__condition:
+            while self.__writer is not None or self.__waiting_writers > 0:
+                self.__condition.wait()
+            self.__readers += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__readers -= 1
+                if self.__readers == 0:
+                    self.__condition.notify_all()
+
+    @contextlib.contextmanager
+    def writing(self) -> Iterator[None]:
+        """Захватывает блокировку на запись."""
+        thread = threading.get_ident()
+        if self.__writer == thread:
+            yield
+            return
+        with self.__condition:
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers > 0:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = thread
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__writer = None
+                self.__write_count += 1
+                self.__condition.notify_all()
+
+    def get_write_count(self) -> int:
+        """
+        Возвращает число завершенных захватов на запись (повторные захваты
+        потоком-писателем не считаются). Если число не изменилось между
+        двумя захватами на чтение или запись, между ними данные не
+        изменялись.
+        """
+        return self.__write_count
+
+
+def read_locked(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Декоратор метода, выполняющий его под блокировкой self.lock на чтение.
+    Если self.lock равен None, метод вызывается без блокировки.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.lock is None:
+            return method(self, *args, **kwargs)
+        with self.lock.reading():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def write_locked(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Декоратор метода, выполняющий его под блокировкой self.lock на запись.
+    Если self.lock равен None, метод вызывается без блокировки.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.lock is None:
+            return method(self, *args, **kwargs)
+        with self.lock.writing():
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,267 @@
+﻿from collections.abc import Iterable
+import sqlite3
+from Book import Book
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import JSONManager
+
+
+class LibrarySQLiteManager(JSONManager):
+    """
+    Класс файлового менеджера библиотеки, хранящего книги в базе данных
+    SQLite. Интерфейс совпадает с LibraryJSONManager: save_to_json сохраняет
+    библиотеку, read_from_json загружает ее. Менеджер подписывается на
+    изменения библиотеки и при сохранении в одной транзакции записывает
+    только добавленные, удаленные и измененные книги. Сбой во время
+    сохранения не повреждает базу данных: транзакция откатывается.
+
+    Attributes:
+        obj (ConsoleLibrary): Библиотека для сохранения-загрузки
+        __connection (sqlite3.Connection): Соединение с базой данных
+        __dirty_ids (set[int]): id книг, измененных после последнего
+        сохранения или загрузки
+        __needs_full_write (bool): Признак того, что библиотека не была
+        загружена из базы данных по текущему пути и сохранение должно
+        переписать таблицу целиком
+        SCHEMA (str): Схема базы данных. Индексируется только статус: поиск
+        по ключевому слову ищет подстроку в нормализованных строках и
+        просматривает таблицу, поэтому индексы названий, авторов и годов
+        издания, созданные прежними версиями, удаляются
+        EXTENSIONS (tuple[str, ...]): Расширения файлов баз данных SQLite
+
+    Methods:
+        get_file_path (Callable[[], None]): Возвращает путь до файла базы
+        данных
+        set_file_path (Callable[[str], None]): Устанавливает путь до файла
+        базы данных
+        save_to_json (Callable[[], None]): Сохраняет изменения библиотеки в
+        базу данных
+        read_from_json (Callable[[], None]): Загружает библиотеку из базы
+        данных
+        find_book (Callable[[str], None]): Ищет книгу в сохраненной
+        библиотеке SQL-запросом и печатает ее поля
+        print_books_by_status (Callable[[int], None]): Печатает книги
+        сохраненной библиотеки с указанным статусом
+        close (Callable[[], None]): Закрывает соединение с базой данных
+    """
+
+    obj: ConsoleLibrary
+    __connection: sqlite3.Connection
+    __dirty_ids: set[int]
+    __needs_full_write: bool
+
+    SCHEMA: str = '''
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            year TEXT NOT NULL,
+            status INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS books_status ON books (status);
+        DROP INDEX IF EXISTS books_title;
+        DROP INDEX IF EXISTS books_author;
+        DROP INDEX IF EXISTS books_year;
+    '''
+    EXTENSIONS: tuple[str, ...] = ('.db', '.sqlite', '.sqlite3')
+
+    __SELECT_BOOKS: str = \
+        'SELECT id, title, author, year, status FROM books'
+
+    def __init__(self, file_path: str, obj: ConsoleLibrary):
+        """
+        Инициализирует атрибуты __file_path, obj. Создает базу данных по
+        указанному пути, если ее нет, и подписывается на изменения
+        библиотеки.
+
+        Args:
+            file_path: Путь до файла базы данных
+            obj: Библиотека для сохранения-загрузки
+
+        Raises:
+            sqlite3.DatabaseError: Файл не является базой данных SQLite
+        """
+        self.__connection = self.__connect(file_path)
+        super().__init__(file_path, obj)
+        self.__dirty_ids = set()
+        self.__needs_full_write = True
+        obj.add_listener(self.__record)
+
+    def set_file_path(self, file_path: str) -> None:
+        """
+        Устанавливает путь до файла базы данных, создавая ее при
+        необходимости. Следующее сохранение перепишет таблицу книг целиком.
+
+        Args:
+            file_path: Путь до файла базы данных
+
+        Raises:
+            sqlite3.DatabaseError: Файл не является базой данных SQLite
+
+        Returns:
+            None
+        """
+        connection = self.__connect(file_path)
+        super().set_file_path(file_path)
+        self.__connection.close()
+        self.__connection = connection
+        self.__needs_full_write = True
+
+    def close(self) -> None:
+        """Закрывает соединение с базой данных."""
+        self.__connection.close()
+
+    def save_to_json(self) -> None:
+        """
+        Сохраняет изменения библиотеки в базу данных в одной транзакции. Если
+        библиотека не была загружена из базы данных по текущему пути,
+        переписывает таблицу книг целиком.
+
+        Returns:
+            None
+        """
+        books = self.obj.books
+        with self.obj.reading(), self.__connection:
+            if self.__needs_full_write:
+                self.__connection.execute('DELETE FROM books')
+                self.__insert(books.values())
+            else:
+                deleted_ids = [(id,) for id in self.__dirty_ids
+                               if id not in books]
+                self.__connection.executemany(
+                    'DELETE FROM books WHERE id = ?',
+                    deleted_ids
+                )
+                self.__insert(books[id] for id in self.__dirty_ids
+                              if id in books)
+            self.__dirty_ids.clear()
+            self.__needs_full_write = False
+
+    def read_from_json(self) -> None:
+        """
+        Загружает библиотеку из базы данных с сохранением id книг,
+        отбрасывая несохраненные изменения.
+
+        Returns:
+            None
+        """
+        books = {}
+        for id, title, author, year, status_code in self.__connection.execute(
+            self.__SELECT_BOOKS + ' ORDER BY id'
+        ):
+            book = Book(title, author, year, id=id)
+            book.set_status(status_code)
+            books[id] = book
+        if len(books) > 0:
+            Book.advance_id_counter(max(books))
+        with self.obj.writing():
+            self.obj.replace_books(books)
+            self.__dirty_ids.clear()
+            self.__needs_full_write = False
+
+    def find_book(self, key_word: str) -> None:
+        """
+        Ищет книгу в сохраненной библиотеке по названию, автору или году
+        издания SQL-запросом и печатает ее поля. Как и в
+        ConsoleLibrary.find_book, строки сравниваются по ключам поиска
+        Book.normalize (функция normalize соединения), поэтому регистр и
+        различие букв "ё" и "е" не учитываются. Поиск подстроки не может
+        использовать индекс, поэтому запрос просматривает таблицу. В случае
+        неудачи поиска печатает "Книга не найдена.".
+
+        Args:
+            key_word: ключевое слово для поиска
+
+        Returns:
+            None
+        """
+        self.__print_rows(self.__connection.execute(
+            self.__SELECT_BOOKS
+            + ' WHERE instr(normalize(title), :key_word) > 0'
+            ' OR instr(normalize(author), :key_word) > 0'
+            ' OR instr(normalize(year), :key_word) > 0 ORDER BY id',
+            {'key_word': Book.normalize(key_word)}
+        ))
+
+    def print_books_by_status(self, status_code: int) -> None:
+        """
+        Печатает книги сохраненной библиотеки с указанным статусом, используя
+        индекс по статусу. В случае отсутствия таких книг печатает
+        "Книга не найдена.".
+
+        Args:
+            status_code: номер статуса из Book.STATUSES
+
+        Returns:
+            None
+        """
+        if status_code not in Book.STATUSES:
+            print(Book.IncorrectBookStatusException.message)
+            return
+        self.__print_rows(self.__connection.execute(
+            self.__SELECT_BOOKS + ' WHERE status = ? ORDER BY id',
+            (status_code,)
+        ))
+
+    def __connect(self, file_path: str) -> sqlite3.Connection:
+        """
+        Открывает соединение с базой данных, регистрирует в нем функцию 
+        normalize (Book.normalize) и создает схему, если ее нет.
+
+        Args:
+            file_path: Путь до файла базы данных
+
+        Raises:
+            sqlite3.DatabaseError: Файл не является базой данных SQLite
+
+        Returns:
+            Соединение с базой данных
+        """
+        connection = sqlite3.connect(file_path, check_same_thread=False)
+        connection.create_function(
+            'normalize', 
+            1, 
+            Book.normalize, 
+            deterministic=True
+        )
+        try:
+            connection.executescript(self.SCHEMA)
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def __insert(self, books: Iterable[Book]) -> None:
+        """Вставляет или заменяет строки книг."""
+        self.__connection.executemany(
+            'INSERT OR REPLACE INTO books (id, title, author, year, status)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            ((
+                book.get_id(),
+                book.title,
+                book.author,
+                book.year,
+                Book.STATUS_CODES[book.get_status()]
+            ) for book in books)
+        )
+
+    def __record(self, event: str, book: Book) -> None:
+        """Помечает книгу измененной после изменения библиотеки."""
+        self.__dirty_ids.add(book.get_id())
+
+    def __print_rows(self, rows: Iterable[tuple]) -> None:
+        """
+        Печатает книги из строк результата запроса. В случае отсутствия строк
+        печатает "Книга не найдена.".
+        """
+        book_is_found = False
+        for id, title, author, year, status_code in rows:
+            print(ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+                id,
+                title,
+                author,
+                year,
+                Book.STATUSES[status_code]
+            ))
+            book_is_found = True
+        if not book_is_found:
+            print('Книга не найдена.')
@@ -0,0 +1,339 @@
+﻿from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+import contextlib
+import itertools
+import json
+import operator
+import os
+from Book import Book
+from ConsoleLibrary import ConsoleLibrary
+from JSONBooksReader import JSONBooksReader
+from JSONManager import JSONManager
+
+
+# Книга шарда в том виде, в каком она передается из процесса-исполнителя:
+# (id, книга с ключами поиска и статусом)
+ShardBook = tuple[int, Book]
+
+
+def read_shard(file_path: str) -> list[ShardBook]:
+    """
+    Разбирает файл шарда и создает его книги. Вызывается в
+    процессах-исполнителях, поэтому нормализация ключей поиска и установка
+    статусов выполняются параллельно, а основной процесс только объединяет
+    готовые книги шардов.
+
+    Args:
+        file_path: Путь до файла шарда
+
+    Raises:
+        JSONBooksReader.MalformedJSONException
+
+    Returns:
+        Книги шарда по возрастанию id
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            json_books = json.load(f)['books']
+            books = []
+            for json_book in json_books.values():
+                id = int(json_book['_Book__id'])
+                book = Book(
+                    json_book['title'],
+                    json_book['author'],
+                    json_book['year'],
+                    id=id
+                )
+                book.set_status(
+                    Book.STATUS_CODES.get(json_book['_Book__status'], 0)
+                )
+                books.append((id, book))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise JSONBooksReader.MalformedJSONException
+    books.sort(key=operator.itemgetter(0))
+    return books
+
+
+class LibraryShardedManager(JSONManager):
+    """
+    Класс файлового менеджера библиотеки, хранящего книги в шардах -
+    json-файлах в формате LibraryJSONManager, между которыми книги
+    распределены по остатку от деления id на число шардов. Файл менеджера -
+    манифест {"version": VERSION, "generation": поколение, "shards": [имена
+    файлов шардов]}, файлы шардов лежат рядом с ним. Пустой манифест
+    считается манифестом пустой библиотеки. Загрузка разбирает шарды
+    параллельно в пуле процессов и объединяет их книги в порядке возрастания
+    id с сохранением id.
+
+    Менеджер подписывается на изменения библиотеки и помечает шард
+    измененной книги. Сохранение параллельно в потоках переписывает только
+    помеченные шарды: каждый шард записывается во временный файл и
+    переименовывается в файл нового поколения library.<шард>.<поколение>.json,
+    затем манифест атомарно заменяется манифестом нового поколения, и только
+    после этого удаляются файлы шардов прежнего поколения. Поэтому загрузка
+    всегда видит согласованный набор шардов, даже если сохранение прервано.
+
+    Attributes:
+        obj (ConsoleLibrary): Библиотека для сохранения-загрузки
+        shard_count (int): Число шардов, на которые сохраняется библиотека
+        workers (int): Число процессов, разбирающих шарды при загрузке, и
+        потоков, записывающих шарды при сохранении
+        __generation (int): Поколение манифеста, загруженного или
+        сохраненного последним
+        __shard_names (list[str]): Имена файлов шардов этого манифеста
+        __dirty_shards (set[int]): Номера шардов, измененных после
+        последнего сохранения или загрузки
+        __needs_full_write (bool): Признак того, что библиотека не была
+        загружена из манифеста по текущему пути и сохранение должно
+        переписать все шарды
+        VERSION (int): Версия формата манифеста
+        SHARD_COUNT (int): Число шардов по умолчанию
+        EXTENSIONS (tuple[str, ...]): Расширения файлов манифестов
+
+    Classes:
+        MalformedManifestException: Ошибка некорректного манифеста
+
+    Methods:
+        get_file_path (Callable[[], None]): Возвращает путь до манифеста
+        set_file_path (Callable[[str], None]): Устанавливает путь до
+        манифеста
+        get_shard_paths (Callable[[], list[str]]): Возвращает пути до
+        файлов шардов текущего манифеста
+        save_to_json (Callable[[], None]): Сохраняет измененные шарды
+        библиотеки
+        read_from_json (Callable[[], None]): Загружает библиотеку из шардов
+    """
+
+    obj: ConsoleLibrary
+    shard_count: int
+    workers: int
+    __generation: int
+    __shard_names: list[str]
+    __dirty_shards: set[int]
+    __needs_full_write: bool
+
+    VERSION: int = 1
+    SHARD_COUNT: int = 8
+    EXTENSIONS: tuple[str, ...] = ('.lcsm',)
+
+    class MalformedManifestException(Exception):
+        """Ошибка некорректного манифеста."""
+
+        message = 'Ошибка: некорректный манифест библиотеки.'
+
+        def __str__(self):
+            return self.message
+
+    def __init__(
+        self,
+        file_path: str,
+        obj: ConsoleLibrary,
+        shard_count: int = SHARD_COUNT,
+        workers: int | None = None
+    ):
+        """
+        Инициализирует атрибуты __file_path, obj, shard_count, workers и
+        подписывается на изменения библиотеки.
+
+        Args:
+            file_path: Путь до манифеста
+            obj: Библиотека для сохранения-загрузки
+            shard_count: Число шардов, на которые сохраняется библиотека
+            workers: Число процессов, разбирающих шарды при загрузке, и
+            потоков, записывающих шарды при сохранении, None - число
+            процессоров
+
+        Raises:
+            FileNotFoundError: Ошибка несуществующего файла по указанному пути
+        """
+        super().__init__(file_path, obj)
+        self.shard_count = shard_count
+        self.workers = workers or os.cpu_count() or 1
+        self.__generation = 0
+        self.__shard_names = []
+        self.__dirty_shards = set()
+        self.__needs_full_write = True
+        obj.add_listener(self.__record)
+
+    def set_file_path(self, file_path: str) -> None:
+        """
+        Устанавливает путь до манифеста. Следующее сохранение перепишет все
+        шарды.
+
+        Args:
+            file_path: Путь до манифеста
+
+        Raises:
+            FileNotFoundError: Ошибка несуществующего файла по указанному пути
+
+        Returns:
+            None
+        """
+        super().set_file_path(file_path)
+        self.__needs_full_write = True
+
+    def get_shard_paths(self) -> list[str]:
+        """Возвращает пути до файлов шардов текущего манифеста."""
+        return [self.__shard_path(name) for name in self.__shard_names]
+
+    def __shard_path(self, name: str) -> str:
+        """Возвращает путь до файла шарда по имени из манифеста."""
+        return str(Path(self.get_file_path()).with_name(Path(name).name))
+
+    def save_to_json(self) -> None:
+        """
+        Сохраняет шарды, измененные после последнего сохранения или
+        загрузки, и манифест нового поколения. Если библиотека не была
+        загружена из манифеста по текущему пути, переписывает все шарды.
+        Шарды записываются параллельно в пуле из не более чем workers
+        потоков. Если ни один шард не изменен, файлы не переписываются.
+
+        Returns:
+            None
+        """
+        with self.obj.reading():
+            if self.__needs_full_write:
+                old_generation, old_names = self.__read_old_manifest()
+                dirty_shards = set(range(self.shard_count))
+            else:
+                old_generation = self.__generation
+                old_names = self.__shard_names
+                dirty_shards = self.__dirty_shards
+            if len(dirty_shards) == 0:
+                return
+            shards = {shard: [] for shard in dirty_shards}
+            for id, book in self.obj.books.items():
+                books = shards.get(id % self.shard_count)
+                if books is not None:
+                    books.append(book)
+            generation = old_generation + 1
+            path = Path(self.get_file_path())
+            shard_names = list(self.__shard_names)
+            if self.__needs_full_write:
+                shard_names = [''] * self.shard_count
+            for shard in dirty_shards:
+                shard_names[shard] = f'{path.stem}.{shard}.{generation}.json'
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(shards))
+            ) as executor:
+                list(executor.map(
+                    lambda shard: self.__write_shard(
+                        self.__shard_path(shard_names[shard]),
+                        shards[shard]
+                    ),
+                    shards
+                ))
+            self.__replace(self.get_file_path(), json.dumps({
+                'version': self.VERSION,
+                'generation': generation,
+                'shards': shard_names
+            }))
+            for name in set(old_names) - set(shard_names):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.__shard_path(name))
+            self.__generation = generation
+            self.__shard_names = shard_names
+            self.__dirty_shards.clear()
+            self.__needs_full_write = False
+
+    def __read_old_manifest(self) -> tuple[int, list[str]]:
+        """
+        Возвращает поколение и имена файлов шардов манифеста по текущему
+        пути перед полной перезаписью: новое поколение не должно совпасть с
+        ним, а его шарды удаляются после записи. Некорректный манифест
+        считается пустым.
+        """
+        try:
+            return self.__read_manifest()
+        except self.MalformedManifestException:
+            return 0, []
+
+    def __write_shard(self, file_path: str, books: list[Book]) -> None:
+        """Записывает книги в файл шарда в формате LibraryJSONManager."""
+        self.__replace(file_path, '{"books": {' + ', '.join(
+            f'"{book.get_id()}": ' + json.dumps({
+                '_Book__id': book.get_id(),
+                'title': book.title,
+                'author': book.author,
+                'year': book.year,
+                '_Book__status': book.get_status()
+            })
+            for book in books
+        ) + '}}')
+
+    def __replace(self, file_path: str, text: str) -> None:
+        """
+        Заменяет содержимое файла через временный файл, поэтому сбой во
+        время записи не повреждает прежний файл.
+        """
+        temp_file_path = file_path + '.tmp'
+        with open(temp_file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file_path, file_path)
+
+    def read_from_json(self) -> None:
+        """
+        Загружает библиотеку из шардов манифеста. Шарды разбираются
+        параллельно в пуле из не более чем workers процессов, которые и
+        создают книги, затем книги шардов объединяются в порядке
+        возрастания id. Библиотека заменяется
+        только после успешного разбора всех шардов. Индексы библиотеки
+        строятся не при загрузке, а при первом запросе, который их
+        использует.
+
+        Raises:
+            MalformedManifestException
+            JSONBooksReader.MalformedJSONException
+
+        Returns:
+            None
+        """
+        generation, shard_names = self.__read_manifest()
+        shard_paths = [self.__shard_path(name) for name in shard_names]
+        workers = min(self.workers, len(shard_paths))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                shards = list(executor.map(read_shard, shard_paths))
+        else:
+            shards = [read_shard(path) for path in shard_paths]
+        # Шарды упорядочены по id, поэтому сортировка сцепленных шардов
+        # только сливает их отрезки
+        shard_books = list(itertools.chain.from_iterable(shards))
+        shard_books.sort(key=operator.itemgetter(0))
+        books = dict(shard_books)
+        if len(books) > 0:
+            Book.advance_id_counter(max(books))
+        with self.obj.writing():
+            self.obj.replace_books(books, build_indexes=False)
+            if len(shard_names) > 0:
+                self.shard_count = len(shard_names)
+            self.__generation = generation
+            self.__shard_names = shard_names
+            self.__dirty_shards.clear()
+            self.__needs_full_write = len(shard_names) == 0
+
+    def __read_manifest(self) -> tuple[int, list[str]]:
+        """
+        Читает манифест и возвращает его поколение и имена файлов шардов.
+
+        Raises:
+            MalformedManifestException
+        """
+        file_path = Path(self.get_file_path())
+        if file_path.stat().st_size == 0:
+            return 0, []
+        try:
+            with open(file_path, 'rb') as f:
+                manifest = json.load(f)
+            if manifest['version'] != self.VERSION:
+                raise self.MalformedManifestException
+            shard_names = [Path(name).name for name in manifest['shards']]
+            return int(manifest.get('generation', 0)), shard_names
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise self.MalformedManifestException
+
+    def __record(self, event: str, book: Book) -> None:
+        """Помечает шард измененной книги после изменения библиотеки."""
+        self.__dirty_shards.add(book.get_id() % self.shard_count)
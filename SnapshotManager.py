@@ -0,0 +1,175 @@
+﻿from argparse import ArgumentParser
+from pathlib import Path
+from Book import Book
+from BookSnapshot import BookSnapshot
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import JSONManager, LibraryJSONManager
+
+
+class LibrarySnapshotManager(JSONManager):
+    """
+    Класс файлового менеджера библиотеки, хранящего книги в двоичном снимке
+    BookSnapshot. Интерфейс совпадает с LibraryJSONManager: save_to_json
+    сохраняет библиотеку, read_from_json загружает ее. Загрузка отображает
+    снимок в память и подменяет хранилище книг библиотеки ленивым
+    хранилищем, не читая записи книг, поэтому библиотека готова к работе
+    сразу, а книги декодируются при первом обращении. Снимок остается
+    открытым, пока библиотека работает с его книгами.
+
+    Attributes:
+        obj (ConsoleLibrary): Библиотека для сохранения-загрузки
+        __snapshot (BookSnapshot | None): Открытый снимок, книги которого
+        использует библиотека
+        EXTENSIONS (tuple[str, ...]): Расширения файлов снимков
+
+    Methods:
+        get_file_path (Callable[[], None]): Возвращает путь до файла снимка
+        set_file_path (Callable[[str], None]): Устанавливает путь до файла
+        снимка
+        save_to_json (Callable[[], None]): Сохраняет библиотеку в снимок
+        read_from_json (Callable[[], None]): Загружает библиотеку из снимка
+        close (Callable[[], None]): Закрывает открытый снимок
+    """
+
+    obj: ConsoleLibrary
+    __snapshot: BookSnapshot | None
+
+    EXTENSIONS: tuple[str, ...] = ('.lcsb',)
+
+    def __init__(self, file_path: str, obj: ConsoleLibrary):
+        """
+        Инициализирует атрибуты __file_path, obj, __snapshot.
+
+        Args:
+            file_path: Путь до файла снимка
+            obj: Библиотека для сохранения-загрузки
+
+        Raises:
+            FileNotFoundError: Ошибка несуществующего файла по указанному пути
+        """
+        super().__init__(file_path, obj)
+        self.__snapshot = None
+
+    def save_to_json(self) -> None:
+        """
+        Сохраняет библиотеку в снимок через временный файл. Если библиотека
+        использует книги открытого снимка, он закрывается и библиотека
+        переключается на только что записанный снимок с теми же книгами, так
+        что индексы библиотеки сохраняются.
+
+        Returns:
+            None
+        """
+        file_path = self.get_file_path()
+        with self.obj.writing():
+            if self.__snapshot is None:
+                BookSnapshot.write(file_path, self.obj.books)
+                return
+            # Снимок, отображенный в память, нельзя заменить на Windows,
+            # поэтому он закрывается до замены
+            temp_file_path = file_path + '.new'
+            BookSnapshot.write(temp_file_path, self.obj.books)
+            self.close()
+            Path(temp_file_path).replace(file_path)
+            self.__open(keep_indexes=True)
+
+    def read_from_json(self) -> None:
+        """
+        Загружает библиотеку из снимка, отбрасывая несохраненные изменения.
+        Записи книг не читаются: библиотека получает ленивое хранилище книг
+        снимка, а ее индексы строятся при первом запросе, который их
+        использует.
+
+        Raises:
+            BookSnapshot.MalformedSnapshotException
+
+        Returns:
+            None
+        """
+        with self.obj.writing():
+            self.__open(keep_indexes=False)
+
+    def __open(self, keep_indexes: bool) -> None:
+        """
+        Открывает снимок, подменяет им хранилище книг библиотеки и закрывает 
+        прежний снимок. Если снимок некорректен, библиотека не меняется.
+        """
+        snapshot = BookSnapshot(self.get_file_path())
+        ids = snapshot.get_ids()
+        if len(ids) > 0:
+            Book.advance_id_counter(ids[-1])
+        self.obj.set_books(snapshot.open_store(), keep_indexes)
+        self.close()
+        self.__snapshot = snapshot
+
+    def close(self) -> None:
+        """
+        Закрывает открытый снимок. Книги снимка, к которым библиотека еще не
+        обращалась, становятся недоступны, поэтому снимок закрывается только
+        при замене хранилища книг библиотеки или завершении работы.
+        """
+        if self.__snapshot is not None:
+            self.__snapshot.close()
+            self.__snapshot = None
+
+
+def convert_json_to_snapshot(json_path: str, snapshot_path: str) -> None:
+    """
+    Преобразует json-файл библиотеки (с журналом изменений, если он есть) в
+    двоичный снимок с сохранением id книг.
+
+    Args:
+        json_path: Путь до json-файла библиотеки
+        snapshot_path: Путь до файла снимка
+
+    Returns:
+        None
+    """
+    console_library = ConsoleLibrary()
+    LibraryJSONManager(json_path, console_library, journaling=True) \
+        .read_from_json()
+    BookSnapshot.write(snapshot_path, console_library.books)
+
+
+def convert_snapshot_to_json(snapshot_path: str, json_path: str) -> None:
+    """
+    Преобразует двоичный снимок библиотеки в json-файл.
+
+    Args:
+        snapshot_path: Путь до файла снимка
+        json_path: Путь до json-файла библиотеки
+
+    Returns:
+        None
+    """
+    snapshot = BookSnapshot(snapshot_path)
+    try:
+        console_library = ConsoleLibrary()
+        console_library.set_books(snapshot.open_store())
+        Path(json_path).touch()
+        LibraryJSONManager(json_path, console_library).save_to_json()
+    finally:
+        snapshot.close()
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description='Преобразование библиотеки между json-файлом и ' \
+                    'двоичным снимком.'
+    )
+    parser.add_argument(
+        'direction',
+        choices=['to-snapshot', 'to-json'],
+        help='to-snapshot: json-файл -> снимок, to-json: снимок -> json-файл.'
+    )
+    parser.add_argument('source', help='Путь до исходного файла.')
+    parser.add_argument('destination', help='Путь до нового файла.')
+    args = parser.parse_args()
+    if args.direction == 'to-snapshot':
+        convert_json_to_snapshot(args.source, args.destination)
+    else:
+        convert_snapshot_to_json(args.source, args.destination)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+﻿"""
+Сравнение потребления памяти библиотекой при хранении книг в 
+dict[int, Book] и в ColumnarBookStore.
+
+Запуск из корня репозитория:
+    python -m benchmarks.columnar_store_benchmark [число_книг ...]
+"""
+from collections.abc import Callable, MutableMapping
+import gc
+import random
+import sys
+import tracemalloc
+from Book import Book
+from ColumnarBookStore import ColumnarBookStore
+
+
+AUTHORS: list[str] = [
+    'Толстой Л. Н.', 'Достоевский Ф. М.', 'Пушкин А. С.', 'Чехов А. П.',
+    'Гоголь Н. В.', 'Тургенев И. С.', 'Булгаков М. А.', 'Лермонтов М. Ю.'
+]
+
+
+def generate_books(count: int) -> list[tuple[str, str, str, int]]:
+    """Генерирует атрибуты книг с повторяющимися авторами и годами."""
+    random_generator = random.Random(0)
+    return [
+        (
+            f'Книга номер {i}',
+            random_generator.choice(AUTHORS),
+            str(random_generator.randint(1800, 2024)),
+            random_generator.randint(0, len(Book.STATUSES) - 1)
+        ) for i in range(count)
+    ]
+
+
+def measure(
+    make_books: Callable[[], MutableMapping],
+    attributes: list[tuple[str, str, str, int]]
+) -> int:
+    """
+    Измеряет прирост памяти в байтах после наполнения хранилища книгами.
+    Строки атрибутов создаются заново для каждой книги, как при загрузке из 
+    файла.
+    """
+    gc.collect()
+    tracemalloc.start()
+    books = make_books()
+    for title, author, year, status_code in attributes:
+        book = Book(''.join(title), ''.join(author), ''.join(year))
+        book.set_status(status_code)
+        books[book.get_id()] = book
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f'{"книг":>10} {"dict, Б/книга":>15} '
+          f'{"columnar, Б/книга":>18} {"экономия":>9}')
+    for count in counts:
+        attributes = generate_books(count)
+        dict_size = measure(dict, attributes)
+        columnar_size = measure(ColumnarBookStore, attributes)
+        print(f'{count:>10} {dict_size / count:>15.1f} '
+              f'{columnar_size / count:>18.1f} '
+              f'{1 - columnar_size / dict_size:>9.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+﻿"""
+Сравнение накладных расходов консоли на выполнение одной команды: разбор 
+сигнатуры функции при каждом вызове (как было до компиляции команд при 
+регистрации) и вызов скомпилированной команды через Console.execute.
+
+Запуск из корня репозитория:
+    python -m benchmarks.console_dispatch_benchmark [число_вызовов]
+"""
+from argparse import ArgumentTypeError
+from collections.abc import Callable
+from inspect import signature
+import sys
+import timeit
+from Console import Console
+
+
+def legacy_execute(
+    console: Console, 
+    commands: dict[str, Callable], 
+    command_line: str
+) -> None:
+    """Выполняет строку-команду так, как это делал Console.start ранее."""
+    command, given_args = console.parse_command(command_line)
+    if command not in commands:
+        print('Ошибка: неизвестная команда.')
+        return
+    func = commands[command]
+    func_args = signature(func).parameters
+    if len(given_args) != len(func_args):
+        print(f'Ошибка: {command} принимает'
+              f' {len(func_args)} аргументов,'
+              f' но передано {len(given_args)}.')
+        return
+    try:
+        parsed_args = []
+        for given_arg, func_arg_key in zip(given_args, func_args.keys()):
+            splited_parameter = str(func_args[func_arg_key]).split(': ')
+            if len(splited_parameter) == 1:
+                func_arg_type = None
+            else:
+                func_arg_type = splited_parameter[1]
+            casted_given_arg = console.cast(func_arg_type, given_arg)
+            if casted_given_arg is None:
+                raise ArgumentTypeError(
+                    'Ошибка: не удалось привести тип аргумента.'
+                )
+            parsed_args.append(casted_given_arg)
+        func(*parsed_args)
+    except Exception as e:
+        print(e)
+
+
+def change_book_status(id: int, status_code: int) -> None:
+    """Команда-заглушка с сигнатурой ConsoleLibrary.change_book_status."""
+
+
+def add_book(title: str, author: str, year: str) -> None:
+    """Команда-заглушка с сигнатурой ConsoleLibrary.add_book."""
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    console = Console()
+    commands = {
+        'change_book_status': change_book_status, 
+        'add_book': add_book
+    }
+    for name, func in commands.items():
+        console.register_command(name, func, '')
+    print(f'{"команда":>40} {"до, мкс":>9} '
+          f'{"после, мкс":>11} {"ускорение":>10}')
+    for command_line in ['change_book_status 12345 1', 
+                         'add_book Война_и_мир Толстой 1869']:
+        legacy_time = timeit.timeit(
+            lambda: legacy_execute(console, commands, command_line), 
+            number=number
+        )
+        compiled_time = timeit.timeit(
+            lambda: console.execute(command_line), 
+            number=number
+        )
+        print(f'{command_line:>40} {legacy_time / number * 1e6:>9.2f} '
+              f'{compiled_time / number * 1e6:>11.2f} '
+              f'{legacy_time / compiled_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
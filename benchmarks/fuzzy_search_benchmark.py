@@ -0,0 +1,90 @@
+﻿"""
+Измерение нечеткого поиска ConsoleLibrary.search по индексу сходства
+триграмм в сравнении с полным просмотром библиотеки, который вычисляет
+триграммы каждой книги и сортирует все совпадения. Запросы - фамилии
+авторов и слова названий с опечаткой (пропущенной буквой).
+
+Запуск из корня репозитория:
+    python -m benchmarks.fuzzy_search_benchmark [число_книг] [k]
+"""
+import gc
+import random
+import statistics
+import sys
+import time
+from BookIndexes import SimilarityIndex
+from ConsoleLibrary import ConsoleLibrary
+from benchmarks.library_benchmark import (
+    SURNAMES, TITLE_WORDS, build_library, generate_library
+)
+
+
+COUNT: int = 200_000
+K: int = 10
+SAMPLES: int = 50
+SCAN_SAMPLES: int = 3
+
+
+def make_queries(count: int, seed: int = 0) -> list[str]:
+    """Возвращает слова авторов и названий с одной пропущенной буквой."""
+    random_generator = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        word = random_generator.choice(SURNAMES + TITLE_WORDS)
+        i = random_generator.randrange(1, len(word))
+        queries.append(word[:i] + word[i + 1:])
+    return queries
+
+
+def scan(console_library: ConsoleLibrary, query: str, k: int) -> list[int]:
+    """
+    Нечеткий поиск полным просмотром: триграммы каждой книги вычисляются
+    заново, а все совпадения сортируются.
+    """
+    query_features = SimilarityIndex.features(query)
+    matches = []
+    for id, book in console_library.books.items():
+        shared = len(query_features & SimilarityIndex.features(
+            f'{book.title} {book.author} {book.year}'
+        ))
+        score = shared / len(query_features)
+        if score >= SimilarityIndex.THRESHOLD:
+            matches.append((score, -id))
+    matches.sort(reverse=True)
+    return [-id for _, id in matches[:k]]
+
+
+def measure(search, queries: list[str]) -> float:
+    """Возвращает медианное время поиска в миллисекундах."""
+    gc.collect()
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else K
+    console_library = build_library(generate_library(count), False)
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    for book in console_library.books.values():
+        index.add_book(book)
+    build_time = time.perf_counter() - start
+    print(f'Книг: {count}, k: {k}, построение индекса: {build_time:.3f} с')
+    queries = make_queries(SAMPLES)
+    index_time = measure(lambda query: index.top(query, k), queries)
+    print(f'{"индекс":<16} {index_time:>10.2f} мс')
+    scan_time = measure(
+        lambda query: scan(console_library, query, k),
+        queries[:SCAN_SAMPLES]
+    )
+    print(f'{"полный просмотр":<16} {scan_time:>10.2f} мс '
+          f'(x{scan_time / index_time:.1f})')
+
+
+if __name__ == '__main__':
+    main()
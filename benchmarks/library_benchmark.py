@@ -0,0 +1,290 @@
+﻿"""
+Измерение масштабируемости операций библиотеки: add_book, find_book,
+print_books, change_book_status, delete_book, save_to_json и read_from_json
+на синтетических библиотеках разного размера. Для каждой операции
+измеряются пропускная способность, перцентили задержки и пиковый прирост
+памяти. Результаты записываются в json-файл, чтобы сравнивать запуски на
+разных коммитах.
+
+Запуск из корня репозитория:
+    python -m benchmarks.library_benchmark [--sizes 1000 10000 ...]
+        [--samples N] [--output файл.json] [--columnar]
+"""
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from Book import Book
+from ColumnarBookStore import ColumnarBookStore
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import LibraryJSONManager
+
+
+SURNAMES: list[str] = [
+    'Толстой', 'Достоевский', 'Пушкин', 'Чехов', 'Гоголь', 'Тургенев',
+    'Булгаков', 'Лермонтов', 'Бунин', 'Горький', 'Набоков', 'Пастернак',
+    'Шолохов', 'Куприн', 'Лесков', 'Гончаров', 'Салтыков-Щедрин', 'Фёдоров',
+    'Ахматова', 'Цветаева', 'Есенин', 'Маяковский', 'Блок', 'Платонов'
+]
+INITIALS: str = 'АБВГДЕЖЗИКЛМНОПРСТФЮЯ'
+TITLE_WORDS: list[str] = [
+    'война', 'мир', 'преступление', 'наказание', 'мёртвые', 'души', 'отцы',
+    'дети', 'мастер', 'маргарита', 'герой', 'нашего', 'времени', 'тихий',
+    'дон', 'белая', 'гвардия', 'вишнёвый', 'сад', 'капитанская', 'дочка',
+    'идиот', 'бесы', 'братья', 'обломов', 'чайка', 'тёмные', 'аллеи',
+    'история', 'одного', 'города', 'котлован', 'юность', 'ёлка', 'дорога'
+]
+AUTHOR_COUNT: int = 2000
+SIZES: list[int] = [1_000, 10_000, 100_000]
+SAMPLES: int = 200
+FILE_SAMPLES: int = 3
+PAGE_SIZE: int = 20
+
+
+def generate_authors(count: int, random_generator: random.Random) -> list[str]:
+    """Генерирует имена авторов вида "Фамилия И. О."."""
+    return [
+        f'{random_generator.choice(SURNAMES)} '
+        f'{random_generator.choice(INITIALS)}. '
+        f'{random_generator.choice(INITIALS)}.'
+        for _ in range(count)
+    ]
+
+
+def generate_library(
+    count: int,
+    seed: int = 0
+) -> list[tuple[str, str, str, int]]:
+    """
+    Генерирует атрибуты книг синтетической библиотеки. Авторы распределены
+    по закону Ципфа: у немногих авторов много книг, у большинства - по одной-
+    две. Названия состоят из 1-5 слов кириллицей, годы издания
+    сосредоточены в XX веке.
+
+    Args:
+        count: Число книг
+        seed: Начальное значение генератора случайных чисел
+
+    Returns:
+        Список кортежей (название, автор, год издания, номер статуса)
+    """
+    random_generator = random.Random(seed)
+    authors = generate_authors(AUTHOR_COUNT, random_generator)
+    weights = [1 / rank for rank in range(1, AUTHOR_COUNT + 1)]
+    chosen_authors = random_generator.choices(authors, weights, k=count)
+    books = []
+    for author in chosen_authors:
+        words = random_generator.choices(
+            TITLE_WORDS,
+            k=random_generator.randint(1, 5)
+        )
+        year = min(2024, max(1700, int(random_generator.gauss(1950, 50))))
+        books.append((
+            ' '.join(words).capitalize(),
+            author,
+            str(year),
+            int(random_generator.random() < 0.3)
+        ))
+    return books
+
+
+def build_library(
+    attributes: list[tuple[str, str, str, int]],
+    columnar: bool
+) -> ConsoleLibrary:
+    """Создает библиотеку из атрибутов книг."""
+    books = {}
+    for title, author, year, status_code in attributes:
+        book = Book(title, author, year)
+        book.set_status(status_code)
+        books[book.get_id()] = book
+    console_library = ConsoleLibrary(ColumnarBookStore() if columnar else None)
+    console_library.replace_books(books)
+    return console_library
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Возвращает перцентиль отсортированного списка значений."""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(
+    operation: Callable[[int], None],
+    samples: int
+) -> dict[str, float]:
+    """
+    Измеряет задержку каждого из samples вызовов operation(номер_вызова) и
+    пиковый прирост памяти при отдельном вызове. Вывод операции
+    отбрасывается.
+
+    Args:
+        operation: Измеряемая операция
+        samples: Число вызовов
+
+    Returns:
+        Словарь с пропускной способностью (операций в секунду),
+        перцентилями задержки (в секундах) и пиковым приростом памяти (в
+        байтах)
+    """
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        gc.collect()
+        for i in range(samples):
+            start = time.perf_counter()
+            operation(i)
+            latencies.append(time.perf_counter() - start)
+            output.seek(0)
+            output.truncate()
+        gc.collect()
+        tracemalloc.start()
+        operation(samples)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        'samples': samples,
+        'throughput': samples / sum(latencies) if sum(latencies) else 0.0,
+        'p50': percentile(latencies, 0.5),
+        'p90': percentile(latencies, 0.9),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1],
+        'peak_memory': peak_memory
+    }
+
+
+def run_size(
+    count: int,
+    samples: int,
+    columnar: bool,
+    directory: str
+) -> dict[str, dict[str, float]]:
+    """
+    Измеряет операции библиотеки из count книг.
+
+    Args:
+        count: Число книг
+        samples: Число вызовов операций над книгами
+        columnar: Хранить книги в ColumnarBookStore
+        directory: Каталог для файла библиотеки
+
+    Returns:
+        Результаты измерений по названиям операций
+    """
+    attributes = generate_library(count)
+    console_library = build_library(attributes, columnar)
+    random_generator = random.Random(count)
+    ids = list(console_library.books)
+    queries = [random_generator.choice(attributes)[1].split()[0]
+               for _ in range(samples + 1)]
+    additions = generate_library(samples + 1, seed=count + 1)
+    deleted_ids = random_generator.sample(ids, min(len(ids), samples + 1))
+    file_path = os.path.join(directory, f'library_{count}.json')
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('{"books": {}}')
+    library_json_manager = LibraryJSONManager(file_path, console_library)
+    results = {}
+    results['add_book'] = measure(
+        lambda i: console_library.add_book(*additions[i][:3]),
+        samples
+    )
+    results['find_book'] = measure(
+        lambda i: console_library.find_book(queries[i], PAGE_SIZE),
+        samples
+    )
+    results['print_books'] = measure(
+        lambda i: console_library.print_books(
+            PAGE_SIZE,
+            random_generator.randrange(max(1, count - PAGE_SIZE))
+        ),
+        samples
+    )
+    results['change_book_status'] = measure(
+        lambda i: console_library.change_book_status(
+            random_generator.choice(ids),
+            i % len(Book.STATUSES)
+        ),
+        samples
+    )
+    results['delete_book'] = measure(
+        lambda i: console_library.delete_book(deleted_ids[i]),
+        min(samples, len(deleted_ids) - 1)
+    )
+    results['save_to_json'] = measure(
+        lambda i: library_json_manager.save_to_json(),
+        FILE_SAMPLES
+    )
+    results['read_from_json'] = measure(
+        lambda i: library_json_manager.read_from_json(),
+        FILE_SAMPLES
+    )
+    return results
+
+
+def get_commit() -> str | None:
+    """Возвращает хеш текущего коммита или None вне git-репозитория."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> Namespace:
+    """Разбирает параметры запуска."""
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='Размеры библиотек, например 1000 10000000')
+    parser.add_argument('--samples', type=int, default=SAMPLES,
+                        help='Число вызовов операций над книгами')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='Файл результатов')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Хранить книги в ColumnarBookStore')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'columnar': args.columnar,
+        'results': {}
+    }
+    print(f'{"книг":>10} {"операция":<20} {"оп/с":>12} {"p50, мс":>10} '
+          f'{"p99, мс":>10} {"память, КиБ":>12}')
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            results = run_size(count, args.samples, args.columnar, directory)
+            report['results'][str(count)] = results
+            for name, result in results.items():
+                print(f'{count:>10} {name:<20} {result["throughput"]:>12.1f} '
+                      f'{result["p50"] * 1000:>10.3f} '
+                      f'{result["p99"] * 1000:>10.3f} '
+                      f'{result["peak_memory"] / 1024:>12.1f}')
+            sys.stdout.flush()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f'Результаты записаны в {args.output}')
+
+
+if __name__ == '__main__':
+    main()
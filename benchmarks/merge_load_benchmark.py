@@ -0,0 +1,93 @@
+﻿"""
+Измерение времени повторной загрузки почти неизмененного json-файла
+LibraryJSONManager: обычная загрузка пересоздает библиотеку и ее индексы,
+загрузка слиянием заменяет только отличающиеся книги.
+
+Запуск из корня репозитория:
+    python -m benchmarks.merge_load_benchmark [число_книг] [доля_изменений]
+"""
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import LibraryJSONManager
+from benchmarks.library_benchmark import build_library, generate_library
+
+
+COUNT: int = 200_000
+CHANGED_SHARE: float = 0.01
+
+
+def measure_reload(manager: LibraryJSONManager) -> float:
+    """
+    Возвращает время повторной загрузки библиотеки менеджером в секундах
+    вместе с первым поиском по автору, для которого нужны индексы. Индексы
+    библиотеки перед повторной загрузкой должны быть построены, см.
+    build_indexes.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager.read_from_json()
+        manager.obj.find_by_author('')
+    return time.perf_counter() - start
+
+
+def build_indexes(console_library: ConsoleLibrary) -> None:
+    """
+    Строит индексы библиотеки поиском по автору. Загрузка слиянием в пустую
+    библиотеку оставляет индексы непостроенными, и без этого повторная
+    загрузка измеряла бы построение индексов, а не слияние.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        console_library.find_by_author('')
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    changed_share = float(sys.argv[2]) if len(sys.argv) > 2 \
+        else CHANGED_SHARE
+    print(f'Книг: {count}, изменено: {changed_share:.1%}')
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, 'library.json')
+        open(file_path, 'w').close()
+        console_library = build_library(generate_library(count), False)
+        writer = LibraryJSONManager(
+            file_path,
+            console_library,
+            journaling=True
+        )
+        writer.checkpoint()
+        libraries = {}
+        for merge in (False, True):
+            library = ConsoleLibrary()
+            manager = LibraryJSONManager(
+                file_path,
+                library,
+                journaling=True,
+                merge=merge
+            )
+            manager.read_from_json()
+            build_indexes(library)
+            libraries[merge] = manager
+        ids = list(console_library.books)
+        step = max(1, round(1 / changed_share)) if changed_share > 0 \
+            else len(ids) + 1
+        changed_ids = ids[::step]
+        console_library.change_statuses((id, 1) for id in changed_ids[::2])
+        console_library.delete_books(changed_ids[1::2])
+        writer.checkpoint()
+        del console_library, writer
+        base_time = measure_reload(libraries[False])
+        print(f'{"обычная загрузка":<18} {base_time:>8.3f} с')
+        merge_time = measure_reload(libraries[True])
+        print(f'{"слияние":<18} {merge_time:>8.3f} с '
+              f'(x{base_time / merge_time:.1f})')
+
+
+if __name__ == '__main__':
+    main()
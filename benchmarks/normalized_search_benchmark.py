@@ -0,0 +1,88 @@
+﻿"""
+Измерение полного просмотра библиотеки при поиске по ключевому слову
+(find_book с ключевым словом короче трех символов): сравнение с учетом
+регистра по исходным строкам, без учета регистра с нормализацией строк в
+цикле поиска и без учета регистра по ключам поиска, вычисленным при
+создании книг, в словаре книг и в столбцовом хранилище ColumnarBookStore.
+
+Запуск из корня репозитория:
+    python -m benchmarks.normalized_search_benchmark [число_книг]
+"""
+import gc
+import statistics
+import sys
+import time
+from Book import Book
+from benchmarks.library_benchmark import build_library, generate_library
+
+
+COUNT: int = 200_000
+KEY_WORDS: list[str] = ['То', 'ё', 'ий', '19', 'Ка', 'ов', 'мир', 'Б']
+ROUNDS: int = 3
+
+
+def scan_raw(books: list[Book], key_word: str) -> int:
+    """Поиск с учетом регистра по исходным строкам."""
+    return sum(1 for book in books
+               if key_word in book.title
+               or key_word in book.author
+               or key_word in book.year)
+
+
+def scan_normalizing(books: list[Book], key_word: str) -> int:
+    """Поиск без учета регистра с нормализацией строк в цикле поиска."""
+    key_word = Book.normalize(key_word)
+    normalize = Book.normalize
+    return sum(1 for book in books
+               if key_word in normalize(book.title)
+               or key_word in normalize(book.author)
+               or key_word in normalize(book.year))
+
+
+def scan_keys(books: list[Book], key_word: str) -> int:
+    """Поиск без учета регистра по ключам поиска книг."""
+    key_word = Book.normalize(key_word)
+    return sum(1 for book in books
+               if key_word in book.title_key
+               or key_word in book.author_key
+               or key_word in book.year_key)
+
+
+def measure(scan, books: list[Book]) -> tuple[float, int]:
+    """
+    Возвращает медианное по раундам время просмотра библиотеки для всех
+    ключевых слов в миллисекундах и число найденных книг.
+    """
+    gc.collect()
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        found = sum(scan(books, key_word) for key_word in KEY_WORDS)
+        times.append((time.perf_counter() - start) * 1000 / len(KEY_WORDS))
+    return statistics.median(times), found
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    attributes = generate_library(count)
+    books = list(build_library(attributes, False).books.values())
+    columnar_books = list(build_library(attributes, True).books.values())
+    start = time.perf_counter()
+    for title, author, year, _ in attributes:
+        Book.normalize(title), Book.normalize(author), Book.normalize(year)
+    key_time = time.perf_counter() - start
+    print(f'Книг: {count}, вычисление ключей поиска: {key_time:.3f} с')
+    base_time, _ = measure(scan_raw, books)
+    print(f'{"с учетом регистра":<28} {base_time:>8.1f} мс')
+    for name, scan, scanned in (
+            ('нормализация в цикле', scan_normalizing, books),
+            ('ключи поиска', scan_keys, books),
+            ('столбцы: нормализация', scan_normalizing, columnar_books),
+            ('столбцы: ключи поиска', scan_keys, columnar_books)):
+        scan_time, found = measure(scan, scanned)
+        print(f'{name:<28} {scan_time:>8.1f} мс '
+              f'(x{scan_time / base_time:.2f}), найдено: {found}')
+
+
+if __name__ == '__main__':
+    main()
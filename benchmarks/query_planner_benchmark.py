@@ -0,0 +1,93 @@
+﻿"""
+Измерение выполнения запросов BookQuery по пути доступа, выбранному
+планировщиком, в сравнении с полным просмотром библиотеки, который
+проверяет все условия запроса для каждой книги.
+
+Запуск из корня репозитория:
+    python -m benchmarks.query_planner_benchmark [число_книг]
+"""
+import contextlib
+import gc
+import io
+import statistics
+import sys
+import time
+from BookQuery import BookQuery
+from ConsoleLibrary import ConsoleLibrary
+from benchmarks.library_benchmark import build_library, generate_library
+
+
+COUNT: int = 200_000
+ROUNDS: int = 5
+
+
+def make_queries(author: str) -> list[str]:
+    """Возвращает запросы с условиями разной избирательности."""
+    surname = author.split()[0]
+    return [
+        f'author~{surname} status:1',
+        f'author~{surname} year>=1990',
+        'year>=2020 title~сад',
+        'year=1950 or year=1951',
+        'title~мастер -status:0',
+    ]
+
+
+def run_planned(console_library: ConsoleLibrary, query: BookQuery) -> int:
+    """Выполняет запрос по путям доступа планировщика."""
+    books = console_library.books
+    paths = query.plan(console_library)
+    if any(path.fetch is None for path in paths):
+        return sum(1 for book in books.values() if query.matches(book))
+    ids = set()
+    for path in paths:
+        ids.update(
+            id for id in path.fetch()
+            if all(condition.match(books[id]) for condition in path.conditions)
+        )
+    return len(ids)
+
+
+def run_scan(console_library: ConsoleLibrary, query: BookQuery) -> int:
+    """Выполняет запрос полным просмотром библиотеки."""
+    return sum(1 for book in console_library.books.values()
+               if query.matches(book))
+
+
+def measure(run, console_library: ConsoleLibrary,
+            query: BookQuery) -> tuple[float, int]:
+    """
+    Возвращает медианное по раундам время выполнения запроса в
+    миллисекундах и число найденных книг.
+    """
+    gc.collect()
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        found = run(console_library, query)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), found
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    attributes = generate_library(count)
+    console_library = build_library(attributes, False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Первый поиск строит индексы библиотеки
+        console_library.find_by_author('')
+    print(f'Книг: {count}')
+    for text in make_queries(attributes[0][1]):
+        query = BookQuery.parse(text)
+        paths = query.plan(console_library)
+        planned_time, found = measure(run_planned, console_library, query)
+        scan_time, scan_found = measure(run_scan, console_library, query)
+        assert found == scan_found
+        print(f'{text}\n\t{"; ".join(path.description for path in paths)}'
+              f'\n\tнайдено: {found}, план: {planned_time:.2f} мс, полный '
+              f'просмотр: {scan_time:.2f} мс '
+              f'(x{scan_time / planned_time:.1f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+﻿"""
+Измерение времени загрузки библиотеки из шардов LibraryShardedManager в
+зависимости от числа процессов-исполнителей в сравнении с загрузкой
+json-файла LibraryJSONManager. LibraryJSONManager строит индексы при
+загрузке, LibraryShardedManager - при первом запросе, поэтому время
+загрузки включает первый запрос, и оба пути строят индексы.
+
+Запуск из корня репозитория:
+    python -m benchmarks.sharded_load_benchmark [число_книг] [число_процессов ...]
+"""
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import LibraryJSONManager
+from ShardedManager import LibraryShardedManager
+from benchmarks.library_benchmark import build_library, generate_library
+
+
+COUNT: int = 200_000
+WORKERS: list[int] = [1, 2, 4, 8]
+
+
+def measure_load(manager: LibraryJSONManager | LibraryShardedManager) -> float:
+    """
+    Возвращает время загрузки библиотеки менеджером и первого запроса,
+    который строит ее индексы, в секундах.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager.read_from_json()
+        manager.obj.count_books_by_status(1)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    workers_counts = [int(workers) for workers in sys.argv[2:]] or WORKERS
+    console_library = build_library(generate_library(count), False)
+    print(f'Книг: {count}, процессоров: {os.cpu_count()}')
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'library.json')
+        manifest_path = os.path.join(directory, 'library.lcsm')
+        for path in (json_path, manifest_path):
+            open(path, 'w').close()
+        LibraryJSONManager(json_path, console_library).save_to_json()
+        LibraryShardedManager(
+            manifest_path,
+            console_library,
+            shard_count=max(workers_counts)
+        ).save_to_json()
+        del console_library
+        base_time = measure_load(
+            LibraryJSONManager(json_path, ConsoleLibrary(), journaling=True)
+        )
+        print(f'{"json-файл":<20} {base_time:>8.3f} с')
+        for workers in workers_counts:
+            load_time = measure_load(LibraryShardedManager(
+                manifest_path,
+                ConsoleLibrary(),
+                workers=workers
+            ))
+            print(f'{f"шарды, процессов {workers}":<20} {load_time:>8.3f} с '
+                  f'(x{base_time / load_time:.1f})')
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
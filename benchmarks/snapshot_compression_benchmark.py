@@ -0,0 +1,77 @@
+﻿"""
+Сравнение размера json-файла библиотеки и времени его сохранения и загрузки
+без сжатия и с каждым кодеком из LibraryJSONManager.COMPRESSIONS.
+
+Запуск из корня репозитория:
+    python -m benchmarks.snapshot_compression_benchmark [число_книг ...]
+"""
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import LibraryJSONManager
+from benchmarks.library_benchmark import build_library, generate_library
+
+
+COUNTS: list[int] = [10_000, 100_000]
+SUFFIXES: list[str] = ['.json', '.json.gz', '.json.bz2', '.json.xz']
+
+
+def measure_codec(
+    console_library: ConsoleLibrary,
+    file_path: str
+) -> tuple[int, float, float]:
+    """
+    Сохраняет библиотеку в файл и загружает ее из него.
+
+    Args:
+        console_library: Сохраняемая библиотека
+        file_path: Путь до файла, расширение которого задает кодек
+
+    Returns:
+        Размер файла в байтах, время сохранения и время загрузки в секундах
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('{"books": {}}')
+    gc.collect()
+    start = time.perf_counter()
+    LibraryJSONManager(file_path, console_library).save_to_json()
+    save_time = time.perf_counter() - start
+    loaded_library = ConsoleLibrary()
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        LibraryJSONManager(file_path, loaded_library).read_from_json()
+    load_time = time.perf_counter() - start
+    assert len(loaded_library.books) == len(console_library.books)
+    return os.path.getsize(file_path), save_time, load_time
+
+
+def main() -> None:
+    counts = [int(count) for count in sys.argv[1:]] or COUNTS
+    print(f'{"книг":>10} {"файл":<10} {"размер, КиБ":>12} {"сжатие":>8} '
+          f'{"сохранение, с":>14} {"загрузка, с":>12}')
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            console_library = build_library(generate_library(count), False)
+            plain_size = None
+            for suffix in SUFFIXES:
+                file_path = os.path.join(directory, 'library' + suffix)
+                size, save_time, load_time = measure_codec(
+                    console_library,
+                    file_path
+                )
+                os.remove(file_path)
+                plain_size = plain_size or size
+                print(f'{count:>10} {suffix:<10} {size / 1024:>12.1f} '
+                      f'{plain_size / size:>8.1f} {save_time:>14.3f} '
+                      f'{load_time:>12.3f}')
+                sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+﻿import unittest
+from Autosaver import Autosaver
+from ConsoleLibrary import ConsoleLibrary
+from JSONManager import LibraryJSONManager
+import io
+import os
+import sys
+import tempfile
+import time
+
+
+class TestAutosaver(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = os.path.join(directory.name, 'library.json')
+        with open(self.file_path, 'w') as f:
+            f.write('{"books": {}}')
+        self.console_library = ConsoleLibrary(thread_safe=True)
+        self.manager = LibraryJSONManager(
+            self.file_path,
+            self.console_library,
+            journaling=True
+        )
+        self.manager.read_from_json()
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def start(self, mutation_threshold: int, quiet_period: float) -> Autosaver:
+        autosaver = Autosaver(self.manager, mutation_threshold, quiet_period)
+        self.addCleanup(autosaver.stop)
+        return autosaver
+
+    def read_library(self) -> ConsoleLibrary:
+        console_library = ConsoleLibrary()
+        LibraryJSONManager(
+            self.file_path,
+            console_library,
+            journaling=True
+        ).read_from_json()
+        return console_library
+
+    def wait_for_saves(self, autosaver: Autosaver, count: int) -> None:
+        deadline = time.monotonic() + 5
+        while autosaver.get_save_count() < count \
+                and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_requires_thread_safe_library(self):
+        manager = LibraryJSONManager(self.file_path, ConsoleLibrary())
+        self.assertRaises(ValueError, Autosaver, manager)
+
+    def test_saves_after_mutation_threshold(self):
+        autosaver = self.start(mutation_threshold=3, quiet_period=60)
+        self.console_library.add_book('Ёлка', 'Чехов', '1888')
+        self.console_library.add_book('Чайка', 'Чехов', '1896')
+        time.sleep(0.05)
+        self.assertEqual(autosaver.get_save_count(), 0)
+        self.console_library.add_book('Дуэль', 'Чехов', '1891')
+        self.wait_for_saves(autosaver, 1)
+        self.assertEqual(autosaver.get_save_count(), 1)
+        self.assertEqual(len(self.read_library().books), 3)
+
+    def test_coalesces_burst_after_quiet_period(self):
+        autosaver = self.start(mutation_threshold=1000, quiet_period=0.1)
+        for i in range(50):
+            self.console_library.add_book(f'Книга {i}', 'Чехов', '1888')
+        self.wait_for_saves(autosaver, 1)
+        time.sleep(0.2)
+        self.assertEqual(autosaver.get_save_count(), 1)
+        self.assertEqual(len(self.read_library().books), 50)
+
+    def test_stop_flushes_pending_changes(self):
+        autosaver = self.start(mutation_threshold=1000, quiet_period=60)
+        self.console_library.add_book('Ёлка', 'Чехов', '1888')
+        autosaver.stop()
+        self.assertEqual(autosaver.get_save_count(), 1)
+        self.assertEqual(len(self.read_library().books), 1)
+
+    def test_stop_without_changes_does_not_save(self):
+        autosaver = self.start(mutation_threshold=1, quiet_period=0)
+        autosaver.stop()
+        self.assertEqual(autosaver.get_save_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+﻿import unittest
+from Book import Book
+from BookImporter import BookImporter
+from ConsoleLibrary import ConsoleLibrary
+import io
+import os
+import sys
+import tempfile
+
+
+class TestBookImporter(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.console_library = ConsoleLibrary()
+        self.importer = BookImporter(self.console_library)
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def import_file(self, name: str, text: str) -> list[str]:
+        file_path = os.path.join(self.directory, name)
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        self.importer.import_books(file_path)
+        return self.captured_output.getvalue().splitlines()
+
+    def titles(self) -> list[str]:
+        return [book.title for book in self.console_library.books.values()]
+
+    def test_import_csv(self):
+        output = self.import_file('books.csv',
+            'title,author,year,status\n'
+            'Ёлка,Чехов,1888,1\n'
+            '"Война, и мир",Толстой,1869\n'
+            '\n'
+            ',Чехов,1896\n'
+            'Чайка,Чехов,1896,выдана\n'
+            'Дуэль,Чехов\n'
+            'Степь,Чехов,1888,5\n'
+        )
+        self.assertEqual(output[:3], [
+            'Строка 5: атрибуты книги не могут быть пустыми.',
+            'Строка 7: ожидается 3 или 4 столбца, получено 2.',
+            "Строка 8: некорректный статус книги '5'.",
+        ])
+        self.assertTrue(output[3].startswith(
+            'Импортировано книг: 3, отклонено строк: 3, время: '
+        ))
+        self.assertEqual(self.titles(), ['Ёлка', 'Война, и мир', 'Чайка'])
+        statuses = [book.get_status()
+                    for book in self.console_library.books.values()]
+        self.assertEqual(
+            statuses,
+            [Book.STATUSES[1], Book.STATUSES[0], Book.STATUSES[1]]
+        )
+
+    def test_import_ndjson_in_batches(self):
+        self.importer.BATCH_SIZE = 2
+        output = self.import_file('books.ndjson',
+            '{"title": "Ёлка", "author": "Чехов", "year": "1888"}\n'
+            '{"title": "Чайка", "author": "Чехов", "year": "1896", '
+            '"status": 1}\n'
+            '{"title": "Дуэль", "author": "Чехов"\n'
+            '[1, 2, 3]\n'
+            '{"title": "Степь", "author": "Чехов", "year": 1888}\n'
+            '{"title": "Дом", "author": "Чехов", "year": "1896"}\n'
+            '{"title": "Сад", "author": "Чехов", "year": "1904", '
+            '"status": 1.5}\n'
+            '{"title": "Остров", "author": "Чехов", "year": "1895", '
+            '"status": 1.0}\n'
+        )
+        self.assertEqual(output[:4], [
+            'Строка 3: некорректный json.',
+            'Строка 4: атрибуты книги должны быть строками.',
+            'Строка 5: атрибуты книги должны быть строками.',
+            'Строка 7: некорректный статус книги 1.5.',
+        ])
+        self.assertEqual(self.titles(), ['Ёлка', 'Чайка', 'Дом', 'Остров'])
+        self.console_library.count_books_by_status(1)
+        self.assertEqual(
+            self.captured_output.getvalue().splitlines()[-1],
+            'Книг со статусом "выдана": 2.'
+        )
+
+    def test_batch_takes_one_write_lock(self):
+        self.console_library = ConsoleLibrary(thread_safe=True)
+        self.importer = BookImporter(self.console_library)
+        self.importer.BATCH_SIZE = 2
+        events = []
+        self.console_library.listeners.append(
+            lambda event, book: events.append((event, book.title))
+        )
+        write_count = self.console_library.lock.get_write_count()
+        self.import_file('books.csv',
+            'Ёлка,Чехов,1888,1\n'
+            'Чайка,Чехов,1896\n'
+            'Степь,Чехов,1888,1\n'
+        )
+        self.assertEqual(
+            self.console_library.lock.get_write_count() - write_count,
+            2
+        )
+        self.assertEqual(events, [
+            ('add', 'Ёлка'), ('add', 'Чайка'), ('status', 'Ёлка'),
+            ('add', 'Степь'), ('status', 'Степь'),
+        ])
+
+    def test_unsupported_file(self):
+        output = self.import_file('books.txt', 'Ёлка,Чехов,1888\n')
+        self.assertEqual(
+            output,
+            ['Ошибка: импорт поддерживает только csv- и ndjson-файлы.']
+        )
+        self.assertEqual(len(self.console_library.books), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
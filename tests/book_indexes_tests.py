@@ -0,0 +1,158 @@
+﻿import unittest
+from Book import Book
+from BookIndexes import (
+    AuthorIndex, SimilarityIndex, StatusIndex, TrigramIndex, YearIndex
+)
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def test_grams(self):
+        self.assertEqual(TrigramIndex.grams('abcd'), {'abc', 'bcd'})
+        self.assertEqual(TrigramIndex.grams('ab'), set())
+
+    def test_candidates_for_short_key_word(self):
+        index = TrigramIndex()
+        index.add_book(Book('Война и мир', 'Толстой Л. Н.', '1869'))
+        self.assertIsNone(index.candidates('Во'))
+
+    def test_candidates(self):
+        index = TrigramIndex()
+        book_1 = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        book_2 = Book('Анна Каренина', 'Толстой Л. Н.', '1877')
+        index.add_book(book_1)
+        index.add_book(book_2)
+        self.assertEqual(
+            index.candidates('Толстой'),
+            {book_1.get_id(), book_2.get_id()}
+        )
+        self.assertEqual(index.candidates('Каренина'), {book_2.get_id()})
+        self.assertEqual(index.candidates('Пушкин'), set())
+
+    def test_remove_book(self):
+        index = TrigramIndex()
+        book_1 = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        book_2 = Book('Анна Каренина', 'Толстой Л. Н.', '1877')
+        index.add_book(book_1)
+        index.add_book(book_2)
+        index.remove_book(book_1)
+        self.assertEqual(index.candidates('Толстой'), {book_2.get_id()})
+        self.assertEqual(index.candidates('Война'), set())
+
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    def test_features(self):
+        self.assertEqual(
+            SimilarityIndex.features('Ab, c'),
+            {'  a', ' ab', 'ab ', '  c', ' c '}
+        )
+        self.assertEqual(SimilarityIndex.features(' .,'), set())
+
+    def test_top_tolerates_typos(self):
+        index = SimilarityIndex()
+        book_1 = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        book_2 = Book('Анна Каренина', 'Толстой Л. Н.', '1877')
+        book_3 = Book('Толстый и тонкий', 'Чехов А. П.', '1883')
+        book_4 = Book('Ревизор', 'Гоголь Н. В.', '1836')
+        for book in (book_1, book_2, book_3, book_4):
+            index.add_book(book)
+        top = index.top('толстй', 10)
+        self.assertEqual(
+            [id for _, id in top],
+            [book_1.get_id(), book_2.get_id(), book_3.get_id()]
+        )
+        top = index.top('толстой', 10)
+        self.assertEqual(top[0][0], 1)
+        self.assertLess(top[2][0], 1)
+        self.assertEqual(index.top('каренна', 1)[0][1], book_2.get_id())
+        self.assertEqual(len(index.top('толстй', 2)), 2)
+        self.assertEqual(index.top('пушкин', 10), [])
+
+    def test_remove_book(self):
+        index = SimilarityIndex()
+        book_1 = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        book_2 = Book('Анна Каренина', 'Толстой Л. Н.', '1877')
+        index.add_book(book_1)
+        index.add_book(book_2)
+        index.remove_book(book_1)
+        self.assertEqual(
+            [id for _, id in index.top('толстой', 10)],
+            [book_2.get_id()]
+        )
+        self.assertEqual(index.top('война', 10), [])
+
+
+class TestStatusIndex(unittest.TestCase):
+    def test_change_status(self):
+        index = StatusIndex()
+        book = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        index.add_book(book)
+        index.change_status(book.get_id(), 0, 1)
+        self.assertEqual(index.ids(0), set())
+        self.assertEqual(index.ids(1), {book.get_id()})
+        self.assertRaises(Book.IncorrectBookStatusException, index.ids, 2)
+
+
+class TestAuthorIndex(unittest.TestCase):
+    def test_ids(self):
+        index = AuthorIndex()
+        book_1 = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        book_2 = Book('Анна Каренина', 'толстой  л. н. ', '1877')
+        index.add_book(book_1)
+        index.add_book(book_2)
+        self.assertEqual(
+            index.ids('ТОЛСТОЙ Л. Н.'), 
+            {book_1.get_id(), book_2.get_id()}
+        )
+        index.remove_book(book_1)
+        self.assertEqual(index.ids('Толстой Л. Н.'), {book_2.get_id()})
+        self.assertEqual(index.ids('Толстой'), set())
+        book_3 = Book('Ёлка', 'Фёдоров', '1888')
+        index.add_book(book_3)
+        self.assertEqual(index.ids('федоров'), {book_3.get_id()})
+
+
+class TestYearIndex(unittest.TestCase):
+    def test_parse_year(self):
+        self.assertEqual(YearIndex.parse_year('1869'), 1869)
+        self.assertEqual(YearIndex.parse_year('около 1869 г.'), 1869)
+        self.assertIsNone(YearIndex.parse_year('неизвестен'))
+
+    def test_ids_in_range(self):
+        index = YearIndex()
+        books = [Book('title', 'author', year) 
+                 for year in ['1877', '1869', '1990', 'неизвестен', '1869']]
+        index.rebuild(books[:3])
+        for book in books[3:]:
+            index.add_book(book)
+        self.assertEqual(
+            list(index.ids_in_range(1869, 1877)), 
+            [books[1].get_id(), books[4].get_id(), books[0].get_id()]
+        )
+        index.remove_book(books[1])
+        self.assertEqual(
+            list(index.ids_in_range(1800, 1869)), 
+            [books[4].get_id()]
+        )
+        self.assertEqual(list(index.ids_in_range(1991, 2000)), [])
+
+    def test_add_and_remove_books(self):
+        index = YearIndex()
+        books = [Book('title', 'author', year) 
+                 for year in ['1877', '1869', '1990', 'неизвестен', '1869']]
+        index.add_books(books[:2])
+        index.add_books(books[2:])
+        self.assertEqual(
+            list(index.ids_in_range(1800, 2000)), 
+            [books[1].get_id(), books[4].get_id(), books[0].get_id(), 
+             books[2].get_id()]
+        )
+        index.remove_books([books[4], books[2], books[3]])
+        self.assertEqual(
+            list(index.ids_in_range(1800, 2000)), 
+            [books[1].get_id(), books[0].get_id()]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+﻿import unittest
+from Book import Book
+from BookQuery import BookQuery
+from ConsoleLibrary import ConsoleLibrary
+
+
+class TestBookQuery(unittest.TestCase):
+    def setUp(self):
+        self.books = [
+            Book('Война и мир', 'Толстой', '1869'),
+            Book('Анна Каренина', 'Толстой', '1877'),
+            Book('Детство', 'Толстой', '1852'),
+            Book('Ёлка', 'Чехов', '1888'),
+            Book('Чайка', 'Чехов', 'около 1896'),
+        ]
+        self.books[1].set_status(1)
+        self.console_library = ConsoleLibrary(
+            {book.get_id(): book for book in self.books}
+        )
+
+    def find(self, text: str) -> list[int]:
+        book_query = BookQuery.parse(text)
+        return [index for index, book in enumerate(self.books)
+                if book_query.matches(book)]
+
+    def plan(self, text: str) -> list[str]:
+        paths = BookQuery.parse(text).plan(self.console_library)
+        return [path.description for path in paths]
+
+    def test_parse(self):
+        book_query = BookQuery.parse('author~Толстой  year>=1 OR -Ёлка')
+        self.assertEqual(str(book_query), 'author~толстой year>=1 or -елка')
+        conditions = book_query.alternatives[0]
+        self.assertEqual(
+            [(condition.field, condition.operator, condition.value) 
+             for condition in conditions],
+            [('author', '~', 'толстой'), ('year', '>=', 1)]
+        )
+        self.assertTrue(book_query.alternatives[1][0].negated)
+
+    def test_parse_errors(self):
+        for text in ['', 'or', 'a or', 'or a', 'title>1', 'year>abc', 
+                     'status:2', 'status~0', 'author=', '-']:
+            with self.subTest(text=text):
+                self.assertRaises(
+                    BookQuery.QuerySyntaxException, 
+                    BookQuery.parse, 
+                    text
+                )
+
+    def test_matches(self):
+        self.assertEqual(self.find('author~толст year>=1860 status:0'), [0])
+        self.assertEqual(self.find('author=ТОЛСТОЙ -детство'), [0, 1])
+        self.assertEqual(self.find('title~елк or status:1'), [1, 3])
+        self.assertEqual(self.find('year:1896'), [4])
+        self.assertEqual(self.find('year=около'), [])
+        self.assertEqual(self.find('year~около'), [4])
+        self.assertEqual(self.find('year<1860 or year>1880'), [2, 3, 4])
+        self.assertEqual(self.find('чехов'), [3, 4])
+
+    def test_plan_picks_most_selective_index(self):
+        self.assertEqual(
+            self.plan('status:0 author=толстой year<1860'),
+            ['индекс годов (year<1860)']
+        )
+        self.assertEqual(
+            self.plan('status:1 year<1860'),
+            ['индекс статусов (status:1)']
+        )
+        self.assertEqual(
+            self.plan('author=чехов title~елка'),
+            ['триграммный индекс (title~елка)']
+        )
+        self.assertEqual(
+            self.plan('-чехов ч or author=чехов'),
+            ['полный просмотр', 'индекс авторов (author=чехов)']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,15 @@ class TestBook(unittest.TestCase):
         print(book_2.get_id())
         self.assertEqual(book_2.get_id(), 1)
 
+    @patch.object(Book, '_Book__generate_id', new_callable=PropertyMock)
+    def test_restore_id_and_advance_id_counter(self, generate_id_mock):
+        generate_id_mock.return_value = itertools.count().__next__
+        book_1 = Book('title', 'author', 'year', id=10)
+        self.assertEqual(book_1.get_id(), 10)
+        Book.advance_id_counter(book_1.get_id())
+        book_2 = Book('title', 'author', 'year')
+        self.assertEqual(book_2.get_id(), 11)
+
     def test_set_valid_status(self):
         book = Book('title', 'author', 'year')
         status_code = len(Book.STATUSES) - 1
@@ -41,6 +50,20 @@ class TestBook(unittest.TestCase):
             status_code
         )
 
+    def test_normalize(self):
+        self.assertEqual(Book.normalize('Ёлка ЁЖ'), 'елка еж')
+        self.assertEqual(Book.normalize('Straße'), 'strasse')
+        self.assertEqual(Book.normalize('ﬁ①'), 'fi1')
+        self.assertEqual(Book.normalize('Е\u0308ж'), 'еж')
+        year = '1869'
+        self.assertIs(Book.normalize(year), year)
+
+    def test_search_keys(self):
+        book = Book('Ёлка', 'Чехов А. П.', '1888')
+        self.assertEqual(book.title_key, 'елка')
+        self.assertEqual(book.author_key, 'чехов а. п.')
+        self.assertIs(book.year_key, book.year)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,88 @@
+﻿import unittest
+from Book import Book
+from ColumnarBookStore import ColumnarBookStore
+from ConsoleLibrary import ConsoleLibrary
+import io
+import sys
+
+
+class TestColumnarBookStore(unittest.TestCase):
+    def test_set_and_get_book(self):
+        book = Book('Война и мир', 'Толстой Л. Н.', '1869')
+        book.set_status(1)
+        store = ColumnarBookStore({book.get_id(): book})
+        view = store[book.get_id()]
+        self.assertEqual(view.get_id(), book.get_id())
+        self.assertEqual(view.title, 'Война и мир')
+        self.assertEqual(view.author, 'Толстой Л. Н.')
+        self.assertEqual(view.year, '1869')
+        self.assertEqual(view.get_status(), Book.STATUSES[1])
+        self.assertEqual(view.title_key, 'война и мир')
+        self.assertEqual(view.author_key, book.author_key)
+
+    def test_set_status_through_view(self):
+        book = Book('title', 'author', 'year')
+        store = ColumnarBookStore({book.get_id(): book})
+        store[book.get_id()].set_status(1)
+        self.assertEqual(store[book.get_id()].get_status(), Book.STATUSES[1])
+        self.assertRaises(
+            Book.IncorrectBookStatusException, 
+            store[book.get_id()].set_status, 
+            len(Book.STATUSES)
+        )
+
+    def test_repeated_strings_are_shared(self):
+        author = ''.join(['Толстой', ' Л. Н.'])
+        books = [Book(f'book {i}', author[:], '1869') for i in range(3)]
+        store = ColumnarBookStore({book.get_id(): book for book in books})
+        views = list(store.values())
+        self.assertIs(views[0].author, views[2].author)
+
+    def test_keys_are_stored(self):
+        books = [Book(f'Книга {i}', 'Толстой', '1869') for i in range(3)]
+        store = ColumnarBookStore({book.get_id(): book for book in books})
+        views = list(store.values())
+        self.assertIs(views[0].title_key, views[0].title_key)
+        self.assertIs(views[0].author_key, views[2].author_key)
+        self.assertIs(views[0].year_key, views[0].year)
+        views[1].title = 'Анна Каренина'
+        self.assertEqual(views[1].title_key, 'анна каренина')
+
+    def test_delete_keeps_order(self):
+        books = [Book(f'book {i}', 'author', 'year') for i in range(10)]
+        store = ColumnarBookStore({book.get_id(): book for book in books})
+        for book in books[:7]:
+            del store[book.get_id()]
+        self.assertEqual(len(store), 3)
+        self.assertEqual(
+            [view.title for view in store.values()], 
+            ['book 7', 'book 8', 'book 9']
+        )
+        self.assertNotIn(books[0].get_id(), store)
+        self.assertRaises(KeyError, store.__getitem__, books[0].get_id())
+
+    def test_console_library_with_columnar_store(self):
+        console_library = ConsoleLibrary(ColumnarBookStore())
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.add_book('Война и мир', 'Толстой', '1869')
+        id = next(iter(console_library.books))
+        console_library.change_book_status(id, 1)
+        console_library.add_book('Анна Каренина', 'Толстой', '1877')
+        console_library.delete_book(list(console_library.books)[-1])
+        captured_output.truncate(0)
+        captured_output.seek(0)
+        console_library.find_book('Толстой')
+        sys.stdout = sys.__stdout__  
+        expected_print = ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+            id, 
+            'Война и мир', 
+            'Толстой', 
+            '1869',
+            Book.STATUSES[1]
+        ) + '\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
+
+if __name__ == '__main__':
+    unittest.main()
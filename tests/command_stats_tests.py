@@ -0,0 +1,51 @@
+﻿import unittest
+from CommandStats import CommandStats, LatencyHistogram
+import io
+import sys
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_empty_percentile(self):
+        self.assertEqual(LatencyHistogram().percentile(0.99), 0)
+
+    def test_percentile(self):
+        histogram = LatencyHistogram()
+        for latency in [1000] * 90 + [1_000_000] * 10:
+            histogram.add(latency)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.total, 90 * 1000 + 10 * 1_000_000)
+        self.assertEqual(histogram.percentile(0.5), 1023)
+        self.assertEqual(histogram.percentile(0.9), 1023)
+        self.assertEqual(histogram.percentile(0.99), (1 << 20) - 1)
+
+
+class TestCommandStats(unittest.TestCase):
+    def test_record(self):
+        command_stats = CommandStats()
+        command_stats.record('add_book', 1000, 2000, 3000, False)
+        command_stats.record('add_book', 3000, 2000, 1000, True)
+        stats = command_stats.to_dict()['commands']['add_book']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['parse_us'], 2)
+        self.assertEqual(stats['cast_us'], 2)
+        self.assertEqual(stats['execute_us'], 2)
+        self.assertEqual(stats['histogram'], {'<8.192us': 2})
+
+    def test_print_stats(self):
+        command_stats = CommandStats()
+        command_stats.record('find_book', 1000, 1000, 8000, False)
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        command_stats.print_stats()
+        sys.stdout = sys.__stdout__  
+        lines = captured_output.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            lines[2].split(), 
+            ['find_book', '1', '0', '1.0', '1.0', '8.0', '16.4', '16.4']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 ﻿import unittest
 from unittest.mock import PropertyMock, patch
 from Book import Book
+from ColumnarBookStore import ColumnarBookStore
 import itertools
 from ConsoleLibrary import ConsoleLibrary
 import io
@@ -68,6 +69,74 @@ class TestConsoleLibrary(unittest.TestCase):
         ) + '\n'
         self.assertEqual(captured_output.getvalue(), expected_print)
 
+    def test_print_books_page(self):
+        books = [Book(f'title {i}', 'author', 'year') for i in range(5)]
+        console_library = ConsoleLibrary(
+            {book.get_id(): book for book in books}
+        )
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.print_books(2, 1)  
+        console_library.print_books(2, 3)  
+        console_library.print_books(2, 5)  
+        sys.stdout = sys.__stdout__  
+        expected_print = ''.join(
+            console_library.format_book(book) + '\n' for book in books[1:3]
+        ) + 'Показаны книги с 2 по 3. Следующая страница: offset = 3.\n' \
+          + ''.join(
+            console_library.format_book(book) + '\n' for book in books[3:5]
+        ) + 'Книга не найдена.\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
+    def test_page_formats_only_books_on_page(self):
+        books = [Book(f'title {i}', 'author', '1900') for i in range(50)]
+        console_library = ConsoleLibrary(
+            {book.get_id(): book for book in books}
+        )
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        with patch.object(
+            console_library, 
+            'format_book', 
+            wraps=console_library.format_book
+        ) as format_book_mock:
+            console_library.print_books(2, 40)
+            console_library.find_book('title', 2, 40)
+            console_library.find_by_year_range(1900, 1900, 2, 40)
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(
+            [call.args[0] for call in format_book_mock.call_args_list], 
+            books[40:42] * 3
+        )
+
+    def test_print_books_with_negative_limit(self):
+        book = Book('title', 'author', 'year')
+        console_library = ConsoleLibrary({book.get_id(): book})
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.print_books(-1)  
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(
+            captured_output.getvalue(), 
+            'Ошибка: limit и offset не могут быть отрицательными.\n'
+        )
+
+    def test_find_book_page(self):
+        books = [Book(f'Книга {i}', 'Толстой', '1869') for i in range(5)]
+        books.append(Book('Другая', 'Пушкин', '1830'))
+        console_library = ConsoleLibrary(
+            {book.get_id(): book for book in reversed(books)}
+        )
+        for key_word in ['Толстой', 'То']:
+            captured_output = io.StringIO() 
+            sys.stdout = captured_output
+            console_library.find_book(key_word, 2, 2)  
+            sys.stdout = sys.__stdout__  
+            self.assertEqual(
+                captured_output.getvalue().splitlines()[:2], 
+                [console_library.format_book(book) for book in books[2:4]]
+            )
+
     def test_print_books_in_empty_library(self):
         console_library = ConsoleLibrary()
         captured_output = io.StringIO() 
@@ -107,6 +176,258 @@ class TestConsoleLibrary(unittest.TestCase):
         expected_print = 'Книга не найдена.\n'
         self.assertEqual(captured_output.getvalue(), expected_print)
 
+    def test_find_book_matches_substring_within_one_attribute(self):
+        book = Book('abc', 'def', 'year')
+        console_library = ConsoleLibrary({book.get_id(): book})
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.find_book('cde')  
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(captured_output.getvalue(), 'Книга не найдена.\n')
+
+    def test_find_book_after_add_and_delete(self):
+        console_library = ConsoleLibrary()
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.add_book('Война и мир', 'Толстой', '1869')
+        console_library.add_book('Анна Каренина', 'Толстой', '1877')
+        ids = list(console_library.books.keys())
+        console_library.delete_book(ids[0])
+        captured_output.truncate(0)
+        captured_output.seek(0)
+        console_library.find_book('Толстой')  
+        sys.stdout = sys.__stdout__  
+        expected_print = ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+            ids[1], 
+            'Анна Каренина', 
+            'Толстой', 
+            '1877',
+            Book.STATUSES[0]
+        ) + '\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
+    def test_find_book_ignores_case_and_yo(self):
+        book_1 = Book('Ёлка', 'Чехов', '1888')
+        book_2 = Book('Мёртвые души', 'ГОГОЛЬ', '1842')
+        console_library = ConsoleLibrary(
+            {book.get_id(): book for book in (book_1, book_2)}
+        )
+        for key_word, book in [('елк', book_1), ('ЁЛКА', book_1), 
+                               ('гоголь', book_2), ('мертвые', book_2), 
+                               ('гО', book_2)]:
+            with self.subTest(key_word=key_word):
+                captured_output = io.StringIO() 
+                sys.stdout = captured_output
+                console_library.find_book(key_word)
+                sys.stdout = sys.__stdout__  
+                self.assertEqual(
+                    captured_output.getvalue(), 
+                    console_library.format_book(book) + '\n'
+                )
+
+    def test_query_and_explain_query(self):
+        books = [Book('Война и мир', 'Толстой', '1869'), 
+                 Book('Детство', 'Толстой', '1852'), 
+                 Book('Ёлка', 'Чехов', '1888')]
+        console_library = ConsoleLibrary(
+            {book.get_id(): book for book in reversed(books)}
+        )
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.query('author=толстой', 'or', 'елка')
+        console_library.query('-толстой')
+        console_library.query('author~Толстой', 'year>=1860')
+        console_library.query('status:1')
+        console_library.query('year>')
+        console_library.explain_query('author~Толстой', 'year>=1860')
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(captured_output.getvalue().splitlines(), [
+            console_library.format_book(books[0]),
+            console_library.format_book(books[1]),
+            console_library.format_book(books[2]),
+            console_library.format_book(books[2]),
+            console_library.format_book(books[0]),
+            'Книга не найдена.',
+            'Ошибка запроса: не указано значение в "year>".',
+            'План запроса "author~толстой year>=1860":',
+            '\t- индекс годов (year>=1860): кандидатов 2; проверка: ' 
+            'author~толстой.',
+            'Оценка числа кандидатов: 2 из 3 книг.',
+        ])
+
+    def test_search(self):
+        console_library = ConsoleLibrary()
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.add_book('Война и мир', 'Толстой', '1869')
+        console_library.search('толстй')
+        console_library.add_book('Анна Каренина', 'Толстой', '1877')
+        console_library.add_book('Ревизор', 'Гоголь', '1836')
+        ids = list(console_library.books.keys())
+        console_library.delete_book(ids[0])
+        captured_output.truncate(0)
+        captured_output.seek(0)
+        console_library.search('толстй')
+        console_library.search('Гогль', 1)
+        console_library.search('Пушкин')
+        console_library.search('Гоголь', 0)
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(captured_output.getvalue().splitlines(), [
+            ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+                ids[1], 'Анна Каренина', 'Толстой', '1877', Book.STATUSES[0]
+            ) + ' Сходство: 0.71.',
+            ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+                ids[2], 'Ревизор', 'Гоголь', '1836', Book.STATUSES[0]
+            ) + ' Сходство: 0.67.',
+            'Книга не найдена.',
+            'Ошибка: k должно быть положительным.',
+        ])
+
+    def test_books_by_status(self):
+        books = [Book(f'title {i}', 'author', 'year') for i in range(5)]
+        books[1].set_status(1)
+        console_library = ConsoleLibrary(
+            {book.get_id(): book for book in books}
+        )
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.change_book_status(books[3].get_id(), 1)
+        console_library.delete_book(books[1].get_id())
+        console_library.add_book('title 5', 'author', 'year')
+        captured_output.truncate(0)
+        captured_output.seek(0)
+        console_library.print_books_by_status(1)  
+        console_library.print_books_by_status(0, 2, 1)  
+        console_library.count_books_by_status(0)  
+        console_library.count_books_by_status(2)  
+        sys.stdout = sys.__stdout__  
+        new_book = console_library.books[max(console_library.books)]
+        expected_print = console_library.format_book(books[3]) + '\n' \
+            + console_library.format_book(books[2]) + '\n' \
+            + console_library.format_book(books[4]) + '\n' \
+            + 'Показаны книги с 2 по 3. Следующая страница: offset = 3.\n' \
+            + 'Книг со статусом "в наличии": 4.\n' \
+            + Book.IncorrectBookStatusException.message + '\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+        self.assertEqual(
+            console_library.status_index.ids(0), 
+            {books[0].get_id(), books[2].get_id(), books[4].get_id(), 
+             new_book.get_id()}
+        )
+
+    def test_find_by_author_and_year_range(self):
+        console_library = ConsoleLibrary()
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.add_book('Война и мир', 'Толстой', '1869')
+        console_library.add_book('Евгений Онегин', 'Пушкин', '1833')
+        console_library.add_book('Анна Каренина', 'толстой', '1877')
+        console_library.add_book('Воскресение', 'Толстой', '1899')
+        books = list(console_library.books.values())
+        console_library.delete_book(books[3].get_id())
+        captured_output.truncate(0)
+        captured_output.seek(0)
+        console_library.find_by_author('ТОЛСТОЙ')  
+        console_library.find_by_year_range(1830, 1870)  
+        console_library.find_by_year_range(1878, 1900)  
+        sys.stdout = sys.__stdout__  
+        expected_print = ''.join(
+            console_library.format_book(books[i]) + '\n' 
+            for i in [0, 2, 1, 0]
+        ) + 'Книга не найдена.\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
+    @patch.object(Book, '_Book__generate_id', new_callable=PropertyMock)
+    def test_bulk_methods(self, generate_id_mock):
+        generate_id_mock.return_value = itertools.count().__next__
+        for books in (None, ColumnarBookStore()):
+            with self.subTest(books=type(books).__name__):
+                self.check_bulk_methods(ConsoleLibrary(books))
+
+    def check_bulk_methods(self, console_library: ConsoleLibrary):
+        events = []
+        console_library.add_listener(
+            lambda event, book: events.append((event, book.get_id()))
+        )
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.add_book('Война и мир', 'Толстой', '1869')
+        console_library.add_book('Анна Каренина', 'Толстой', '1877')
+        console_library.find_book('Толстой')
+        ids = console_library.add_books([
+            ('Ёлка', 'Чехов', '1888'), 
+            ('Чайка', 'Чехов', '1896')
+        ])
+        self.assertRaises(
+            Book.EmptyBookAttributeException, 
+            console_library.add_books, 
+            [('Дуэль', 'Чехов', '1891'), ('', 'Чехов', '1891')]
+        )
+        self.assertRaises(
+            Book.IncorrectBookStatusException, 
+            console_library.add_books, 
+            [('Дуэль', 'Чехов', '1891', 1), ('Степь', 'Чехов', '1888', 9)]
+        )
+        self.assertEqual(len(console_library.books), 4)
+        self.assertEqual(
+            console_library.change_statuses([(ids[0], 1), (-1, 1)]), 
+            1
+        )
+        self.assertRaises(
+            Book.IncorrectBookStatusException, 
+            console_library.change_statuses, 
+            [(ids[1], 1), (ids[1], 2)]
+        )
+        console_library.search('Чайка')
+        self.assertEqual(
+            console_library.delete_books([ids[1], -1, ids[1]]), 
+            1
+        )
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(list(console_library.books)[2:], ids[:1])
+        self.assertEqual(console_library.status_index.ids(1), {ids[0]})
+        self.assertEqual(console_library.author_index.ids('чехов'), {ids[0]})
+        self.assertEqual(
+            list(console_library.year_index.ids_in_range(1880, 1900)), 
+            ids[:1]
+        )
+        self.assertNotIn(ids[1], console_library.trigram_index.candidates(
+            'чайка'
+        ))
+        self.assertEqual(console_library.similarity_index.top('Чайка', 1), [])
+        self.assertEqual(
+            events[2:], 
+            [('add', ids[0]), ('add', ids[1]), ('status', ids[0]), 
+             ('delete', ids[1])]
+        )
+
+    @patch.object(Book, '_Book__generate_id', new_callable=PropertyMock)
+    def test_add_books_to_small_library_defers_indexes(
+        self, 
+        generate_id_mock
+    ):
+        generate_id_mock.return_value = itertools.count().__next__
+        console_library = ConsoleLibrary()
+        ids = console_library.add_books(
+            (f'Книга {i}', 'Чехов', str(1880 + i)) for i in range(3)
+        )
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console_library.find_by_author('Чехов')
+        find_by_author_output = captured_output.getvalue()
+        captured_output.truncate(0)
+        captured_output.seek(0)
+        console_library.find_by_year_range(1881, 1881)
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(find_by_author_output, ''.join(
+            console_library.format_book(console_library.books[id]) + '\n' 
+            for id in ids
+        ))
+        self.assertEqual(
+            captured_output.getvalue(), 
+            console_library.format_book(console_library.books[ids[1]]) + '\n'
+        )
+
     def test_add_valid_book(self):
         console_library = ConsoleLibrary()
         captured_output = io.StringIO() 
@@ -0,0 +1,108 @@
+﻿import unittest
+from Book import Book
+from ConsoleLibrary import ConsoleLibrary
+from ReadWriteLock import ReadWriteLock
+from concurrent.futures import ThreadPoolExecutor
+import io
+import random
+import sys
+import threading
+import time
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_readers_overlap_and_writers_are_exclusive(self):
+        lock = ReadWriteLock()
+        active = {'readers': 0, 'writers': 0}
+        max_active = {'readers': 0, 'writers': 0, 'mixed': 0}
+        guard = threading.Lock()
+        def run(kind: str) -> None:
+            context = lock.reading() if kind == 'readers' else lock.writing()
+            with context:
+                with guard:
+                    active[kind] += 1
+                    max_active[kind] = max(max_active[kind], active[kind])
+                    if active['readers'] > 0 and active['writers'] > 0:
+                        max_active['mixed'] += 1
+                time.sleep(0.01)
+                with guard:
+                    active[kind] -= 1
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(run, ['readers', 'writers'] * 20))
+        self.assertGreater(max_active['readers'], 1)
+        self.assertEqual(max_active['writers'], 1)
+        self.assertEqual(max_active['mixed'], 0)
+
+    def test_writer_can_reenter(self):
+        lock = ReadWriteLock()
+        with lock.writing():
+            with lock.writing():
+                with lock.reading():
+                    pass
+        with lock.reading():
+            pass
+        self.assertEqual(lock.get_write_count(), 1)
+
+
+class TestConsoleLibraryThreadSafety(unittest.TestCase):
+    def test_mixed_workload(self):
+        console_library = ConsoleLibrary(thread_safe=True)
+        added = []
+        deleted = []
+        guard = threading.Lock()
+        def on_change(event: str, book: Book) -> None:
+            with guard:
+                if event == 'add':
+                    added.append(book.get_id())
+                elif event == 'delete':
+                    deleted.append(book.get_id())
+        console_library.add_listener(on_change)
+        def work(seed: int) -> None:
+            random_generator = random.Random(seed)
+            for i in range(200):
+                operation = random_generator.random()
+                ids = list(added[-50:])
+                if operation < 0.35 or len(ids) == 0:
+                    console_library.add_book(
+                        f'Книга {seed} {i}', 
+                        f'Автор {seed % 5}', 
+                        str(1900 + i)
+                    )
+                elif operation < 0.5:
+                    console_library.delete_book(random_generator.choice(ids))
+                elif operation < 0.6:
+                    console_library.change_book_status(
+                        random_generator.choice(ids), 
+                        random_generator.randint(0, 1)
+                    )
+                elif operation < 0.8:
+                    console_library.find_book(f'Автор {seed % 5}', 10)
+                else:
+                    console_library.print_books(5, i)
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                for future in [executor.submit(work, s) for s in range(16)]:
+                    future.result()
+        finally:
+            sys.stdout = sys.__stdout__
+        self.assertEqual(len(deleted), len(set(deleted)))
+        self.assertEqual(
+            set(console_library.books), 
+            set(added) - set(deleted)
+        )
+        for book in console_library.books.values():
+            self.assertIn(
+                book.get_id(), 
+                console_library.trigram_index.candidates(book.title)
+            )
+        for id in deleted:
+            self.assertNotIn(
+                id, 
+                console_library.trigram_index.candidates('Книга')
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
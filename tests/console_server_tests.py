@@ -0,0 +1,105 @@
+﻿import unittest
+from Console import Console
+from ConsoleLibrary import ConsoleLibrary
+from ConsoleServer import ConsoleServer
+import asyncio
+import sys
+import threading
+import time
+
+
+class TestConsoleServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.console = Console()
+        self.console_library = ConsoleLibrary()
+        self.register_command('add_book', self.console_library.add_book)
+        self.register_command('find_book', self.console_library.find_book)
+        self.server = ConsoleServer(
+            self.console, 
+            ['help', 'find_book', 'wait']
+        )
+        await self.server.start()
+        self.addAsyncCleanup(self.server.stop)
+
+    def register_command(self, name: str, func) -> None:
+        self.console.register_command(name, func, '')
+        self.addCleanup(self.console.unregister_command, name)
+
+    async def connect(
+        self
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(
+            '127.0.0.1', 
+            self.server.get_port()
+        )
+        self.addAsyncCleanup(writer.wait_closed)
+        self.addCleanup(writer.close)
+        return reader, writer
+
+    async def request(
+        self, 
+        reader: asyncio.StreamReader, 
+        writer: asyncio.StreamWriter, 
+        command_line: str
+    ) -> str:
+        writer.write(command_line.encode('utf-8') + b'\n')
+        await writer.drain()
+        lines = []
+        while (line := await reader.readline()) != b'\n':
+            lines.append(line.decode('utf-8'))
+        return ''.join(lines)
+
+    async def test_sessions_share_library(self):
+        stdout = sys.stdout
+        client_1 = await self.connect()
+        client_2 = await self.connect()
+        self.assertEqual(
+            await self.request(*client_1, 'add_book Война_и_мир Толстой 1869'), 
+            'Книга добавлена.\n'
+        )
+        book = next(iter(self.console_library.books.values()))
+        self.assertEqual(
+            await self.request(*client_2, 'find_book Толстой'), 
+            self.console_library.format_book(book) + '\n'
+        )
+        self.assertEqual(
+            await self.request(*client_2, 'unknown_command'), 
+            'Ошибка: неизвестная команда.\n'
+        )
+        self.assertIs(sys.stdout, stdout)
+
+    async def test_exit_closes_session(self):
+        reader, writer = await self.connect()
+        writer.write(b'exit\n')
+        await writer.drain()
+        self.assertEqual(await reader.read(), b'')
+
+    async def test_reads_overlap_and_writes_are_serialized(self):
+        active = {'wait': 0, 'write': 0}
+        max_active = {'wait': 0, 'write': 0}
+        guard = threading.Lock()
+        def run(name: str) -> None:
+            with guard:
+                active[name] += 1
+                max_active[name] = max(max_active[name], active[name])
+            time.sleep(0.1)
+            with guard:
+                active[name] -= 1
+            print(name)
+        self.register_command('wait', lambda: run('wait'))
+        self.register_command('write', lambda: run('write'))
+        clients = [await self.connect() for _ in range(4)]
+        responses = await asyncio.gather(
+            *[self.request(*client, 'wait') for client in clients]
+        )
+        self.assertEqual(responses, ['wait\n'] * 4)
+        responses = await asyncio.gather(
+            *[self.request(*client, 'write') for client in clients]
+        )
+        self.assertEqual(responses, ['write\n'] * 4)
+        self.assertGreater(max_active['wait'], 1)
+        self.assertEqual(max_active['write'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
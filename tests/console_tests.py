@@ -2,7 +2,10 @@
 from unittest.mock import patch
 from Console import Console
 import io
+import json
+import os
 import sys
+import tempfile
 
 
 class TestConsole(unittest.TestCase):
@@ -45,6 +48,22 @@ class TestConsole(unittest.TestCase):
             ('name', (new_func, 'new_description'))
         )
 
+    def test_unregister_command(self):
+        console = Console()
+        def func(): print('name')
+        console.register_command('name', func, 'description')
+        console.unregister_command('name')
+        console.unregister_command('missing')
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console.execute('name')
+        console.print_commands()
+        sys.stdout = sys.__stdout__  
+        expected_print = 'Ошибка: неизвестная команда.\n' \
+                         'Вы можете использовать следующие команды:\n' \
+                         '\t- help: Выводит список всех доступных команд.\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
     def test_print_commands(self):
         console = Console()
         def func(): return
@@ -190,6 +209,100 @@ class TestConsole(unittest.TestCase):
         console = Console()
         self.assertEqual(console.cast('Integer64', '123'), None)
 
+    def test_compile_command(self):
+        console = Console()
+        def func(x: int, y: float, z: str, w): return
+        compiled_command = console.compile_command(func)
+        self.assertIs(compiled_command.func, func)
+        self.assertEqual(compiled_command.arity, 4)
+        self.assertEqual(compiled_command.converters[:3], (int, float, str))
+        self.assertEqual(compiled_command.converters[3]('arg'), 'arg')
+
+    def test_execute_recompiles_replaced_command(self):
+        console = Console()
+        def func(x: int): print(x + 1)
+        console.register_command('test_command', func, '')
+        def new_func(x: str): print(x + '1')
+        console._Console__commands['test_command'] = (new_func, '')
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console.execute('test_command 1') 
+        sys.stdout = sys.__stdout__  
+        self.assertEqual(captured_output.getvalue(), '11\n')
+
+    def test_run_batch(self):
+        console = Console()
+        def func(x: int): print(x + 1)
+        console.register_command('test_command', func, '')
+        commands = io.StringIO('test_command 1\n\n# comment\n'
+                               'unknown_command\ntest_command 2\n')
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console.run_batch(commands) 
+        sys.stdout = sys.__stdout__  
+        lines = captured_output.getvalue().splitlines()
+        self.assertEqual(
+            lines[:3], 
+            ['2', 'Ошибка: неизвестная команда.', '3']
+        )
+        self.assertTrue(lines[3].startswith('Выполнено команд: 3, ошибок: 1,'))
+
+    def test_run_batch_quiet(self):
+        console = Console()
+        def func(x: int): print(x + 1)
+        console.register_command('test_command', func, '')
+        commands = io.StringIO('test_command 1\nunknown_command\n')
+        captured_output = io.StringIO() 
+        captured_errors = io.StringIO() 
+        sys.stdout = captured_output
+        sys.stderr = captured_errors
+        console.run_batch(commands, quiet=True) 
+        sys.stdout = sys.__stdout__  
+        sys.stderr = sys.__stderr__  
+        self.assertEqual(
+            captured_errors.getvalue(), 
+            'Строка 2: Ошибка: неизвестная команда.\n'
+        )
+        self.assertTrue(captured_output.getvalue().startswith(
+            'Выполнено команд: 2, ошибок: 1,'
+        ))
+
+    def test_stats(self):
+        console = Console()
+        def func(x: int): print(x + 1)
+        console.register_command('test_command', func, '')
+        console.enable_stats()
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console.execute('test_command 1') 
+        console.execute('test_command a') 
+        console.execute('unknown_command') 
+        console.execute('stats') 
+        sys.stdout = sys.__stdout__  
+        console.disable_stats()
+        self.assertNotIn('stats', console._Console__commands)
+        lines = captured_output.getvalue().splitlines()
+        self.assertEqual(lines[:3], [
+            '2', 
+            "invalid literal for int() with base 10: 'a'", 
+            'Ошибка: неизвестная команда.'
+        ])
+        self.assertTrue(lines[3].startswith('Статистика за '))
+        self.assertEqual(lines[5].split()[:3], ['test_command', '2', '1'])
+        self.assertEqual(lines[6].split()[:3], ['<unknown>', '1', '1'])
+
+    def test_stats_dump(self):
+        console = Console()
+        with tempfile.TemporaryDirectory() as directory:
+            dump_path = os.path.join(directory, 'stats.json')
+            console.enable_stats(dump_path, dump_interval=0)
+            console.execute('help') 
+            console.disable_stats()
+            with open(dump_path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+        self.assertEqual(stats['commands']['help']['calls'], 1)
+        self.assertEqual(stats['commands']['help']['errors'], 0)
+
     @patch('builtins.input', return_value='unknown_command')
     @patch('itertools.count', return_value=iter([1]))
     def test_start_unknown_command(self, input_mock, itertools_count_mock):
@@ -237,6 +350,36 @@ class TestConsole(unittest.TestCase):
                          f' но передано 2.\n'
         self.assertEqual(captured_output.getvalue(), expected_print)
 
+    def test_execute_with_default_arguments(self):
+        console = Console()
+        def func(x: int, y: int = 10): print(x + y)
+        console.register_command('test_command', func, '')
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console.execute('test_command 1') 
+        console.execute('test_command 1 2') 
+        console.execute('test_command 1 2 3') 
+        sys.stdout = sys.__stdout__  
+        expected_print = '11\n3\nОшибка: test_command принимает' \
+                         ' от 1 до 2 аргументов, но передано 3.\n'
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
+    def test_execute_with_variadic_arguments(self):
+        console = Console()
+        def func(x: int, *args: int): print(x + sum(args))
+        console.register_command('test_command', func, '')
+        captured_output = io.StringIO() 
+        sys.stdout = captured_output
+        console.execute('test_command 1') 
+        console.execute('test_command 1 2 3') 
+        console.execute('test_command') 
+        console.execute('test_command 1 a') 
+        sys.stdout = sys.__stdout__  
+        expected_print = '1\n6\nОшибка: test_command принимает' \
+                         ' не менее 1 аргументов, но передано 0.\n' \
+                         "invalid literal for int() with base 10: 'a'\n"
+        self.assertEqual(captured_output.getvalue(), expected_print)
+
     @patch('builtins.input', return_value='test_command arg')
     @patch('itertools.count', return_value=iter([1]))
     def test_start_wrong_argument_type_cast(
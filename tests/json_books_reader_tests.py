@@ -0,0 +1,59 @@
+﻿import unittest
+from JSONBooksReader import JSONBooksReader
+import io
+import json
+
+
+class TestJSONBooksReader(unittest.TestCase):
+    def setUp(self):
+        self.books = {
+            str(i): {
+                '_Book__id': i, 
+                'title': f'Книга {i}', 
+                'author': 'Толстой Л. Н.', 
+                'year': str(1860 + i),
+                '_Book__status': 'в наличии'
+            } for i in range(10)
+        }
+
+    def test_read_books_by_small_chunks(self):
+        for ensure_ascii in [True, False]:
+            document = json.dumps(
+                {'books': self.books}, 
+                ensure_ascii=ensure_ascii
+            ).encode('utf-8')
+            reader = JSONBooksReader(io.BytesIO(document), chunk_size=7)
+            self.assertEqual(dict(reader), self.books)
+
+    def test_read_books_with_other_keys_and_whitespace(self):
+        document = json.dumps(
+            {'version': 1, 'books': self.books, 'tail': [1, 2, {'a': 3}]}, 
+            indent=4
+        ).encode('utf-8')
+        reader = JSONBooksReader(io.BytesIO(document), chunk_size=5)
+        self.assertEqual(dict(reader), self.books)
+
+    def test_read_empty_books(self):
+        reader = JSONBooksReader(io.BytesIO(b'{"books": {}}'))
+        self.assertEqual(list(reader), [])
+
+    def test_read_malformed_document(self):
+        document = json.dumps({'books': self.books}).encode('utf-8')[:-10]
+        reader = JSONBooksReader(io.BytesIO(document), chunk_size=16)
+        self.assertRaises(JSONBooksReader.MalformedJSONException, list, reader)
+
+    def test_progress(self):
+        document = json.dumps({'books': self.books}).encode('utf-8')
+        reported = []
+        reader = JSONBooksReader(
+            io.BytesIO(document), 
+            chunk_size=100, 
+            progress=lambda read, total: reported.append(read)
+        )
+        list(reader)
+        self.assertEqual(reported[-1], len(document))
+        self.assertEqual(reported, sorted(reported))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,21 @@
 ﻿import unittest
+from unittest.mock import patch
+from ColumnarBookStore import ColumnarBookStore
 from ConsoleLibrary import ConsoleLibrary
 from JSONManager import LibraryJSONManager
+from JSONBooksReader import JSONBooksReader
+from LazyBookStore import LazyBookStore
 from copy import deepcopy
+from Book import Book
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import sys
+import tempfile
+import threading
 
 
 class TestLibraryJSONManager(unittest.TestCase):
@@ -28,8 +42,533 @@ class TestLibraryJSONManager(unittest.TestCase):
             self.assertEqual(actual_book.year, expected_book.year)
             self.assertEqual(actual_book.get_status(), expected_book.get_status())
 
+    def test_read_from_json_keeps_library_on_malformed_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            f.write('{"books": {"0": {"_Book__id": 0, "title": "t"')
+        self.addCleanup(os.remove, f.name)
+        console_library = ConsoleLibrary()
+        console_library.add_book('title', 'author', 'year')
+        library_json_manager = LibraryJSONManager(f.name, console_library)
+        self.assertRaises(Exception, library_json_manager.read_from_json)
+        self.assertEqual(len(console_library.books), 1)
+
+    def test_save_and_read_from_json_with_statuses(self):
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            pass
+        self.addCleanup(os.remove, f.name)
+        console_library = ConsoleLibrary()
+        library_json_manager = LibraryJSONManager(f.name, console_library)
+        for i in range(3):
+            console_library.add_book(f'Книга {i}', f'Автор {i}', f'{1900 + i}')
+        ids = list(console_library.books.keys())
+        console_library.change_book_status(ids[1], 1)
+        library_json_manager.save_to_json()
+        library_json_manager.read_from_json()
+        self.assertEqual(
+            [book.title for book in console_library.books.values()],
+            ['Книга 0', 'Книга 1', 'Книга 2']
+        )
+        self.assertEqual(
+            [book.get_status() for book in console_library.books.values()],
+            [Book.STATUSES[0], Book.STATUSES[1], Book.STATUSES[0]]
+        )
+        self.assertEqual(
+            len(console_library.trigram_index.candidates('Книга 1')), 
+            1
+        )
+
+
+class TestLibraryJSONManagerJournaling(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            f.write('{"books": {}}')
+        self.file_path = f.name
+        self.addCleanup(os.remove, self.file_path)
+        journal_path = self.file_path + LibraryJSONManager.JOURNAL_SUFFIX
+        self.addCleanup(
+            lambda: os.path.exists(journal_path) and os.remove(journal_path)
+        )
+        self.console_library = ConsoleLibrary()
+        self.manager = LibraryJSONManager(
+            self.file_path, 
+            self.console_library, 
+            journaling=True
+        )
+        self.manager.read_from_json()
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def read_library(self) -> ConsoleLibrary:
+        console_library = ConsoleLibrary()
+        LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True
+        ).read_from_json()
+        return console_library
+
+    def test_save_appends_to_journal(self):
+        with open(self.file_path) as f:
+            snapshot = f.read()
+        for i in range(3):
+            self.console_library.add_book(f'book {i}', f'author {i}', f'{i}')
+        ids = list(self.console_library.books.keys())
+        self.console_library.change_book_status(ids[0], 1)
+        self.console_library.delete_book(ids[1])
+        self.manager.save_to_json()
+        with open(self.file_path) as f:
+            self.assertEqual(f.read(), snapshot)
+        with open(self.manager.get_journal_path(), encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 5)
+        console_library = self.read_library()
+        self.assertEqual(list(console_library.books.keys()), [ids[0], ids[2]])
+        self.assertEqual(
+            console_library.books[ids[0]].get_status(), 
+            Book.STATUSES[1]
+        )
+        self.assertEqual(console_library.books[ids[2]].title, 'book 2')
+
+    def test_checkpoint_on_threshold(self):
+        self.manager.checkpoint_threshold = 2
+        self.console_library.add_book('book', 'author', 'year')
+        self.manager.save_to_json()
+        self.console_library.add_book('book', 'author', 'year')
+        self.manager.save_to_json()
+        with open(self.manager.get_journal_path()) as f:
+            self.assertEqual(f.read(), '')
+        self.assertEqual(len(self.read_library().books), 2)
+
+    def test_first_save_without_load_is_checkpoint(self):
+        console_library = ConsoleLibrary()
+        manager = LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True
+        )
+        console_library.add_book('book', 'author', 'year')
+        manager.save_to_json()
+        self.assertFalse(os.path.getsize(manager.get_journal_path()))
+        self.assertEqual(len(self.read_library().books), 1)
+
+    def test_truncated_journal_record_is_dropped(self):
+        self.console_library.add_book('book', 'author', 'year')
+        self.manager.save_to_json()
+        with open(self.manager.get_journal_path(), 'a') as f:
+            f.write('["d", ')
+        self.assertEqual(len(self.read_library().books), 1)
+        with open(self.manager.get_journal_path(), encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_unsaved_changes_are_discarded_on_load(self):
+        self.console_library.add_book('book', 'author', 'year')
+        self.manager.read_from_json()
+        self.assertEqual(len(self.console_library.books), 0)
+        self.manager.save_to_json()
+        self.assertEqual(len(self.read_library().books), 0)
+
+    def test_new_ids_follow_loaded_ids(self):
+        self.console_library.add_book('book', 'author', 'year')
+        self.manager.save_to_json()
+        console_library = self.read_library()
+        loaded_id = next(iter(console_library.books))
+        console_library.add_book('book', 'author', 'year')
+        self.assertGreater(list(console_library.books)[-1], loaded_id)
+
+
+
+class TestLibraryJSONManagerLazy(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'books': {
+                '3': {'_Book__id': 3, 'title': 'Ключ "1": {', 
+                      'author': 'Толстой', 'year': '1869', 
+                      '_Book__status': 'в наличии'}, 
+                '7': {'_Book__id': 7, 'title': 'Ёлка', 'author': 'Чехов', 
+                      'year': '1888', '_Book__status': 'выдана'}
+            }}, f)
+        self.file_path = f.name
+        self.addCleanup(os.remove, self.file_path)
+        journal_path = self.file_path + LibraryJSONManager.JOURNAL_SUFFIX
+        self.addCleanup(
+            lambda: os.path.exists(journal_path) and os.remove(journal_path)
+        )
+        self.console_library = ConsoleLibrary()
+        self.manager = LibraryJSONManager(
+            self.file_path, 
+            self.console_library, 
+            journaling=True, 
+            lazy=True
+        )
+        self.addCleanup(self.manager.close)
+        self.manager.read_from_json()
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def test_read_lazily(self):
+        books = self.console_library.books
+        self.assertIsInstance(books, LazyBookStore)
+        self.assertEqual(list(books), [3, 7])
+        self.assertEqual(books.get_materialized_count(), 0)
+        self.assertEqual(books[3].title, 'Ключ "1": {')
+        self.assertEqual(books[7].get_status(), Book.STATUSES[1])
+        self.assertEqual(books.get_materialized_count(), 2)
+        self.console_library.find_book('Чехов')
+        self.assertIn('Ёлка', self.captured_output.getvalue())
+
+    def test_save_and_checkpoint(self):
+        self.console_library.delete_book(3)
+        self.console_library.change_book_status(7, 0)
+        self.console_library.add_book('Чайка', 'Чехов', '1896')
+        self.manager.save_to_json()
+        self.manager.read_from_json()
+        self.assertEqual(len(self.console_library.books), 2)
+        self.assertEqual(
+            self.console_library.books[7].get_status(), 
+            Book.STATUSES[0]
+        )
+        self.manager.checkpoint()
+        self.assertIsInstance(self.console_library.books, LazyBookStore)
+        self.console_library.add_book('Дуэль', 'Чехов', '1891')
+        self.manager.save_to_json()
+        console_library = ConsoleLibrary()
+        LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True
+        ).read_from_json()
+        self.assertEqual(
+            [book.title for book in console_library.books.values()], 
+            ['Ёлка', 'Чайка', 'Дуэль']
+        )
+
+    def test_malformed_book(self):
+        with open(self.file_path, 'w') as f:
+            f.write('{"books": {"1": {"title": "книга"}}}')
+        self.manager.read_from_json()
+        self.assertRaises(
+            JSONBooksReader.MalformedJSONException, 
+            self.console_library.books.__getitem__, 
+            1
+        )
+
+
+class TestLibraryJSONManagerMerge(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            self.file_path = f.name
+        self.addCleanup(os.remove, self.file_path)
+        journal_path = self.file_path + LibraryJSONManager.JOURNAL_SUFFIX
+        self.addCleanup(
+            lambda: os.path.exists(journal_path) and os.remove(journal_path)
+        )
+        self.write_books({
+            '10': ['Ёлка', 'Чехов', '1888', 'в наличии'],
+            '11': ['Чайка', 'Чехов', '1896', 'выдана'],
+            '12': ['Дуэль', 'Чехов', '1891', 'в наличии'],
+        })
+        self.console_library = ConsoleLibrary()
+        self.manager = LibraryJSONManager(
+            self.file_path, 
+            self.console_library, 
+            journaling=True, 
+            merge=True
+        )
+        self.manager.read_from_json()
+        sys.stdout = io.StringIO()
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def write_books(self, books: dict[str, list[str]]) -> None:
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump({'books': {
+                id: {
+                    'title': title, 
+                    'author': author, 
+                    'year': year, 
+                    '_Book__id': int(id), 
+                    '_Book__status': status
+                }
+                for id, (title, author, year, status) in books.items()
+            }}, f, ensure_ascii=False)
+
+    def test_first_load_keeps_ids(self):
+        books = self.console_library.books
+        self.assertEqual(list(books), [10, 11, 12])
+        self.assertEqual(books[11].get_status(), Book.STATUSES[1])
+        self.console_library.add_book('Степь', 'Чехов', '1888')
+        self.assertGreater(list(books)[-1], 12)
+
+    def test_replaces_only_changed_books(self):
+        books = self.console_library.books
+        unchanged_book = books[10]
+        self.console_library.find_by_author('Чехов')
+        self.write_books({
+            '10': ['Ёлка', 'Чехов', '1888', 'в наличии'],
+            '11': ['Чайка', 'Чехов', '1896', 'в наличии'],
+            '13': ['Степь', 'Чехов', '1888', 'в наличии'],
+        })
+        self.manager.read_from_json()
+        self.assertEqual(list(books), [10, 11, 13])
+        self.assertIs(books[10], unchanged_book)
+        self.assertEqual(books[11].get_status(), Book.STATUSES[0])
+        sys.stdout = io.StringIO()
+        self.console_library.find_by_author('Чехов')
+        self.assertEqual(
+            [line.split('"')[1] for line in 
+             sys.stdout.getvalue().splitlines()], 
+            ['Ёлка', 'Чайка', 'Степь']
+        )
+
+    def test_journal_is_replayed_over_file(self):
+        self.console_library.change_book_status(10, 1)
+        self.console_library.delete_book(12)
+        self.console_library.add_book('Степь', 'Чехов', '1888')
+        self.manager.save_to_json()
+        new_id = list(self.console_library.books)[-1]
+        console_library = ConsoleLibrary()
+        manager = LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True, 
+            merge=True
+        )
+        manager.read_from_json()
+        self.assertEqual(list(console_library.books), [10, 11, new_id])
+        self.assertEqual(
+            console_library.books[10].get_status(), 
+            Book.STATUSES[1]
+        )
+        book = self.console_library.books[10]
+        self.manager.read_from_json()
+        self.assertIs(self.console_library.books[10], book)
+
+    def test_unsaved_changes_are_discarded(self):
+        book = self.console_library.books[10]
+        self.console_library.change_book_status(10, 1)
+        self.console_library.delete_book(11)
+        self.manager.read_from_json()
+        self.assertEqual(sorted(self.console_library.books), [10, 11, 12])
+        self.assertEqual(
+            self.console_library.books[10].get_status(), 
+            Book.STATUSES[0]
+        )
+        self.assertIsNot(self.console_library.books[10], book)
+
+    def test_malformed_file_keeps_library(self):
+        with open(self.file_path, 'w') as f:
+            f.write('{"books": {"10": {"title": "книга"}, "13": {')
+        self.assertRaises(
+            JSONBooksReader.MalformedJSONException, 
+            self.manager.read_from_json
+        )
+        self.assertEqual(list(self.console_library.books), [10, 11, 12])
+
+    def test_columnar_merge_updates_indexes(self):
+        books = {
+            str(id): [f'Рассказ {id}', 'Чехов', str(1880 + id), 'в наличии'] 
+            for id in range(10, 18)
+        }
+        self.write_books(books)
+        console_library = ConsoleLibrary(ColumnarBookStore())
+        manager = LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True, 
+            merge=True
+        )
+        manager.read_from_json()
+        console_library.search('Рассказ')
+        books['11'] = ['Шинель', 'Гоголь', '1842', 'выдана']
+        del books['12']
+        self.write_books(books)
+        manager.read_from_json()
+        sys.stdout = io.StringIO()
+        console_library.find_by_author('Гоголь')
+        console_library.find_by_year_range(1891, 1892)
+        console_library.find_book('Рассказ 1')
+        console_library.search('Гоголь', 1)
+        book_lines = {
+            id: console_library.format_book(book) 
+            for id, book in console_library.books.items()
+        }
+        self.assertEqual(
+            sys.stdout.getvalue().splitlines(), 
+            [book_lines[11], 'Книга не найдена.'] 
+            + [book_lines[id] for id in [10, 13, 14, 15, 16, 17]] 
+            + [book_lines[11] + ' Сходство: 1.00.']
+        )
+
+    def test_merge_reads_file_under_read_lock(self):
+        console_library = ConsoleLibrary(thread_safe=True)
+        manager = LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True, 
+            merge=True
+        )
+        iter_json_books = manager._LibraryJSONManager__iter_json_books
+        finished_readers = []
+
+        def read_library():
+            with console_library.reading():
+                finished_readers.append(len(console_library.books))
+
+        def iter_json_books_with_reader():
+            reader = threading.Thread(target=read_library)
+            reader.start()
+            reader.join(timeout=5)
+            yield from iter_json_books()
+
+        with patch.object(
+            manager, 
+            '_LibraryJSONManager__iter_json_books', 
+            iter_json_books_with_reader
+        ):
+            manager.read_from_json()
+        self.assertEqual(finished_readers, [0])
+        self.assertEqual(list(console_library.books), [10, 11, 12])
+
+    def test_library_changed_during_merge_is_compared_again(self):
+        console_library = ConsoleLibrary(thread_safe=True)
+        manager = LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True, 
+            merge=True
+        )
+        manager.read_from_json()
+        writing = console_library.writing
+
+        def add_book_then_write():
+            # Книга добавляется после сравнения под блокировкой на чтение и 
+            # до слияния под блокировкой на запись
+            console_library.add_book('Степь', 'Чехов', '1888')
+            return writing()
+
+        with patch.object(console_library, 'writing', add_book_then_write):
+            manager.read_from_json()
+        self.assertEqual(list(console_library.books), [10, 11, 12])
+
+
+class TestLibraryJSONManagerConcurrentSave(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = os.path.join(directory.name, 'library.json')
+        with open(self.file_path, 'w') as f:
+            f.write('{"books": {}}')
+        sys.stdout = io.StringIO()
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def checkpoint_with_writer(self, lazy: bool) -> ConsoleLibrary:
+        console_library = ConsoleLibrary(thread_safe=True)
+        manager = LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True, 
+            lazy=lazy
+        )
+        self.addCleanup(manager.close)
+        manager.read_from_json()
+        console_library.add_book('Ёлка', 'Чехов', '1888')
+        write = manager._LibraryJSONManager__write
+        blocked_writers = []
+
+        def write_with_writer(*args, **kwargs):
+            write(*args, **kwargs)
+            if len(blocked_writers) > 0:
+                return
+            writer = threading.Thread(
+                target=console_library.add_book, 
+                args=('Чайка', 'Чехов', '1896')
+            )
+            writer.start()
+            writer.join(timeout=5)
+            blocked_writers.append(writer.is_alive())
+
+        with patch.object(
+            manager, 
+            '_LibraryJSONManager__write', 
+            write_with_writer
+        ):
+            manager.checkpoint()
+        manager.save_to_json()
+        self.assertEqual(blocked_writers, [False])
+        return console_library
+
+    def read_titles(self) -> list[str]:
+        console_library = ConsoleLibrary()
+        LibraryJSONManager(
+            self.file_path, 
+            console_library, 
+            journaling=True
+        ).read_from_json()
+        return [book.title for book in console_library.books.values()]
+
+    def test_checkpoint_does_not_block_writers(self):
+        self.checkpoint_with_writer(lazy=False)
+        self.assertEqual(self.read_titles(), ['Ёлка', 'Чайка'])
+
+    def test_lazy_checkpoint_keeps_changes_made_during_write(self):
+        console_library = self.checkpoint_with_writer(lazy=True)
+        self.assertEqual(
+            [book.title for book in console_library.books.values()], 
+            ['Ёлка', 'Чайка']
+        )
+        self.assertEqual(self.read_titles(), ['Ёлка', 'Чайка'])
+
+
+class TestLibraryJSONManagerCompressed(unittest.TestCase):
+    def save_and_read(self, suffix, journaling=False, lazy=False):
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            file_path = f.name
+        self.addCleanup(os.remove, file_path)
+        journal_path = file_path + LibraryJSONManager.JOURNAL_SUFFIX
+        self.addCleanup(
+            lambda: os.path.exists(journal_path) and os.remove(journal_path)
+        )
+        console_library = ConsoleLibrary()
+        manager = LibraryJSONManager(
+            file_path, 
+            console_library, 
+            journaling=journaling
+        )
+        console_library.add_book('Ёлка', 'Чехов', '1888')
+        console_library.add_book('Чайка', 'Чехов', '1896')
+        manager.save_to_json()
+        if journaling:
+            manager.checkpoint()
+        loaded_library = ConsoleLibrary()
+        loaded_manager = LibraryJSONManager(
+            file_path, 
+            loaded_library, 
+            journaling=journaling, 
+            lazy=lazy
+        )
+        self.addCleanup(loaded_manager.close)
+        loaded_manager.read_from_json()
+        self.assertEqual(
+            [book.title for book in loaded_library.books.values()], 
+            ['Ёлка', 'Чайка']
+        )
+        return file_path
+
+    def test_codecs(self):
+        for suffix, codec in (('.json.gz', gzip), ('.json.bz2', bz2), 
+                              ('.json.xz', lzma), ('.json.lzma', lzma)):
+            with self.subTest(suffix=suffix):
+                file_path = self.save_and_read(suffix)
+                with codec.open(file_path, 'rt', encoding='utf-8') as f:
+                    self.assertEqual(len(json.load(f)['books']), 2)
+
+    def test_checkpoint(self):
+        file_path = self.save_and_read('.json.gz', journaling=True)
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['books']), 2)
 
-        
+    def test_lazy_falls_back_to_eager_load(self):
+        self.save_and_read('.json.xz', lazy=True)
 
 
 if __name__ == '__main__':
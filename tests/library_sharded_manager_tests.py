@@ -0,0 +1,200 @@
+﻿import unittest
+from unittest.mock import patch
+from Book import Book
+from ConsoleLibrary import ConsoleLibrary
+from JSONBooksReader import JSONBooksReader
+from ShardedManager import LibraryShardedManager, read_shard
+import io
+import json
+import os
+import sys
+import tempfile
+
+
+class TestLibraryShardedManager(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = os.path.join(directory.name, 'library.lcsm')
+        open(self.file_path, 'w').close()
+        self.console_library = ConsoleLibrary()
+        self.manager = LibraryShardedManager(
+            self.file_path,
+            self.console_library,
+            shard_count=3
+        )
+
+    def add_books(self) -> list[int]:
+        for i in range(10):
+            self.console_library.add_book(f'Книга {i}', 'Чехов', str(1880 + i))
+        ids = list(self.console_library.books)
+        self.console_library.change_book_status(ids[4], 1)
+        return ids
+
+    def read_library(self, workers: int) -> ConsoleLibrary:
+        console_library = ConsoleLibrary()
+        LibraryShardedManager(
+            self.file_path,
+            console_library,
+            workers=workers
+        ).read_from_json()
+        return console_library
+
+    def test_read_empty_manifest(self):
+        self.assertEqual(len(self.read_library(workers=1).books), 0)
+
+    def test_save_partitions_books_by_id(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        with open(self.file_path) as f:
+            manifest = json.load(f)
+        self.assertEqual(
+            manifest['shards'],
+            ['library.0.1.json', 'library.1.1.json', 'library.2.1.json']
+        )
+        for shard, shard_path in enumerate(self.manager.get_shard_paths()):
+            books = read_shard(shard_path)
+            self.assertEqual(
+                [book[0] for book in books],
+                [id for id in ids if id % 3 == shard]
+            )
+            for id, book in books:
+                self.assertEqual(book.get_id(), id)
+                self.assertEqual(book.title_key, book.title.lower())
+        books = dict(read_shard(self.manager.get_shard_paths()[ids[4] % 3]))
+        self.assertEqual(books[ids[4]].get_status(), Book.STATUSES[1])
+
+    def test_save_and_read(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                books = self.read_library(workers).books
+                self.assertEqual(list(books), ids)
+                self.assertEqual(books[ids[4]].title, 'Книга 4')
+                self.assertEqual(books[ids[4]].get_status(), Book.STATUSES[1])
+
+    def test_indexes_are_built_on_first_query(self):
+        self.add_books()
+        self.manager.save_to_json()
+        console_library = self.read_library(workers=1)
+        self.assertEqual(console_library.author_index.ids('Чехов'), set())
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+        console_library.find_book('Книга 7')
+        self.assertIn('1887', captured_output.getvalue())
+
+    def test_new_ids_follow_loaded_ids(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        console_library = self.read_library(workers=1)
+        console_library.add_book('Чайка', 'Чехов', '1896')
+        self.assertGreater(list(console_library.books)[-1], ids[-1])
+
+    def test_save_rewrites_only_dirty_shards(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        shard_paths = self.manager.get_shard_paths()
+        self.console_library.change_book_status(ids[0], 1)
+        self.console_library.delete_book(ids[2])
+        self.manager.save_to_json()
+        new_shard_paths = self.manager.get_shard_paths()
+        dirty_shards = {ids[0] % 3, ids[2] % 3}
+        for shard in range(3):
+            self.assertEqual(
+                shard_paths[shard] == new_shard_paths[shard],
+                shard not in dirty_shards
+            )
+            self.assertEqual(
+                os.path.exists(shard_paths[shard]),
+                shard not in dirty_shards
+            )
+        books = self.read_library(workers=1).books
+        self.assertNotIn(ids[2], books)
+        self.assertEqual(books[ids[0]].get_status(), Book.STATUSES[1])
+
+    def test_save_without_changes_keeps_files(self):
+        self.add_books()
+        self.manager.save_to_json()
+        with open(self.file_path) as f:
+            manifest = f.read()
+        self.manager.save_to_json()
+        with open(self.file_path) as f:
+            self.assertEqual(f.read(), manifest)
+
+    def test_save_after_read_keeps_shard_count(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        console_library = ConsoleLibrary()
+        manager = LibraryShardedManager(
+            self.file_path,
+            console_library,
+            shard_count=5,
+            workers=1
+        )
+        manager.read_from_json()
+        self.assertEqual(manager.shard_count, 3)
+        console_library.delete_book(ids[1])
+        manager.save_to_json()
+        self.assertEqual(len(manager.get_shard_paths()), 3)
+        self.assertEqual(
+            list(self.read_library(workers=1).books),
+            ids[:1] + ids[2:]
+        )
+
+    def test_full_write_replaces_previous_shards(self):
+        self.add_books()
+        self.manager.save_to_json()
+        shard_paths = self.manager.get_shard_paths()
+        manager = LibraryShardedManager(
+            self.file_path,
+            self.console_library,
+            shard_count=2
+        )
+        manager.save_to_json()
+        self.assertEqual(len(manager.get_shard_paths()), 2)
+        self.assertTrue(all(not os.path.exists(shard_path)
+                            for shard_path in shard_paths))
+        self.assertEqual(len(self.read_library(workers=1).books), 10)
+
+    def test_interrupted_save_keeps_consistent_set(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        self.console_library.delete_book(ids[0])
+        self.console_library.delete_book(ids[1])
+        replace = os.replace
+
+        def fail_on_manifest(source, destination):
+            if destination == self.file_path:
+                raise OSError
+            replace(source, destination)
+
+        with patch('os.replace', fail_on_manifest):
+            self.assertRaises(OSError, self.manager.save_to_json)
+        self.assertEqual(list(self.read_library(workers=1).books), ids)
+        self.manager.save_to_json()
+        self.assertEqual(list(self.read_library(workers=1).books), ids[2:])
+
+    def test_malformed_manifest(self):
+        with open(self.file_path, 'w') as f:
+            f.write('{"shards": []}')
+        self.assertRaises(
+            LibraryShardedManager.MalformedManifestException,
+            self.manager.read_from_json
+        )
+
+    def test_malformed_shard(self):
+        self.add_books()
+        self.manager.save_to_json()
+        with open(self.manager.get_shard_paths()[1], 'w') as f:
+            f.write('{"books": {"1": {"title": "книга"}}}')
+        self.assertRaises(
+            JSONBooksReader.MalformedJSONException,
+            self.manager.read_from_json
+        )
+        self.assertEqual(len(self.console_library.books), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+﻿import unittest
+from Book import Book
+from BookSnapshot import BookSnapshot
+from ConsoleLibrary import ConsoleLibrary
+from LazyBookStore import LazyBookStore
+from SnapshotManager import (
+    LibrarySnapshotManager, convert_json_to_snapshot, convert_snapshot_to_json
+)
+import io
+import json
+import os
+import struct
+import sys
+import tempfile
+
+
+class TestLibrarySnapshotManager(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.file_path = os.path.join(directory.name, 'library.lcsb')
+        open(self.file_path, 'wb').close()
+        self.console_library = ConsoleLibrary()
+        self.manager = LibrarySnapshotManager(
+            self.file_path, 
+            self.console_library
+        )
+        self.addCleanup(self.manager.close)
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def add_books(self) -> list[int]:
+        self.console_library.add_book('Война и мир', 'Толстой', '1869')
+        self.console_library.add_book('Ёлка', 'Чехов', '1888')
+        self.console_library.add_book('Анна Каренина', 'Толстой', '1877')
+        ids = list(self.console_library.books)
+        self.console_library.change_book_status(ids[1], 1)
+        return ids
+
+    def test_save_and_read(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        console_library = ConsoleLibrary()
+        manager = LibrarySnapshotManager(self.file_path, console_library)
+        self.addCleanup(manager.close)
+        manager.read_from_json()
+        books = console_library.books
+        self.assertIsInstance(books, LazyBookStore)
+        self.assertEqual(books.get_materialized_count(), 0)
+        self.assertEqual(list(books), ids)
+        self.assertEqual(books[ids[1]].title, 'Ёлка')
+        self.assertEqual(books[ids[1]].get_status(), Book.STATUSES[1])
+        self.assertEqual(books.get_materialized_count(), 1)
+
+    def test_changes_after_read(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        self.manager.read_from_json()
+        self.console_library.delete_book(ids[0])
+        self.console_library.change_book_status(ids[2], 1)
+        self.console_library.add_book('Чайка', 'Чехов', '1896')
+        self.captured_output.truncate(0)
+        self.captured_output.seek(0)
+        self.console_library.find_book('Чехов')
+        self.console_library.count_books_by_status(1)
+        self.manager.save_to_json()
+        self.console_library.find_book('Толстой')
+        books = self.console_library.books
+        self.assertEqual(len(books), 3)
+        self.assertEqual(list(books)[:2], ids[1:])
+        self.assertEqual(books[ids[2]].get_status(), Book.STATUSES[1])
+        lines = self.captured_output.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Ёлка', lines[0])
+        self.assertIn('Чайка', lines[1])
+        self.assertEqual(lines[2], 'Книг со статусом "выдана": 2.')
+        self.assertIn('Анна Каренина', lines[3])
+
+    def test_read_malformed_snapshot(self):
+        ids = self.add_books()
+        with open(self.file_path, 'wb') as f:
+            f.write(b'not a snapshot at all')
+        self.assertRaises(
+            BookSnapshot.MalformedSnapshotException, 
+            self.manager.read_from_json
+        )
+        self.assertEqual(list(self.console_library.books), ids)
+
+    def test_decode_corrupt_status(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        self.manager.close()
+        with open(self.file_path, 'r+b') as f:
+            data = f.read()
+            offsets_start = BookSnapshot.HEADER.size + 8 * len(ids)
+            record_offset, = struct.unpack_from('<Q', data, offsets_start)
+            f.seek(record_offset)
+            f.write(bytes([len(Book.STATUSES)]))
+        snapshot = BookSnapshot(self.file_path)
+        self.addCleanup(snapshot.close)
+        self.assertRaises(
+            BookSnapshot.MalformedSnapshotException, 
+            snapshot.decode, 
+            0
+        )
+        self.assertEqual(snapshot.decode(1).title, 'Ёлка')
+
+    def test_convert(self):
+        ids = self.add_books()
+        self.manager.save_to_json()
+        json_path = os.path.join(self.directory, 'library.json')
+        snapshot_path = os.path.join(self.directory, 'copy.lcsb')
+        convert_snapshot_to_json(self.file_path, json_path)
+        with open(json_path, 'r') as f:
+            json_books = json.load(f)['books']
+        self.assertEqual(list(map(int, json_books)), ids)
+        convert_json_to_snapshot(json_path, snapshot_path)
+        with open(self.file_path, 'rb') as f, open(snapshot_path, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+
+class TestLazyBookStore(unittest.TestCase):
+    def test_mutations(self):
+        books = [Book(f'title {i}', 'author', 'year', id=i) for i in range(4)]
+        decoded = []
+        def decode(position: int) -> Book:
+            decoded.append(position)
+            return books[position]
+        store = LazyBookStore([0, 1, 2, 3], decode)
+        self.assertIn(2, store)
+        self.assertNotIn(4, store)
+        self.assertEqual(decoded, [])
+        del store[1]
+        store[4] = Book('title 4', 'author', 'year', id=4)
+        store[1] = Book('title 1', 'author', 'year', id=1)
+        self.assertEqual(list(store), [0, 2, 3, 4, 1])
+        self.assertEqual(len(store), 5)
+        self.assertIs(store[2], books[2])
+        self.assertIs(store[2], books[2])
+        self.assertEqual(decoded, [2])
+        self.assertRaises(KeyError, store.__getitem__, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+﻿import unittest
+from Book import Book
+from ConsoleLibrary import ConsoleLibrary
+from SQLiteManager import LibrarySQLiteManager
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+
+
+class TestLibrarySQLiteManager(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = os.path.join(directory.name, 'library.db')
+        self.console_library = ConsoleLibrary()
+        self.manager = LibrarySQLiteManager(
+            self.file_path, 
+            self.console_library
+        )
+        self.addCleanup(self.manager.close)
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+        self.addCleanup(setattr, sys, 'stdout', sys.__stdout__)
+
+    def read_rows(self) -> list[tuple]:
+        connection = sqlite3.connect(self.file_path)
+        rows = connection.execute(
+            'SELECT id, title, status FROM books ORDER BY id'
+        ).fetchall()
+        connection.close()
+        return rows
+
+    def test_save_and_read(self):
+        for i in range(3):
+            self.console_library.add_book(f'book {i}', f'author {i}', f'{i}')
+        ids = list(self.console_library.books)
+        self.console_library.change_book_status(ids[1], 1)
+        self.manager.save_to_json()
+        console_library = ConsoleLibrary()
+        manager = LibrarySQLiteManager(self.file_path, console_library)
+        self.addCleanup(manager.close)
+        manager.read_from_json()
+        self.assertEqual(list(console_library.books), ids)
+        self.assertEqual(
+            console_library.books[ids[1]].get_status(), 
+            Book.STATUSES[1]
+        )
+
+    def test_save_writes_only_changes(self):
+        self.manager.read_from_json()
+        for i in range(3):
+            self.console_library.add_book(f'book {i}', f'author {i}', f'{i}')
+        ids = list(self.console_library.books)
+        self.manager.save_to_json()
+        self.console_library.delete_book(ids[0])
+        self.console_library.change_book_status(ids[2], 1)
+        connection = sqlite3.connect(self.file_path)
+        connection.execute(
+            'UPDATE books SET title = ? WHERE id = ?', 
+            ('untouched', ids[1])
+        )
+        connection.commit()
+        connection.close()
+        self.manager.save_to_json()
+        self.assertEqual(
+            self.read_rows(), 
+            [(ids[1], 'untouched', 0), (ids[2], 'book 2', 1)]
+        )
+
+    def test_find_book_and_print_books_by_status(self):
+        self.console_library.add_book('Война и мир', 'Толстой', '1869')
+        self.console_library.add_book('Анна Каренина', 'Толстой', '1877')
+        ids = list(self.console_library.books)
+        self.console_library.change_book_status(ids[1], 1)
+        self.manager.save_to_json()
+        self.captured_output.truncate(0)
+        self.captured_output.seek(0)
+        self.manager.find_book('Каренина')
+        self.manager.print_books_by_status(0)
+        self.manager.find_book('ТОЛСТОЙ')
+        self.manager.find_book('Гоголь')
+        war_and_peace = ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+            ids[0], 'Война и мир', 'Толстой', '1869', Book.STATUSES[0]
+        ) + '\n'
+        anna_karenina = ConsoleLibrary.BOOK_PRINT_PATTERN.format(
+            ids[1], 'Анна Каренина', 'Толстой', '1877', Book.STATUSES[1]
+        ) + '\n'
+        expected_print = anna_karenina + war_and_peace + war_and_peace \
+            + anna_karenina + 'Книга не найдена.\n'
+        self.assertEqual(self.captured_output.getvalue(), expected_print)
+
+    def test_find_book_matches_console_library(self):
+        self.console_library.add_book('Ёлка', 'Чехов', '1888')
+        self.console_library.add_book('ＡＢＣ', 'Straße', '1900')
+        self.manager.save_to_json()
+        for key_word in ('елка', 'ЁЛКА', 'abc', 'STRASSE', '88', 'Гоголь'):
+            with self.subTest(key_word=key_word):
+                self.captured_output.truncate(0)
+                self.captured_output.seek(0)
+                self.manager.find_book(key_word)
+                sql_output = self.captured_output.getvalue()
+                self.captured_output.truncate(0)
+                self.captured_output.seek(0)
+                self.console_library.find_book(key_word)
+                self.assertEqual(
+                    sql_output, 
+                    self.captured_output.getvalue()
+                )
+
+
+    def test_only_status_is_indexed(self):
+        self.manager.close()
+        connection = sqlite3.connect(self.file_path)
+        connection.execute('CREATE INDEX books_title ON books (title)')
+        connection.commit()
+        connection.close()
+        self.manager = LibrarySQLiteManager(
+            self.file_path, 
+            self.console_library
+        )
+        self.addCleanup(self.manager.close)
+        connection = sqlite3.connect(self.file_path)
+        indexes = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+            " AND name LIKE 'books_%'"
+        ).fetchall()
+        connection.close()
+        self.assertEqual(indexes, [('books_status',)])
+
+if __name__ == '__main__':
+    unittest.main()